@@ -1,979 +1,1573 @@
-import tkinter as tk
-from tkinter import ttk
-from tkinter import messagebox
-import mysql.connector
-from mysql.connector import Error
-from config import DATABASE_CONFIG
-from tabulate import tabulate
-from tkcalendar import DateEntry
-
-# Clase de conexxion a la base de datos 
-class DatabaseConnection:
-    def __init__(self, host, user, password, database):
-        self.host = host
-        self.user = user
-        self.password = ""
-        self.database = database
-        self.connection = None
-        self.cursor = None
-    
-    def connect(self):
-        try:
-            self.connection = mysql.connector.connect(
-                host=self.host,
-                port=3306,
-                user=self.user,
-                password=self.password,
-                database=self.database
-            )
-            self.cursor = self.connection.cursor()
-            return True
-        except Error as e:
-            messagebox.showerror("Error de Conexión", f"Error al conectar con la base de datos: {e}")
-            return False
-    
-    def disconnect(self):
-        if self.cursor:
-            self.cursor.close()
-        if self.connection:
-            self.connection.close()
-    
-    def execute_query(self, query, params=None):
-        try:
-            if self.connection is None or not self.connection.is_connected():
-                if not self.connect():
-                    return False
-            self.cursor.execute(query, params or ())
-            self.connection.commit()
-            return True
-        except Error as e:
-            messagebox.showerror("Error de Base de Datos", f"Error al ejecutar consulta: {e}")
-            return False
-    
-    def fetch_all(self, query, params=None):
-        try:
-            if self.connection is None or not self.connection.is_connected():
-                if not self.connect():
-                    return []
-            self.cursor.execute(query, params or ())
-            return self.cursor.fetchall()
-        except Error as e:
-            messagebox.showerror("Error de Base de Datos", f"Error al obtener datos: {e}")
-            return []
-
-    def create_tables(self):
-        """Crear las tablas si no existen"""
-        tablas = [
-            '''CREATE TABLE IF NOT EXISTS Clientes (
-                cliente_id INT AUTO_INCREMENT PRIMARY KEY,
-                nombre VARCHAR(100) NOT NULL,
-                telefono VARCHAR(15),
-                direccion VARCHAR(150)
-            )''',
-            '''CREATE TABLE IF NOT EXISTS Productos (
-                producto_id INT AUTO_INCREMENT PRIMARY KEY,
-                nombre VARCHAR(100) NOT NULL,
-                descripcion TEXT,
-                precio DECIMAL(10,2) NOT NULL,
-                stock INT NOT NULL
-            )''',
-            '''CREATE TABLE IF NOT EXISTS Categorias (
-                categoria_id INT AUTO_INCREMENT PRIMARY KEY,
-                nombre VARCHAR(50) NOT NULL,
-                descripcion TEXT
-            )''',
-            '''CREATE TABLE IF NOT EXISTS Ventas (
-                venta_id INT AUTO_INCREMENT PRIMARY KEY,
-                cliente_id INT,
-                fecha DATETIME DEFAULT CURRENT_TIMESTAMP,
-                total DECIMAL(10,2),
-                FOREIGN KEY (cliente_id) REFERENCES Clientes(cliente_id)
-            )''',
-            '''CREATE TABLE IF NOT EXISTS DetalleVentas (
-                detalle_id INT AUTO_INCREMENT PRIMARY KEY,
-                venta_id INT,
-                producto_id INT,
-                cantidad INT NOT NULL,
-                precio_unitario DECIMAL(10,2) NOT NULL,
-                FOREIGN KEY (venta_id) REFERENCES Ventas(venta_id),
-                FOREIGN KEY (producto_id) REFERENCES Productos(producto_id)
-            )'''
-        ]
-        if self.connection is None or not self.connection.is_connected():
-            if not self.connect():
-                return False
-        for query in tablas:
-            try:
-                self.cursor.execute(query)
-            except Error as e:
-                messagebox.showerror("Error de Base de Datos", f"Error al crear tabla: {e}")
-                return False
-        self.connection.commit()
-        return True
-
-
-# Crear instancia de conexión usando la configuración importada
-db = DatabaseConnection(**DATABASE_CONFIG)
-
-# Conectar y crear tablas al iniciar
-if db.connect():
-    db.create_tables()
-
-# Crear la ventana principal
-root = tk.Tk()
-root.geometry('800x400')
-root.title("GESTOR DE TIENDA")
-
-# Crear el widget Notebook (pestañas)
-notebook = ttk.Notebook(root)
-
-# Crear los frames que irán dentro de las pestañas
-tab_clientes = ttk.Frame(notebook)
-tab_productos = ttk.Frame(notebook)
-tab_categorias = ttk.Frame(notebook)
-tab_ventas = ttk.Frame(notebook)
-tab_detalle_ventas = ttk.Frame(notebook)
-
-# Añadir las pestañas al Notebook
-notebook.add(tab_clientes, text="Clientes")
-notebook.add(tab_productos, text="Productos")
-notebook.add(tab_categorias, text="Categorias")
-notebook.add(tab_ventas, text="Ventas")
-notebook.add(tab_detalle_ventas, text="DetalleVentas")
-
-# Empaquetar el Notebook para que se muestre en la ventana
-notebook.pack(expand=True, fill="both")
-
-# Tabla base de datos 
-def obtener_tablas():
-    conn = mysql.connector.connect(
-        host=db.host,
-        user=db.user,
-        password=db.password,
-        database=db.database
-    )
-    cur = conn.cursor()
-    cur.execute("SHOW TABLES")
-    tablas = [t[0] for t in cur.fetchall()]
-    conn.close()
-    return tablas
-
-def obtener_datos_tabla(tabla):
-    conn = mysql.connector.connect(
-        host=db.host,
-        user=db.user,
-        password=db.password,
-        database=db.database
-    )
-    cur = conn.cursor()
-    cur.execute(f"SELECT * FROM {tabla}")
-    columnas = [desc[0] for desc in cur.description]
-    datos = cur.fetchall()
-    conn.close()
-    return columnas, datos
-
-
-# PESTAÑA CLIENTES
-# Filtro de búsqueda por nombre
-frame_filtro_clientes = tk.Frame(tab_clientes)
-frame_filtro_clientes.pack(padx=50, pady=(0,10), anchor="w")
-tk.Label(frame_filtro_clientes, text="Buscar por nombre:", font=("Arial", 12)).pack(side=tk.LEFT)
-filtro_nombre_cliente = tk.Entry(frame_filtro_clientes, width=20, font=("Arial", 12))
-filtro_nombre_cliente.pack(side=tk.LEFT, padx=5)
-
-def filtrar_clientes():
-    nombre = filtro_nombre_cliente.get()
-    conn = mysql.connector.connect(host=db.host, user=db.user, password=db.password, database=db.database)
-    cur = conn.cursor()
-    if nombre:
-        cur.execute("SELECT * FROM Clientes WHERE nombre LIKE %s", (f"%{nombre}%",))
-    else:
-        cur.execute("SELECT * FROM Clientes")
-    rows = cur.fetchall()
-    conn.close()
-    tree_clientes.delete(*tree_clientes.get_children())
-    for row in rows:
-        tree_clientes.insert('', 'end', values=row)
-
-btn_filtrar_cliente = tk.Button(frame_filtro_clientes, text="Filtrar", command=filtrar_clientes)
-btn_filtrar_cliente.pack(side=tk.LEFT, padx=5)
-titulo_clientes = tk.Label(tab_clientes, text="Gestión de Clientes", font=("Arial", 16, "bold"), fg="blue")
-titulo_clientes.pack(pady=20)
-
-form_clientes = tk.Frame(tab_clientes)
-form_clientes.pack(pady=20, anchor="w", padx=50)
-
-# Treeview para mostrar registros de clientes
-# Treeview para mostrar registros de clientes
-tree_clientes = ttk.Treeview(tab_clientes)
-tree_clientes.pack(fill="x", padx=50, pady=10)
-tree_clientes['columns'] = ('cliente_id', 'nombre', 'telefono', 'direccion')
-tree_clientes['show'] = 'headings'
-for col in tree_clientes['columns']:
-    tree_clientes.heading(col, text=col)
-    tree_clientes.column(col, width=120)
-
-def copiar_a_formulario_cliente(event):
-    seleccionado = tree_clientes.focus()
-    if seleccionado:
-        valores = tree_clientes.item(seleccionado, 'values')
-        nombre_cliente.delete(0, tk.END)
-        telefono_cliente.delete(0, tk.END)
-        direccion_cliente.delete(0, tk.END)
-        nombre_cliente.insert(0, valores[1])
-        telefono_cliente.insert(0, valores[2])
-        direccion_cliente.insert(0, valores[3])
-
-tree_clientes.bind('<<TreeviewSelect>>', copiar_a_formulario_cliente)
-
-def cargar_clientes():
-    conn = mysql.connector.connect(host=db.host, user=db.user, password=db.password, database=db.database)
-    cur = conn.cursor()
-    cur.execute("SELECT * FROM Clientes")
-    rows = cur.fetchall()
-    conn.close()
-    tree_clientes.delete(*tree_clientes.get_children())
-    for row in rows:
-        tree_clientes.insert('', 'end', values=row)
-
-cargar_clientes()
-
-# Dato 1 : Nombre
-tk.Label(form_clientes, text="Nombre:", font=("Arial", 12)).grid(row=1, column=0, sticky="w", padx=(0, 10), pady=10)
-nombre_cliente = tk.Entry(form_clientes, width=25, font=("Arial", 12), relief="solid", bd=1)
-nombre_cliente.grid(row=1, column=1, sticky="w", pady=10)
-
-# Dato 2: Teléfono
-tk.Label(form_clientes, text="Teléfono:", font=("Arial", 12)).grid(row=3, column=0, sticky="w", padx=(0, 10), pady=10)
-telefono_cliente = tk.Entry(form_clientes, width=25, font=("Arial", 12), relief="solid", bd=1)
-telefono_cliente.grid(row=3, column=1, sticky="w", pady=10)
-
-# Dato 3: Dirección
-tk.Label(form_clientes, text="Dirección:", font=("Arial", 12)).grid(row=4, column=0, sticky="w", padx=(0, 10), pady=10)
-direccion_cliente = tk.Entry(form_clientes, width=25, font=("Arial", 12), relief="solid", bd=1)
-direccion_cliente.grid(row=4, column=1, sticky="w", pady=10)
-
-# Botones de acción
-button_frame = tk.Frame(tab_clientes)
-button_frame.pack(pady=20)
-
-def guardar_cliente():
-    conn = mysql.connector.connect(
-        host=db.host,
-        user=db.user,
-        password=db.password,
-        database=db.database
-    )
-    cur = conn.cursor()
-    cur.execute("INSERT INTO Clientes (nombre, telefono, direccion) VALUES (%s, %s, %s)",
-                (nombre_cliente.get(), telefono_cliente.get(), direccion_cliente.get()))
-    conn.commit()
-    conn.close()
-    nombre_cliente.delete(0, tk.END)
-    telefono_cliente.delete(0, tk.END)
-    direccion_cliente.delete(0, tk.END)
-    cargar_clientes()
-    messagebox.showinfo("Guardado", "Cliente guardado correctamente.")
-
-def actualizar_cliente():
-    seleccionado = tree_clientes.focus()
-    if not seleccionado:
-        messagebox.showwarning("Advertencia", "Selecciona un registro para actualizar.")
-        return
-    valores = tree_clientes.item(seleccionado, 'values')
-    cliente_id = valores[0]
-    conn = mysql.connector.connect(host=db.host, user=db.user, password=db.password, database=db.database)
-    cur = conn.cursor()
-    cur.execute("UPDATE Clientes SET nombre=%s, telefono=%s, direccion=%s WHERE cliente_id=%s",
-                (nombre_cliente.get(), telefono_cliente.get(), direccion_cliente.get(), cliente_id))
-    conn.commit()
-    conn.close()
-    cargar_clientes()
-    messagebox.showinfo("Actualizado", "Cliente actualizado correctamente.")
-
-def eliminar_cliente():
-    seleccionado = tree_clientes.focus()
-    if not seleccionado:
-        messagebox.showwarning("Advertencia", "Selecciona un registro para eliminar.")
-        return
-    valores = tree_clientes.item(seleccionado, 'values')
-    cliente_id = valores[0]
-    conn = mysql.connector.connect(host=db.host, user=db.user, password=db.password, database=db.database)
-    cur = conn.cursor()
-    cur.execute("DELETE FROM Clientes WHERE cliente_id=%s", (cliente_id,))
-    conn.commit()
-    conn.close()
-    cargar_clientes()
-    messagebox.showinfo("Eliminado", "Cliente eliminado correctamente.")
-
-def limpiar_cliente():
-    nombre_cliente.delete(0, tk.END)
-    telefono_cliente.delete(0, tk.END)
-    direccion_cliente.delete(0, tk.END)
-    cargar_clientes()
-    messagebox.showinfo("Limpiar", "Campos de cliente limpiados.")
-
-btn_save = tk.Button(button_frame, text="Guardar", font=("Arial", 12), bg="#4CAF50", fg="white", width=10)
-btn_save.pack(side=tk.LEFT, padx=5)
-
-btn_update = tk.Button(button_frame, text="Actualizar", font=("Arial", 12), bg="#2196F3", fg="white", width=10)
-btn_update.pack(side=tk.LEFT, padx=5)
-
-btn_delete = tk.Button(button_frame, text="Eliminar", font=("Arial", 12), bg="#f44336", fg="white", width=10)
-btn_delete.pack(side=tk.LEFT, padx=5)
-
-btn_clear = tk.Button(button_frame, text="Limpiar", font=("Arial", 12), bg="#FF9800", fg="white", width=10)
-btn_clear.pack(side=tk.LEFT, padx=5)
-
-btn_save.config(command=guardar_cliente)
-btn_update.config(command=actualizar_cliente)
-btn_delete.config(command=eliminar_cliente)
-btn_clear.config(command=limpiar_cliente)
-
-# PESTAÑA PRODUCTOS 
-# Filtro de búsqueda por nombre
-frame_filtro_productos = tk.Frame(tab_productos)
-frame_filtro_productos.pack(padx=50, pady=(0,10), anchor="w")
-tk.Label(frame_filtro_productos, text="Buscar por nombre:", font=("Arial", 12)).pack(side=tk.LEFT)
-filtro_nombre_producto = tk.Entry(frame_filtro_productos, width=20, font=("Arial", 12))
-filtro_nombre_producto.pack(side=tk.LEFT, padx=5)
-
-def filtrar_productos():
-    nombre = filtro_nombre_producto.get()
-    conn = mysql.connector.connect(host=db.host, user=db.user, password=db.password, database=db.database)
-    cur = conn.cursor()
-    if nombre:
-        cur.execute("SELECT * FROM Productos WHERE nombre LIKE %s", (f"%{nombre}%",))
-    else:
-        cur.execute("SELECT * FROM Productos")
-    rows = cur.fetchall()
-    conn.close()
-    tree_productos.delete(*tree_productos.get_children())
-    for row in rows:
-        tree_productos.insert('', 'end', values=row)
-
-btn_filtrar_producto = tk.Button(frame_filtro_productos, text="Filtrar", command=filtrar_productos)
-btn_filtrar_producto.pack(side=tk.LEFT, padx=5)
-titulo_productos = tk.Label(tab_productos, text="Gestión de Productos", font=("Arial", 16, "bold"), fg="green")
-titulo_productos.pack(pady=20)
-
-form_productos = tk.Frame(tab_productos)
-form_productos.pack(pady=20, anchor="w", padx=50)
-
-# Treeview para mostrar registros de productos
-# Treeview para mostrar registros de productos
-tree_productos = ttk.Treeview(tab_productos)
-tree_productos.pack(fill="x", padx=50, pady=10)
-tree_productos['columns'] = ('producto_id', 'nombre', 'descripcion', 'precio', 'stock')
-tree_productos['show'] = 'headings'
-for col in tree_productos['columns']:
-    tree_productos.heading(col, text=col)
-    tree_productos.column(col, width=120)
-
-def copiar_a_formulario_producto(event):
-    seleccionado = tree_productos.focus()
-    if seleccionado:
-        valores = tree_productos.item(seleccionado, 'values')
-        nombre_producto.delete(0, tk.END)
-        descripcion_producto.delete(0, tk.END)
-        precio_producto.delete(0, tk.END)
-        stock_producto.delete(0, tk.END)
-        nombre_producto.insert(0, valores[1])
-        descripcion_producto.insert(0, valores[2])
-        precio_producto.insert(0, valores[3])
-        stock_producto.insert(0, valores[4])
-
-tree_productos.bind('<<TreeviewSelect>>', copiar_a_formulario_producto)
-
-def cargar_productos():
-    conn = mysql.connector.connect(host=db.host, user=db.user, password=db.password, database=db.database)
-    cur = conn.cursor()
-    cur.execute("SELECT * FROM Productos")
-    rows = cur.fetchall()
-    conn.close()
-    tree_productos.delete(*tree_productos.get_children())
-    for row in rows:
-        tree_productos.insert('', 'end', values=row)
-
-cargar_productos()
-
-# Dato 1 : Nombre
-tk.Label(form_productos, text="Nombre:", font=("Arial", 12)).grid(row=1, column=0, sticky="w", padx=(0, 10), pady=10)
-nombre_producto = tk.Entry(form_productos, width=25, font=("Arial", 12), relief="solid", bd=1)
-nombre_producto.grid(row=1, column=1, sticky="w", pady=10)
-
-# Dato 2: Descripción
-tk.Label(form_productos, text="Descripción:", font=("Arial", 12)).grid(row=2, column=0, sticky="w", padx=(0, 10), pady=10)
-descripcion_producto = tk.Entry(form_productos, width=25, font=("Arial", 12), relief="solid", bd=1)
-descripcion_producto.grid(row=2, column=1, sticky="w", pady=10)
-
-# Dato 3: Precio
-tk.Label(form_productos, text="Precio:", font=("Arial", 12)).grid(row=3, column=0, sticky="w", padx=(0, 10), pady=10)
-precio_producto = tk.Entry(form_productos, width=25, font=("Arial", 12), relief="solid", bd=1)
-precio_producto.grid(row=3, column=1, sticky="w", pady=10)
-
-# Dato 4: Stock
-tk.Label(form_productos, text="Stock:", font=("Arial", 12)).grid(row=4, column=0, sticky="w", padx=(0, 10), pady=10)
-stock_producto = tk.Entry(form_productos, width=25, font=("Arial", 12), relief="solid", bd=1)
-stock_producto.grid(row=4, column=1, sticky="w", pady=10)
-
-# Botones de acción
-button_productos = tk.Frame(tab_productos)
-button_productos.pack(pady=20)
-def guardar_producto():
-    conn = mysql.connector.connect(
-        host=db.host,
-        user=db.user,
-        password=db.password,
-        database=db.database
-    )
-    cur = conn.cursor()
-    cur.execute("INSERT INTO Productos (nombre, descripcion, precio, stock) VALUES (%s, %s, %s, %s)",
-                (nombre_producto.get(), descripcion_producto.get(), precio_producto.get(), stock_producto.get()))
-    conn.commit()
-    conn.close()
-    nombre_producto.delete(0, tk.END)
-    descripcion_producto.delete(0, tk.END)
-    precio_producto.delete(0, tk.END)
-    stock_producto.delete(0, tk.END)
-    cargar_productos()
-    messagebox.showinfo("Guardado", "Producto guardado correctamente.")
-
-def actualizar_producto():
-    conn = mysql.connector.connect(
-        host=db.host,
-        user=db.user,
-        password=db.password,
-        database=db.database
-    )
-    cur = conn.cursor()
-    cur.execute("UPDATE Productos SET descripcion=%s, precio=%s, stock=%s WHERE nombre=%s",
-                (descripcion_producto.get(), precio_producto.get(), stock_producto.get(), nombre_producto.get()))
-    conn.commit()
-    conn.close()
-    cargar_productos()
-    messagebox.showinfo("Actualizado", "Producto actualizado correctamente.")
-
-def eliminar_producto():
-    conn = mysql.connector.connect(
-        host=db.host,
-        user=db.user,
-        password=db.password,
-        database=db.database
-    )
-    cur = conn.cursor()
-    cur.execute("DELETE FROM Productos WHERE nombre=%s", (nombre_producto.get(),))
-    conn.commit()
-    conn.close()
-    nombre_producto.delete(0, tk.END)
-    descripcion_producto.delete(0, tk.END)
-    precio_producto.delete(0, tk.END)
-    stock_producto.delete(0, tk.END)
-    cargar_productos()
-    messagebox.showinfo("Eliminado", "Producto eliminado correctamente.")
-
-def limpiar_producto():
-    nombre_producto.delete(0, tk.END)
-    descripcion_producto.delete(0, tk.END)
-    precio_producto.delete(0, tk.END)
-    stock_producto.delete(0, tk.END)
-    cargar_productos()
-    messagebox.showinfo("Limpiar", "Campos de producto limpiados.")
-
-btn_save_producto = tk.Button(button_productos, text="Guardar", font=("Arial", 12), bg="#4CAF50", fg="white", width=10)
-btn_save_producto.pack(side=tk.LEFT, padx=5)
-
-btn_update_producto = tk.Button(button_productos, text="Actualizar", font=("Arial", 12), bg="#2196F3", fg="white", width=10)
-btn_update_producto.pack(side=tk.LEFT, padx=5)
-
-btn_delete_producto = tk.Button(button_productos, text="Eliminar", font=("Arial", 12), bg="#f44336", fg="white", width=10)
-btn_delete_producto.pack(side=tk.LEFT, padx=5)
-
-btn_clear_producto = tk.Button(button_productos, text="Limpiar", font=("Arial", 12), bg="#FF9800", fg="white", width=10)
-btn_clear_producto.pack(side=tk.LEFT, padx=5)
-
-btn_save_producto.config(command=guardar_producto)
-btn_update_producto.config(command=actualizar_producto)
-btn_delete_producto.config(command=eliminar_producto)
-btn_clear_producto.config(command=limpiar_producto)
-
-# PESTAÑA CATEGORIAS
-# Filtro de búsqueda por nombre
-frame_filtro_categorias = tk.Frame(tab_categorias)
-frame_filtro_categorias.pack(padx=50, pady=(0,10), anchor="w")
-tk.Label(frame_filtro_categorias, text="Buscar por nombre:", font=("Arial", 12)).pack(side=tk.LEFT)
-filtro_nombre_categoria = tk.Entry(frame_filtro_categorias, width=20, font=("Arial", 12))
-filtro_nombre_categoria.pack(side=tk.LEFT, padx=5)
-
-def filtrar_categorias():
-    nombre = filtro_nombre_categoria.get()
-    conn = mysql.connector.connect(host=db.host, user=db.user, password=db.password, database=db.database)
-    cur = conn.cursor()
-    if nombre:
-        cur.execute("SELECT * FROM Categorias WHERE nombre LIKE %s", (f"%{nombre}%",))
-    else:
-        cur.execute("SELECT * FROM Categorias")
-    rows = cur.fetchall()
-    conn.close()
-    tree_categorias.delete(*tree_categorias.get_children())
-    for row in rows:
-        tree_categorias.insert('', 'end', values=row)
-
-btn_filtrar_categoria = tk.Button(frame_filtro_categorias, text="Filtrar", command=filtrar_categorias)
-btn_filtrar_categoria.pack(side=tk.LEFT, padx=5)
-titulo_categorias = tk.Label(tab_categorias, text="Gestión de Categorias", font=("Arial", 16, "bold"), fg="purple")
-titulo_categorias.pack(pady=20)
-
-form_categorias = tk.Frame(tab_categorias)
-form_categorias.pack(pady=20, anchor="w", padx=50)
-
-# Treeview para mostrar registros de categorias
-# Treeview para mostrar registros de categorias
-tree_categorias = ttk.Treeview(tab_categorias)
-tree_categorias.pack(fill="x", padx=50, pady=10)
-tree_categorias['columns'] = ('categoria_id', 'nombre', 'descripcion')
-tree_categorias['show'] = 'headings'
-for col in tree_categorias['columns']:
-    tree_categorias.heading(col, text=col)
-    tree_categorias.column(col, width=120)
-
-def copiar_a_formulario_categoria(event):
-    seleccionado = tree_categorias.focus()
-    if seleccionado:
-        valores = tree_categorias.item(seleccionado, 'values')
-        nombre_categoria.delete(0, tk.END)
-        descripcion_categoria.delete(0, tk.END)
-        nombre_categoria.insert(0, valores[1])
-        descripcion_categoria.insert(0, valores[2])
-
-tree_categorias.bind('<<TreeviewSelect>>', copiar_a_formulario_categoria)
-
-def cargar_categorias():
-    conn = mysql.connector.connect(host=db.host, user=db.user, password=db.password, database=db.database)
-    cur = conn.cursor()
-    cur.execute("SELECT * FROM Categorias")
-    rows = cur.fetchall()
-    conn.close()
-    tree_categorias.delete(*tree_categorias.get_children())
-    for row in rows:
-        tree_categorias.insert('', 'end', values=row)
-
-cargar_categorias()
-
-# Dato 1 : Nombre
-tk.Label(form_categorias, text="Nombre:", font=("Arial", 12)).grid(row=1, column=0, sticky="w", padx=(0, 10), pady=10)
-nombre_categoria = tk.Entry(form_categorias, width=25, font=("Arial", 12), relief="solid", bd=1)
-nombre_categoria.grid(row=1, column=1, sticky="w", pady=10)
-
-# Dato 2: Descripción
-tk.Label(form_categorias, text="Descripción:", font=("Arial", 12)).grid(row=2, column=0, sticky="w", padx=(0, 10), pady=10)
-descripcion_categoria = tk.Entry(form_categorias, width=25, font=("Arial", 12), relief="solid", bd=1)
-descripcion_categoria.grid(row=2, column=1, sticky="w", pady=10)
-
-# Botones de acción
-button_categorias = tk.Frame(tab_categorias)
-button_categorias.pack(pady=20)
-
-def guardar_categoria():
-    conn = mysql.connector.connect(
-        host=db.host,
-        user=db.user,
-        password=db.password,
-        database=db.database
-    )
-    cur = conn.cursor()
-    cur.execute("INSERT INTO Categorias (nombre, descripcion) VALUES (%s, %s)",
-                (nombre_categoria.get(), descripcion_categoria.get()))
-    conn.commit()
-    conn.close()
-    nombre_categoria.delete(0, tk.END)
-    descripcion_categoria.delete(0, tk.END)
-    cargar_categorias()
-    messagebox.showinfo("Guardado", "Categoría guardada correctamente.")
-
-def actualizar_categoria():
-    conn = mysql.connector.connect(
-        host=db.host,
-        user=db.user,
-        password=db.password,
-        database=db.database
-    )
-    cur = conn.cursor()
-    cur.execute("UPDATE Categorias SET descripcion=%s WHERE nombre=%s",
-                (descripcion_categoria.get(), nombre_categoria.get()))
-    conn.commit()
-    conn.close()
-    cargar_categorias()
-    messagebox.showinfo("Actualizado", "Categoría actualizada correctamente.")
-
-def eliminar_categoria():
-    conn = mysql.connector.connect(
-        host=db.host,
-        user=db.user,
-        password=db.password,
-        database=db.database
-    )
-    cur = conn.cursor()
-    cur.execute("DELETE FROM Categorias WHERE nombre=%s", (nombre_categoria.get(),))
-    conn.commit()
-    conn.close()
-    nombre_categoria.delete(0, tk.END)
-    descripcion_categoria.delete(0, tk.END)
-    cargar_categorias()
-    messagebox.showinfo("Eliminado", "Categoría eliminada correctamente.")
-
-def limpiar_categoria():
-    nombre_categoria.delete(0, tk.END)
-    descripcion_categoria.delete(0, tk.END)
-    cargar_categorias()
-    messagebox.showinfo("Limpiar", "Campos de categoría limpiados.")
-
-
-btn_save_categoria = tk.Button(button_categorias, text="Guardar", font=("Arial", 12), bg="#4CAF50", fg="white", width=10)
-btn_save_categoria.pack(side=tk.LEFT, padx=5)
-
-btn_update_categoria = tk.Button(button_categorias, text="Actualizar", font=("Arial", 12), bg="#2196F3", fg="white", width=10)
-btn_update_categoria.pack(side=tk.LEFT, padx=5)
-
-btn_delete_categoria = tk.Button(button_categorias, text="Eliminar", font=("Arial", 12), bg="#f44336", fg="white", width=10)
-btn_delete_categoria.pack(side=tk.LEFT, padx=5)
-
-btn_clear_categoria = tk.Button(button_categorias, text="Limpiar", font=("Arial", 12), bg="#FF9800", fg="white", width=10)
-btn_clear_categoria.pack(side=tk.LEFT, padx=5)
-
-btn_save_categoria.config(command=guardar_categoria)
-btn_update_categoria.config(command=actualizar_categoria)
-btn_delete_categoria.config(command=eliminar_categoria)
-btn_clear_categoria.config(command=limpiar_categoria)
-
-
-# PESTAÑA VENTAS
-# Filtro de búsqueda por cliente_id
-frame_filtro_ventas = tk.Frame(tab_ventas)
-frame_filtro_ventas.pack(padx=50, pady=(0,10), anchor="w")
-tk.Label(frame_filtro_ventas, text="Buscar por cliente_id:", font=("Arial", 12)).pack(side=tk.LEFT)
-filtro_cliente_id_venta = tk.Entry(frame_filtro_ventas, width=20, font=("Arial", 12))
-filtro_cliente_id_venta.pack(side=tk.LEFT, padx=5)
-
-def filtrar_ventas():
-    cliente_id = filtro_cliente_id_venta.get()
-    conn = mysql.connector.connect(host=db.host, user=db.user, password=db.password, database=db.database)
-    cur = conn.cursor()
-    if cliente_id:
-        cur.execute("SELECT * FROM Ventas WHERE cliente_id LIKE %s", (f"%{cliente_id}%",))
-    else:
-        cur.execute("SELECT * FROM Ventas")
-    rows = cur.fetchall()
-    conn.close()
-    tree_ventas.delete(*tree_ventas.get_children())
-    for row in rows:
-        tree_ventas.insert('', 'end', values=row)
-
-btn_filtrar_venta = tk.Button(frame_filtro_ventas, text="Filtrar", command=filtrar_ventas)
-btn_filtrar_venta.pack(side=tk.LEFT, padx=5)
-titulo_ventas = tk.Label(tab_ventas, text="Gestión de Pedidos", font=("Arial", 16, "bold"), fg="red")
-titulo_ventas.pack(pady=20)
-
-form_ventas = tk.Frame(tab_ventas)
-form_ventas.pack(pady=20, anchor="w", padx=50)
-
-# Treeview para mostrar registros de ventas
-# Treeview para mostrar registros de ventas
-tree_ventas = ttk.Treeview(tab_ventas)
-tree_ventas.pack(fill="x", padx=50, pady=10)
-tree_ventas['columns'] = ('venta_id', 'cliente_id', 'fecha', 'total')
-tree_ventas['show'] = 'headings'
-for col in tree_ventas['columns']:
-    tree_ventas.heading(col, text=col)
-    tree_ventas.column(col, width=120)
-
-def copiar_a_formulario_venta(event):
-    seleccionado = tree_ventas.focus()
-    if seleccionado:
-        valores = tree_ventas.item(seleccionado, 'values')
-        cliente_id_ventas.delete(0, tk.END)
-        fecha_ventas.delete(0, tk.END)
-        total_ventas.delete(0, tk.END)
-        cliente_id_ventas.insert(0, valores[1])
-        fecha_ventas.insert(0, valores[2])
-        total_ventas.insert(0, valores[3])
-
-tree_ventas.bind('<<TreeviewSelect>>', copiar_a_formulario_venta)
-
-def cargar_ventas():
-    conn = mysql.connector.connect(host=db.host, user=db.user, password=db.password, database=db.database)
-    cur = conn.cursor()
-    cur.execute("SELECT * FROM Ventas")
-    rows = cur.fetchall()
-    conn.close()
-    tree_ventas.delete(*tree_ventas.get_children())
-    for row in rows:
-        tree_ventas.insert('', 'end', values=row)
-
-cargar_ventas()
-
-# Dato 1 : Cliente ID
-tk.Label(form_ventas, text="Cliente ID:", font=("Arial", 12)).grid(row=1, column=0, sticky="w", padx=(0, 10), pady=10)
-cliente_id_ventas = tk.Entry(form_ventas, width=25, font=("Arial", 12), relief="solid", bd=1)
-cliente_id_ventas.grid(row=1, column=1, sticky="w", pady=10)
-
-# Dato 2: Fecha Pedido
-tk.Label(form_ventas, text="Fecha venta:", font=("Arial", 12)).grid(row=2, column=0, sticky="w", padx=(0, 10), pady=10)
-from tkcalendar import DateEntry
-fecha_ventas = DateEntry(form_ventas, width=25, font=("Arial", 12), relief="solid", bd=1, date_pattern='y-mm-dd')
-fecha_ventas.grid(row=2, column=1, sticky="w", pady=10)
-
-# Dato 3: Total
-tk.Label(form_ventas, text="Total:", font=("Arial", 12)).grid(row=3, column=0, sticky="w", padx=(0, 10), pady=10)
-total_ventas = tk.Entry(form_ventas, width=25, font=("Arial", 12), relief="solid", bd=1)
-total_ventas.grid(row=3, column=1, sticky="w", pady=10)
-
-# Botones de acción
-button_ventas = tk.Frame(tab_ventas)
-button_ventas.pack(pady=20)
-def guardar_venta():
-    conn = mysql.connector.connect(
-        host=db.host,
-        user=db.user,
-        password=db.password,
-        database=db.database
-    )
-    cur = conn.cursor()
-    cur.execute("INSERT INTO Ventas (cliente_id, fecha, total) VALUES (%s, %s, %s)",
-                (cliente_id_ventas.get(), fecha_ventas.get(), total_ventas.get()))
-    conn.commit()
-    conn.close()
-    cliente_id_ventas.delete(0, tk.END)
-    fecha_ventas.delete(0, tk.END)
-    total_ventas.delete(0, tk.END)
-    cargar_ventas()
-    messagebox.showinfo("Guardado", "Venta guardada correctamente.")
-
-def actualizar_venta():
-    conn = mysql.connector.connect(
-        host=db.host,
-        user=db.user,
-        password=db.password,
-        database=db.database
-    )
-    cur = conn.cursor()
-    cur.execute("UPDATE Ventas SET cliente_id=%s, fecha=%s, total=%s WHERE venta_id=%s",
-                (cliente_id_ventas.get(), fecha_ventas.get(), total_ventas.get(), cliente_id_ventas.get()))
-    conn.commit()
-    conn.close()
-    cargar_ventas()
-    messagebox.showinfo("Actualizado", "Venta actualizada correctamente.")
-
-def eliminar_venta():
-    conn = mysql.connector.connect(
-        host=db.host,
-        user=db.user,
-        password=db.password,
-        database=db.database
-    )
-    cur = conn.cursor()
-    cur.execute("DELETE FROM Ventas WHERE venta_id=%s", (cliente_id_ventas.get(),))
-    conn.commit()
-    conn.close()
-    cliente_id_ventas.delete(0, tk.END)
-    fecha_ventas.delete(0, tk.END)
-    total_ventas.delete(0, tk.END)
-    cargar_ventas()
-    messagebox.showinfo("Eliminado", "Venta eliminada correctamente.")
-
-def limpiar_venta():
-    cliente_id_ventas.delete(0, tk.END)
-    fecha_ventas.delete(0, tk.END)
-    total_ventas.delete(0, tk.END)
-    cargar_ventas()
-    messagebox.showinfo("Limpiar", "Campos de venta limpiados.")
-
-
-btn_save_venta = tk.Button(button_ventas, text="Guardar", font=("Arial", 12), bg="#4CAF50", fg="white", width=10)
-btn_save_venta.pack(side=tk.LEFT, padx=5)
-
-btn_update_venta = tk.Button(button_ventas, text="Actualizar", font=("Arial", 12), bg="#2196F3", fg="white", width=10)
-btn_update_venta.pack(side=tk.LEFT, padx=5)
-
-btn_delete_venta = tk.Button(button_ventas, text="Eliminar", font=("Arial", 12), bg="#f44336", fg="white", width=10)
-btn_delete_venta.pack(side=tk.LEFT, padx=5)
-
-btn_clear_venta= tk.Button(button_ventas, text="Limpiar", font=("Arial", 12), bg="#FF9800", fg="white", width=10)
-btn_clear_venta.pack(side=tk.LEFT, padx=5)
-
-
-btn_save_venta.config(command=guardar_venta)
-btn_update_venta.config(command=actualizar_venta)
-btn_delete_venta.config(command=eliminar_venta)
-btn_clear_venta.config(command=limpiar_venta)
-
-# PESTAÑA DETALLE PEDIDO
-# Filtro de búsqueda por venta_id
-frame_filtro_detalle = tk.Frame(tab_detalle_ventas)
-frame_filtro_detalle.pack(padx=50, pady=(0,10), anchor="w")
-tk.Label(frame_filtro_detalle, text="Buscar por venta_id:", font=("Arial", 12)).pack(side=tk.LEFT)
-filtro_venta_id_detalle = tk.Entry(frame_filtro_detalle, width=20, font=("Arial", 12))
-filtro_venta_id_detalle.pack(side=tk.LEFT, padx=5)
-
-def filtrar_detalle():
-    venta_id = filtro_venta_id_detalle.get()
-    conn = mysql.connector.connect(host=db.host, user=db.user, password=db.password, database=db.database)
-    cur = conn.cursor()
-    if venta_id:
-        cur.execute("SELECT * FROM DetalleVentas WHERE venta_id LIKE %s", (f"%{venta_id}%",))
-    else:
-        cur.execute("SELECT * FROM DetalleVentas")
-    rows = cur.fetchall()
-    conn.close()
-    tree_detalle.delete(*tree_detalle.get_children())
-    for row in rows:
-        tree_detalle.insert('', 'end', values=row)
-
-btn_filtrar_detalle = tk.Button(frame_filtro_detalle, text="Filtrar", command=filtrar_detalle)
-btn_filtrar_detalle.pack(side=tk.LEFT, padx=5)
-titulo_detalle = tk.Label(tab_detalle_ventas, text="Gestión de Detalle Ventas", font=("Arial", 16, "bold"), fg="orange")
-titulo_detalle.pack(pady=20)
-
-form_detalle = tk.Frame(tab_detalle_ventas)
-form_detalle.pack(pady=20, anchor="w", padx=50)
-
-# Treeview para mostrar registros de detalle ventas
-# Treeview para mostrar registros de detalle ventas
-tree_detalle = ttk.Treeview(tab_detalle_ventas)
-tree_detalle.pack(fill="x", padx=50, pady=10)
-tree_detalle['columns'] = ('detalle_id', 'venta_id', 'producto_id', 'cantidad', 'precio_unitario')
-tree_detalle['show'] = 'headings'
-for col in tree_detalle['columns']:
-    tree_detalle.heading(col, text=col)
-    tree_detalle.column(col, width=120)
-
-def copiar_a_formulario_detalle(event):
-    seleccionado = tree_detalle.focus()
-    if seleccionado:
-        valores = tree_detalle.item(seleccionado, 'values')
-        venta_id_detalle.delete(0, tk.END)
-        producto_id_detalle.delete(0, tk.END)
-        cantidad_detalle.delete(0, tk.END)
-        precio_unitario_detalle.delete(0, tk.END)
-        venta_id_detalle.insert(0, valores[1])
-        producto_id_detalle.insert(0, valores[2])
-        cantidad_detalle.insert(0, valores[3])
-        precio_unitario_detalle.insert(0, valores[4])
-
-tree_detalle.bind('<<TreeviewSelect>>', copiar_a_formulario_detalle)
-
-def cargar_detalle():
-    conn = mysql.connector.connect(host=db.host, user=db.user, password=db.password, database=db.database)
-    cur = conn.cursor()
-    cur.execute("SELECT * FROM DetalleVentas")
-    rows = cur.fetchall()
-    conn.close()
-    tree_detalle.delete(*tree_detalle.get_children())
-    for row in rows:
-        tree_detalle.insert('', 'end', values=row)
-
-cargar_detalle()
-
-# Dato 1 : Venta ID
-tk.Label(form_detalle, text="Venta ID:", font=("Arial", 12)).grid(row=1, column=0, sticky="w", padx=(0, 10), pady=10)
-venta_id_detalle = tk.Entry(form_detalle, width=25, font=("Arial", 12), relief="solid", bd=1)
-venta_id_detalle.grid(row=1, column=1, sticky="w", pady=10)
-
-# Dato 2: Producto ID
-tk.Label(form_detalle, text="Producto ID:", font=("Arial", 12)).grid(row=2, column=0, sticky="w", padx=(0, 10), pady=10)
-producto_id_detalle = tk.Entry(form_detalle, width=25, font=("Arial", 12), relief="solid", bd=1)
-producto_id_detalle.grid(row=2, column=1, sticky="w", pady=10)
-
-# Dato 3: Cantidad
-tk.Label(form_detalle, text="Cantidad:", font=("Arial", 12)).grid(row=3, column=0, sticky="w", padx=(0, 10), pady=10)
-cantidad_detalle = tk.Entry(form_detalle, width=25, font=("Arial", 12), relief="solid", bd=1)
-cantidad_detalle.grid(row=3, column=1, sticky="w", pady=10)
-
-# Dato 4: Precio Unitario
-tk.Label(form_detalle, text="Precio Unitario:", font=("Arial", 12)).grid(row=4, column=0, sticky="w", padx=(0, 10), pady=10)
-precio_unitario_detalle = tk.Entry(form_detalle, width=25, font=("Arial", 12), relief="solid", bd=1)
-precio_unitario_detalle.grid(row=4, column=1, sticky="w", pady=10)
-
-# Botones de acción
-button_detalle = tk.Frame(tab_detalle_ventas)
-button_detalle.pack(pady=20)
-def guardar_detalle():
-    conn = mysql.connector.connect(
-        host=db.host,
-        user=db.user,
-        password=db.password,
-        database=db.database
-    )
-    cur = conn.cursor()
-    cur.execute("INSERT INTO DetalleVentas (venta_id, producto_id, cantidad, precio_unitario) VALUES (%s, %s, %s, %s)",
-                (venta_id_detalle.get(), producto_id_detalle.get(), cantidad_detalle.get(), precio_unitario_detalle.get()))
-    conn.commit()
-    conn.close()
-    venta_id_detalle.delete(0, tk.END)
-    producto_id_detalle.delete(0, tk.END)
-    cantidad_detalle.delete(0, tk.END)
-    precio_unitario_detalle.delete(0, tk.END)
-    cargar_detalle()
-    messagebox.showinfo("Guardado", "Detalle de venta guardado correctamente.")
-
-def actualizar_detalle():
-    conn = mysql.connector.connect(
-        host=db.host,
-        user=db.user,
-        password=db.password,
-        database=db.database
-    )
-    cur = conn.cursor()
-    cur.execute("UPDATE DetalleVentas SET producto_id=%s, cantidad=%s, precio_unitario=%s WHERE detalle_id=%s",
-                (producto_id_detalle.get(), cantidad_detalle.get(), precio_unitario_detalle.get(), venta_id_detalle.get()))
-    conn.commit()
-    conn.close()
-    cargar_detalle()
-    messagebox.showinfo("Actualizado", "Detalle de venta actualizado correctamente.")
-
-def eliminar_detalle():
-    conn = mysql.connector.connect(
-        host=db.host,
-        user=db.user,
-        password=db.password,
-        database=db.database
-    )
-    cur = conn.cursor()
-    cur.execute("DELETE FROM DetalleVentas WHERE detalle_id=%s", (venta_id_detalle.get(),))
-    conn.commit()
-    conn.close()
-    venta_id_detalle.delete(0, tk.END)
-    producto_id_detalle.delete(0, tk.END)
-    cantidad_detalle.delete(0, tk.END)
-    precio_unitario_detalle.delete(0, tk.END)
-    cargar_detalle()
-    messagebox.showinfo("Eliminado", "Detalle de venta eliminado correctamente.")
-
-def limpiar_detalle():
-    venta_id_detalle.delete(0, tk.END)
-    producto_id_detalle.delete(0, tk.END)
-    cantidad_detalle.delete(0, tk.END)
-    precio_unitario_detalle.delete(0, tk.END)
-    cargar_detalle()
-    messagebox.showinfo("Limpiar", "Campos de detalle de venta limpiados.")
-
-
-btn_save_detalle = tk.Button(button_detalle, text="Guardar", font=("Arial", 12), bg="#4CAF50", fg="white", width=10)
-btn_save_detalle.pack(side=tk.LEFT, padx=5)
-
-btn_update_detalle = tk.Button(button_detalle, text="Actualizar", font=("Arial", 12), bg="#2196F3", fg="white", width=10)
-btn_update_detalle.pack(side=tk.LEFT, padx=5)
-
-btn_delete_detalle = tk.Button(button_detalle, text="Eliminar", font=("Arial", 12), bg="#f44336", fg="white", width=10)
-btn_delete_detalle.pack(side=tk.LEFT, padx=5)
-
-btn_clear_detalle = tk.Button(button_detalle, text="Limpiar", font=("Arial", 12), bg="#FF9800", fg="white", width=10)
-btn_clear_detalle.pack(side=tk.LEFT, padx=5)
-
-btn_save_detalle.config(command=guardar_detalle)
-btn_update_detalle.config(command=actualizar_detalle)
-btn_delete_detalle.config(command=eliminar_detalle)
-btn_clear_detalle.config(command=limpiar_detalle)
-
-
-root.mainloop()
+import tkinter as tk
+import time
+from tkinter import ttk
+from tkinter import messagebox
+from datetime import date, timedelta
+from decimal import Decimal, InvalidOperation
+from tkinter import filedialog
+from config import ARCHIVO_CONFIG, CAMBIOS_CONFIG, DIARIO_CONFIG, IMPORT_CONFIG, INTERFAZ_CONFIG
+from tkcalendar import DateEntry
+from ejecutor import EjecutorConsultas
+from paginacion import TablaPaginada
+from selector import Selector
+from tienda import Tienda, backend_configurado
+from tienda.busqueda import condicion_id
+from tienda.cache import CacheConsultas
+from tienda.caja import ErrorVenta
+from tienda.cambios import LectorCambios
+from tienda.diario import Diario
+from tienda.importacion import ErrorImportacion, exportar_csv, importar_csv
+from tienda.reportes import INFORMES, reconstruir_resumen
+from tienda.sincronizacion import Sincronizador, referencia_local
+
+# Motor de base de datos elegido en config.BACKEND (MySQL o SQLite)
+Backend, parametros_backend = backend_configurado()
+
+# Clase de conexxion a la base de datos: la del paquete tienda, avisando de los errores con ventanas
+class DatabaseConnectionGUI(Backend):
+    def connect(self):
+        try:
+            return super().connect()
+        except Exception as e:
+            messagebox.showerror("Error de Conexión", f"Error al conectar con la base de datos: {e}")
+            return False
+
+    def create_tables(self):
+        try:
+            return super().create_tables()
+        except Exception as e:
+            messagebox.showerror("Error de Base de Datos", f"Error al crear las tablas: {e}")
+            return False
+
+    def execute_query(self, query, params=None):
+        try:
+            self.ejecutar(query, params)
+            return True
+        except Exception as e:
+            messagebox.showerror("Error de Base de Datos", f"Error al ejecutar consulta: {e}")
+            return False
+
+    def fetch_all(self, query, params=None):
+        try:
+            return self.consultar(query, params)
+        except Exception as e:
+            messagebox.showerror("Error de Base de Datos", f"Error al obtener datos: {e}")
+            return []
+
+
+def main():
+    """Conectar, montar la ventana y atenderla hasta que se cierre"""
+    # Crear instancia de conexión usando la configuración importada
+    db = DatabaseConnectionGUI(**parametros_backend)
+    # Las pestañas escriben a traves de los repositorios del paquete tienda
+    tienda = Tienda(db)
+
+    # Conectar y crear tablas al iniciar
+    if db.connect():
+        db.create_tables()
+
+    # Crear la ventana principal
+    root = tk.Tk()
+    root.geometry('800x400')
+    root.title("GESTOR DE TIENDA")
+
+    # Crear el widget Notebook (pestañas)
+    notebook = ttk.Notebook(root)
+
+    # Crear los frames que irán dentro de las pestañas
+    tab_clientes = ttk.Frame(notebook)
+    tab_productos = ttk.Frame(notebook)
+    tab_categorias = ttk.Frame(notebook)
+    tab_ventas = ttk.Frame(notebook)
+    tab_detalle_ventas = ttk.Frame(notebook)
+    tab_reportes = ttk.Frame(notebook)
+
+    # Añadir las pestañas al Notebook
+    notebook.add(tab_clientes, text="Clientes")
+    notebook.add(tab_productos, text="Productos")
+    notebook.add(tab_categorias, text="Categorias")
+    notebook.add(tab_ventas, text="Ventas")
+    notebook.add(tab_detalle_ventas, text="DetalleVentas")
+    notebook.add(tab_reportes, text="Reportes")
+
+    # Empaquetar el Notebook para que se muestre en la ventana
+    notebook.pack(expand=True, fill="both")
+
+    # Estado del envio de ventas anotadas sin esperar al servidor
+    estado_sincronizacion = tk.Label(root, text="", font=("Arial", 10), fg="gray", anchor="e")
+    estado_sincronizacion.pack(side=tk.BOTTOM, fill="x", padx=10)
+
+    # Indicador de carga por pestaña mientras hay consultas pendientes
+    indicadores = {}
+    for pestana in (tab_clientes, tab_productos, tab_categorias, tab_ventas, tab_detalle_ventas, tab_reportes):
+        indicadores[pestana] = tk.Label(pestana, text="", font=("Arial", 10), fg="gray")
+        indicadores[pestana].pack(anchor="e", padx=50)
+
+    def mostrar_ocupado(pestana, ocupado):
+        indicadores[pestana].config(text="Cargando..." if ocupado else "")
+        pestana.config(cursor="watch" if ocupado else "")
+
+    # Las consultas se ejecutan en hilos para que la ventana no se congele
+    ejecutor = EjecutorConsultas(root, al_cambiar_ocupado=mostrar_ocupado)
+
+    # Resultados recientes de los filtros, compartidos por todas las pestañas
+    cache_consultas = CacheConsultas()
+
+    # Las ventas se anotan en un diario local y un hilo las envia al servidor:
+    # el cajero no espera a la base de datos y no se pierde nada si se corta la conexion
+    diario = Diario(DIARIO_CONFIG['ruta'])
+
+    def al_sincronizar(estado):
+        if estado['conectado'] is False:
+            texto, color = f"Sin conexión: {estado['pendientes']} operaciones pendientes de enviar", "red"
+        elif estado['pendientes']:
+            texto, color = f"Enviando {estado['pendientes']} operaciones...", "gray"
+        else:
+            texto, color = "", "gray"
+        if estado['fallidas']:
+            texto += f"  {estado['fallidas']} operaciones rechazadas por el servidor"
+            color = "red"
+        estado_sincronizacion.config(text=texto, fg=color)
+        if estado['enviadas']:
+            tabla_ventas.cargar_nuevas()
+            tabla_detalle.cargar_nuevas()
+            revisar_catalogo(programar=False)  # los cobros enviados han movido el stock
+
+    # Clientes y productos se eligen por nombre desde memoria: escribir un ticket no consulta al servidor
+    def existe_cliente(cliente_id):
+        return not tienda.nombres_clientes.cargado or tienda.nombres_clientes.existe(cliente_id)
+
+    def existe_producto(producto_id):
+        return not tienda.catalogo.cargado or tienda.catalogo.producto(producto_id) is not None
+
+    def id_valido(selector, existe, que):
+        """id elegido en un Selector; None si esta vacio y False (tras avisar) si no es valido"""
+        id_ = selector.valor()
+        if id_ is None and not selector.escrito():
+            return None
+        if id_ is None:
+            messagebox.showwarning("Advertencia", f"Elige un {que} de la lista (flecha abajo) o escribe su id.")
+            return False
+        if not existe(id_):
+            messagebox.showwarning("Advertencia", f"No existe el {que} {id_}.")
+            return False
+        return id_
+
+    def poner_id(selector, valor, nombres):
+        """Mostrar en un Selector el id de una fila del Treeview junto a su nombre"""
+        id_ = int(valor) if str(valor).isdigit() else None
+        selector.poner(valor, nombres(id_) if id_ is not None else None)
+
+    def poner_precio(entry, producto_id):
+        """Rellenar el precio con el del catalogo al elegir un producto"""
+        precio = tienda.catalogo.precio(producto_id)
+        if precio is not None:
+            entry.delete(0, tk.END)
+            entry.insert(0, str(precio))
+
+    def cargar_nombres_clientes():
+        # Se leen enteros una sola vez (otra vez si falla); despues los mantienen al dia las escrituras
+        # de esta terminal y el registro de cambios de las demas
+        ejecutor.enviar(tienda.nombres_clientes.cargar, None,
+                        lambda e: root.after(INTERFAZ_CONFIG['revision_catalogo'] * 1000, cargar_nombres_clientes),
+                        clave="nombres_clientes")
+
+    sincronizador = Sincronizador(db, diario, DIARIO_CONFIG['intervalo'], DIARIO_CONFIG['tam_lote'],
+                                  DIARIO_CONFIG['espera_maxima'],
+                                  al_cambiar=lambda estado: ejecutor.notificar(al_sincronizar, estado))
+
+    def buscar_al_escribir(entry, funcion, espera=300):
+        """Lanzar el filtro cuando se deja de escribir durante 'espera' milisegundos"""
+        pendiente = [None]
+
+        def al_soltar(event):
+            if pendiente[0] is not None:
+                root.after_cancel(pendiente[0])
+            pendiente[0] = root.after(espera, funcion)
+
+        entry.bind('<KeyRelease>', al_soltar)
+
+    # Tabla base de datos 
+    def obtener_datos_tabla(tabla):
+        try:
+            with db.conexion(lectura=True) as conn:
+                cur = conn.cursor()
+                cur.execute(f"SELECT * FROM {tabla}")
+                columnas = [desc[0] for desc in cur.description]
+                datos = cur.fetchall()
+                cur.close()
+        except Exception as e:
+            messagebox.showerror("Error de Base de Datos", f"Error al obtener datos: {e}")
+            return [], []
+        return columnas, datos
+
+
+    # PESTAÑA CLIENTES
+    # Filtro de búsqueda por nombre
+    frame_filtro_clientes = tk.Frame(tab_clientes)
+    frame_filtro_clientes.pack(padx=50, pady=(0,10), anchor="w")
+    tk.Label(frame_filtro_clientes, text="Buscar por nombre:", font=("Arial", 12)).pack(side=tk.LEFT)
+    filtro_nombre_cliente = tk.Entry(frame_filtro_clientes, width=20, font=("Arial", 12))
+    filtro_nombre_cliente.pack(side=tk.LEFT, padx=5)
+
+    def filtrar_clientes():
+        nombre = filtro_nombre_cliente.get()
+        if nombre.strip():
+            tabla_clientes.buscar(nombre, "nombre", ("nombre",))
+        else:
+            tabla_clientes.recargar()
+
+    btn_filtrar_cliente = tk.Button(frame_filtro_clientes, text="Filtrar", command=filtrar_clientes)
+    btn_filtrar_cliente.pack(side=tk.LEFT, padx=5)
+    buscar_al_escribir(filtro_nombre_cliente, filtrar_clientes)
+    total_clientes = tk.Label(frame_filtro_clientes, text="", font=("Arial", 10), fg="gray")
+    total_clientes.pack(side=tk.LEFT, padx=5)
+    titulo_clientes = tk.Label(tab_clientes, text="Gestión de Clientes", font=("Arial", 16, "bold"), fg="blue")
+    titulo_clientes.pack(pady=20)
+
+    form_clientes = tk.Frame(tab_clientes)
+    form_clientes.pack(pady=20, anchor="w", padx=50)
+
+    # Treeview para mostrar registros de clientes
+    # Treeview para mostrar registros de clientes
+    marco_tree_clientes = tk.Frame(tab_clientes)
+    marco_tree_clientes.pack(fill="x", padx=50, pady=10)
+    tree_clientes = ttk.Treeview(marco_tree_clientes)
+    tree_clientes.pack(side=tk.LEFT, fill="x", expand=True)
+    scroll_clientes = ttk.Scrollbar(marco_tree_clientes, orient="vertical", command=tree_clientes.yview)
+    scroll_clientes.pack(side=tk.RIGHT, fill="y")
+    tree_clientes['columns'] = ('cliente_id', 'nombre', 'telefono', 'direccion')
+    tree_clientes['show'] = 'headings'
+    for col in tree_clientes['columns']:
+        tree_clientes.heading(col, text=col)
+        tree_clientes.column(col, width=120)
+
+    # Solo se mantiene en memoria una ventana de filas; el resto se pide al desplazarse
+    tabla_clientes = TablaPaginada(tree_clientes, db, ejecutor, "Clientes", "cliente_id", grupo=tab_clientes,
+                                   scrollbar=scroll_clientes, etiqueta=total_clientes,
+                                   cache=cache_consultas, ordenables=('cliente_id', 'nombre'))
+
+    def copiar_a_formulario_cliente(event):
+        seleccionado = tree_clientes.focus()
+        if seleccionado:
+            valores = tree_clientes.item(seleccionado, 'values')
+            nombre_cliente.delete(0, tk.END)
+            telefono_cliente.delete(0, tk.END)
+            direccion_cliente.delete(0, tk.END)
+            nombre_cliente.insert(0, valores[1])
+            telefono_cliente.insert(0, valores[2])
+            direccion_cliente.insert(0, valores[3])
+
+    tree_clientes.bind('<<TreeviewSelect>>', copiar_a_formulario_cliente)
+
+    def cargar_clientes():
+        tabla_clientes.recargar(usar_cache=False)
+
+    # Dato 1 : Nombre
+    tk.Label(form_clientes, text="Nombre:", font=("Arial", 12)).grid(row=1, column=0, sticky="w", padx=(0, 10), pady=10)
+    nombre_cliente = tk.Entry(form_clientes, width=25, font=("Arial", 12), relief="solid", bd=1)
+    nombre_cliente.grid(row=1, column=1, sticky="w", pady=10)
+
+    # Dato 2: Teléfono
+    tk.Label(form_clientes, text="Teléfono:", font=("Arial", 12)).grid(row=3, column=0, sticky="w", padx=(0, 10), pady=10)
+    telefono_cliente = tk.Entry(form_clientes, width=25, font=("Arial", 12), relief="solid", bd=1)
+    telefono_cliente.grid(row=3, column=1, sticky="w", pady=10)
+
+    # Dato 3: Dirección
+    tk.Label(form_clientes, text="Dirección:", font=("Arial", 12)).grid(row=4, column=0, sticky="w", padx=(0, 10), pady=10)
+    direccion_cliente = tk.Entry(form_clientes, width=25, font=("Arial", 12), relief="solid", bd=1)
+    direccion_cliente.grid(row=4, column=1, sticky="w", pady=10)
+
+    # Botones de acción
+    button_frame = tk.Frame(tab_clientes)
+    button_frame.pack(pady=20)
+
+    def guardar_cliente():
+        datos = (nombre_cliente.get(), telefono_cliente.get(), direccion_cliente.get())
+
+        def guardado(cliente_id):
+            nombre_cliente.delete(0, tk.END)
+            telefono_cliente.delete(0, tk.END)
+            direccion_cliente.delete(0, tk.END)
+            tabla_clientes.refrescar_fila(cliente_id)
+            messagebox.showinfo("Guardado", "Cliente guardado correctamente.")
+
+        ejecutor.enviar(lambda: tienda.clientes.crear(*datos),
+                        guardado, grupo=tab_clientes)
+
+    def actualizar_cliente():
+        seleccionado = tree_clientes.focus()
+        if not seleccionado:
+            messagebox.showwarning("Advertencia", "Selecciona un registro para actualizar.")
+            return
+        cliente_id = int(seleccionado)
+        datos = (cliente_id, nombre_cliente.get(), telefono_cliente.get(), direccion_cliente.get())
+
+        def actualizado(_):
+            tabla_clientes.refrescar_fila(cliente_id)
+            messagebox.showinfo("Actualizado", "Cliente actualizado correctamente.")
+
+        ejecutor.enviar(lambda: tienda.clientes.actualizar(*datos),
+                        actualizado, grupo=tab_clientes)
+
+    def eliminar_cliente():
+        seleccionado = tree_clientes.focus()
+        if not seleccionado:
+            messagebox.showwarning("Advertencia", "Selecciona un registro para eliminar.")
+            return
+        cliente_id = int(seleccionado)
+
+        def eliminado(_):
+            tabla_clientes.quitar_fila(cliente_id)
+            messagebox.showinfo("Eliminado", "Cliente eliminado correctamente.")
+
+        ejecutor.enviar(lambda: tienda.clientes.eliminar(cliente_id),
+                        eliminado, grupo=tab_clientes)
+
+    def limpiar_cliente():
+        nombre_cliente.delete(0, tk.END)
+        telefono_cliente.delete(0, tk.END)
+        direccion_cliente.delete(0, tk.END)
+        cargar_clientes()
+        messagebox.showinfo("Limpiar", "Campos de cliente limpiados.")
+
+    btn_save = tk.Button(button_frame, text="Guardar", font=("Arial", 12), bg="#4CAF50", fg="white", width=10)
+    btn_save.pack(side=tk.LEFT, padx=5)
+
+    btn_update = tk.Button(button_frame, text="Actualizar", font=("Arial", 12), bg="#2196F3", fg="white", width=10)
+    btn_update.pack(side=tk.LEFT, padx=5)
+
+    btn_delete = tk.Button(button_frame, text="Eliminar", font=("Arial", 12), bg="#f44336", fg="white", width=10)
+    btn_delete.pack(side=tk.LEFT, padx=5)
+
+    btn_clear = tk.Button(button_frame, text="Limpiar", font=("Arial", 12), bg="#FF9800", fg="white", width=10)
+    btn_clear.pack(side=tk.LEFT, padx=5)
+
+    btn_save.config(command=guardar_cliente)
+    btn_update.config(command=actualizar_cliente)
+    btn_delete.config(command=eliminar_cliente)
+    btn_clear.config(command=limpiar_cliente)
+
+    # PESTAÑA PRODUCTOS 
+    # Filtro de búsqueda por nombre
+    frame_filtro_productos = tk.Frame(tab_productos)
+    frame_filtro_productos.pack(padx=50, pady=(0,10), anchor="w")
+    tk.Label(frame_filtro_productos, text="Buscar por nombre:", font=("Arial", 12)).pack(side=tk.LEFT)
+    filtro_nombre_producto = tk.Entry(frame_filtro_productos, width=20, font=("Arial", 12))
+    filtro_nombre_producto.pack(side=tk.LEFT, padx=5)
+
+    def filtrar_productos():
+        nombre = filtro_nombre_producto.get()
+        if nombre.strip():
+            tabla_productos.buscar(nombre, "nombre", ("nombre", "descripcion"))
+        else:
+            tabla_productos.recargar()
+
+    btn_filtrar_producto = tk.Button(frame_filtro_productos, text="Filtrar", command=filtrar_productos)
+    btn_filtrar_producto.pack(side=tk.LEFT, padx=5)
+    buscar_al_escribir(filtro_nombre_producto, filtrar_productos)
+    total_productos = tk.Label(frame_filtro_productos, text="", font=("Arial", 10), fg="gray")
+    total_productos.pack(side=tk.LEFT, padx=5)
+    titulo_productos = tk.Label(tab_productos, text="Gestión de Productos", font=("Arial", 16, "bold"), fg="green")
+    titulo_productos.pack(pady=20)
+
+    form_productos = tk.Frame(tab_productos)
+    form_productos.pack(pady=20, anchor="w", padx=50)
+
+    # Treeview para mostrar registros de productos
+    # Treeview para mostrar registros de productos
+    marco_tree_productos = tk.Frame(tab_productos)
+    marco_tree_productos.pack(fill="x", padx=50, pady=10)
+    tree_productos = ttk.Treeview(marco_tree_productos)
+    tree_productos.pack(side=tk.LEFT, fill="x", expand=True)
+    scroll_productos = ttk.Scrollbar(marco_tree_productos, orient="vertical", command=tree_productos.yview)
+    scroll_productos.pack(side=tk.RIGHT, fill="y")
+    tree_productos['columns'] = ('producto_id', 'nombre', 'descripcion', 'precio', 'stock', 'categoria_id', 'version')
+    # La version solo se usa para detectar ediciones concurrentes, no se muestra
+    tree_productos['displaycolumns'] = ('producto_id', 'nombre', 'descripcion', 'precio', 'stock', 'categoria_id')
+    tree_productos['show'] = 'headings'
+    for col in tree_productos['displaycolumns']:
+        tree_productos.heading(col, text=col)
+        tree_productos.column(col, width=120)
+
+    # Solo se mantiene en memoria una ventana de filas; el resto se pide al desplazarse
+    tabla_productos = TablaPaginada(tree_productos, db, ejecutor, "Productos", "producto_id", grupo=tab_productos,
+                                    scrollbar=scroll_productos, etiqueta=total_productos,
+                                    cache=cache_consultas, ordenables=('producto_id', 'nombre', 'precio', 'stock'))
+
+    def copiar_a_formulario_producto(event):
+        seleccionado = tree_productos.focus()
+        if seleccionado:
+            valores = tree_productos.item(seleccionado, 'values')
+            nombre_producto.delete(0, tk.END)
+            descripcion_producto.delete(0, tk.END)
+            precio_producto.delete(0, tk.END)
+            stock_producto.delete(0, tk.END)
+            categoria_producto.delete(0, tk.END)
+            nombre_producto.insert(0, valores[1])
+            descripcion_producto.insert(0, valores[2])
+            precio_producto.insert(0, valores[3])
+            stock_producto.insert(0, valores[4])
+            categoria_producto.insert(0, valores[5])
+
+    tree_productos.bind('<<TreeviewSelect>>', copiar_a_formulario_producto)
+
+    def cargar_productos():
+        tabla_productos.recargar(usar_cache=False)
+
+    # Dato 1 : Nombre
+    tk.Label(form_productos, text="Nombre:", font=("Arial", 12)).grid(row=1, column=0, sticky="w", padx=(0, 10), pady=10)
+    nombre_producto = tk.Entry(form_productos, width=25, font=("Arial", 12), relief="solid", bd=1)
+    nombre_producto.grid(row=1, column=1, sticky="w", pady=10)
+
+    # Dato 2: Descripción
+    tk.Label(form_productos, text="Descripción:", font=("Arial", 12)).grid(row=2, column=0, sticky="w", padx=(0, 10), pady=10)
+    descripcion_producto = tk.Entry(form_productos, width=25, font=("Arial", 12), relief="solid", bd=1)
+    descripcion_producto.grid(row=2, column=1, sticky="w", pady=10)
+
+    # Dato 3: Precio
+    tk.Label(form_productos, text="Precio:", font=("Arial", 12)).grid(row=3, column=0, sticky="w", padx=(0, 10), pady=10)
+    precio_producto = tk.Entry(form_productos, width=25, font=("Arial", 12), relief="solid", bd=1)
+    precio_producto.grid(row=3, column=1, sticky="w", pady=10)
+
+    # Dato 4: Stock
+    tk.Label(form_productos, text="Stock:", font=("Arial", 12)).grid(row=4, column=0, sticky="w", padx=(0, 10), pady=10)
+    stock_producto = tk.Entry(form_productos, width=25, font=("Arial", 12), relief="solid", bd=1)
+    stock_producto.grid(row=4, column=1, sticky="w", pady=10)
+
+    # Dato 5: Categoría
+    tk.Label(form_productos, text="Categoría ID:", font=("Arial", 12)).grid(row=5, column=0, sticky="w", padx=(0, 10), pady=10)
+    categoria_producto = tk.Entry(form_productos, width=25, font=("Arial", 12), relief="solid", bd=1)
+    categoria_producto.grid(row=5, column=1, sticky="w", pady=10)
+
+    # Botones de acción
+    button_productos = tk.Frame(tab_productos)
+    button_productos.pack(pady=20)
+    def guardar_producto():
+        datos = (nombre_producto.get(), descripcion_producto.get(), precio_producto.get(), stock_producto.get(),
+                 categoria_producto.get() or None)
+
+        def guardado(producto_id):
+            nombre_producto.delete(0, tk.END)
+            descripcion_producto.delete(0, tk.END)
+            precio_producto.delete(0, tk.END)
+            stock_producto.delete(0, tk.END)
+            categoria_producto.delete(0, tk.END)
+            tabla_productos.refrescar_fila(producto_id)
+            messagebox.showinfo("Guardado", "Producto guardado correctamente.")
+
+        ejecutor.enviar(lambda: tienda.productos.crear(*datos),
+                        guardado, grupo=tab_productos)
+
+    def actualizar_producto():
+        seleccionado = tree_productos.focus()
+        if not seleccionado:
+            messagebox.showwarning("Advertencia", "Selecciona un registro para actualizar.")
+            return
+        producto_id = int(seleccionado)
+        valores = tree_productos.item(seleccionado, 'values')
+        try:
+            # El stock se guarda como diferencia sobre lo leido para no pisar ventas de otras terminales
+            cambio_stock = int(stock_producto.get()) - int(valores[4])
+        except ValueError:
+            messagebox.showwarning("Advertencia", "El stock debe ser un número entero.")
+            return
+        datos = (producto_id, int(valores[6]), nombre_producto.get(), descripcion_producto.get(),
+                 precio_producto.get(), categoria_producto.get() or None, cambio_stock)
+
+        def actualizado(aplicado):
+            tabla_productos.refrescar_fila(producto_id)
+            if aplicado:
+                messagebox.showinfo("Actualizado", "Producto actualizado correctamente.")
+            else:
+                messagebox.showwarning("Conflicto", "Otra terminal modificó este producto. "
+                                       "Se han cargado los datos actuales; revisa y vuelve a guardar.")
+
+        ejecutor.enviar(lambda: tienda.productos.actualizar(*datos), actualizado, grupo=tab_productos)
+
+    def eliminar_producto():
+        seleccionado = tree_productos.focus()
+        if not seleccionado:
+            messagebox.showwarning("Advertencia", "Selecciona un registro para eliminar.")
+            return
+        producto_id = int(seleccionado)
+
+        def eliminado(_):
+            nombre_producto.delete(0, tk.END)
+            descripcion_producto.delete(0, tk.END)
+            precio_producto.delete(0, tk.END)
+            stock_producto.delete(0, tk.END)
+            categoria_producto.delete(0, tk.END)
+            tabla_productos.quitar_fila(producto_id)
+            messagebox.showinfo("Eliminado", "Producto eliminado correctamente.")
+
+        ejecutor.enviar(lambda: tienda.productos.eliminar(producto_id),
+                        eliminado, grupo=tab_productos)
+
+    def limpiar_producto():
+        nombre_producto.delete(0, tk.END)
+        descripcion_producto.delete(0, tk.END)
+        precio_producto.delete(0, tk.END)
+        stock_producto.delete(0, tk.END)
+        categoria_producto.delete(0, tk.END)
+        cargar_productos()
+        messagebox.showinfo("Limpiar", "Campos de producto limpiados.")
+
+    btn_save_producto = tk.Button(button_productos, text="Guardar", font=("Arial", 12), bg="#4CAF50", fg="white", width=10)
+    btn_save_producto.pack(side=tk.LEFT, padx=5)
+
+    btn_update_producto = tk.Button(button_productos, text="Actualizar", font=("Arial", 12), bg="#2196F3", fg="white", width=10)
+    btn_update_producto.pack(side=tk.LEFT, padx=5)
+
+    btn_delete_producto = tk.Button(button_productos, text="Eliminar", font=("Arial", 12), bg="#f44336", fg="white", width=10)
+    btn_delete_producto.pack(side=tk.LEFT, padx=5)
+
+    btn_clear_producto = tk.Button(button_productos, text="Limpiar", font=("Arial", 12), bg="#FF9800", fg="white", width=10)
+    btn_clear_producto.pack(side=tk.LEFT, padx=5)
+
+    btn_save_producto.config(command=guardar_producto)
+    btn_update_producto.config(command=actualizar_producto)
+    btn_delete_producto.config(command=eliminar_producto)
+    btn_clear_producto.config(command=limpiar_producto)
+
+    # PESTAÑA CATEGORIAS
+    # Filtro de búsqueda por nombre
+    frame_filtro_categorias = tk.Frame(tab_categorias)
+    frame_filtro_categorias.pack(padx=50, pady=(0,10), anchor="w")
+    tk.Label(frame_filtro_categorias, text="Buscar por nombre:", font=("Arial", 12)).pack(side=tk.LEFT)
+    filtro_nombre_categoria = tk.Entry(frame_filtro_categorias, width=20, font=("Arial", 12))
+    filtro_nombre_categoria.pack(side=tk.LEFT, padx=5)
+
+    def filtrar_categorias():
+        nombre = filtro_nombre_categoria.get()
+        if nombre.strip():
+            tabla_categorias.buscar(nombre, "nombre", ("nombre", "descripcion"))
+        else:
+            tabla_categorias.recargar()
+
+    btn_filtrar_categoria = tk.Button(frame_filtro_categorias, text="Filtrar", command=filtrar_categorias)
+    btn_filtrar_categoria.pack(side=tk.LEFT, padx=5)
+    buscar_al_escribir(filtro_nombre_categoria, filtrar_categorias)
+    total_categorias = tk.Label(frame_filtro_categorias, text="", font=("Arial", 10), fg="gray")
+    total_categorias.pack(side=tk.LEFT, padx=5)
+    titulo_categorias = tk.Label(tab_categorias, text="Gestión de Categorias", font=("Arial", 16, "bold"), fg="purple")
+    titulo_categorias.pack(pady=20)
+
+    form_categorias = tk.Frame(tab_categorias)
+    form_categorias.pack(pady=20, anchor="w", padx=50)
+
+    # Treeview para mostrar registros de categorias
+    # Treeview para mostrar registros de categorias
+    marco_tree_categorias = tk.Frame(tab_categorias)
+    marco_tree_categorias.pack(fill="x", padx=50, pady=10)
+    tree_categorias = ttk.Treeview(marco_tree_categorias)
+    tree_categorias.pack(side=tk.LEFT, fill="x", expand=True)
+    scroll_categorias = ttk.Scrollbar(marco_tree_categorias, orient="vertical", command=tree_categorias.yview)
+    scroll_categorias.pack(side=tk.RIGHT, fill="y")
+    tree_categorias['columns'] = ('categoria_id', 'nombre', 'descripcion')
+    tree_categorias['show'] = 'headings'
+    for col in tree_categorias['columns']:
+        tree_categorias.heading(col, text=col)
+        tree_categorias.column(col, width=120)
+
+    # Solo se mantiene en memoria una ventana de filas; el resto se pide al desplazarse
+    tabla_categorias = TablaPaginada(tree_categorias, db, ejecutor, "Categorias", "categoria_id", grupo=tab_categorias,
+                                     scrollbar=scroll_categorias, etiqueta=total_categorias,
+                                     cache=cache_consultas, ordenables=('categoria_id', 'nombre'))
+
+    def copiar_a_formulario_categoria(event):
+        seleccionado = tree_categorias.focus()
+        if seleccionado:
+            valores = tree_categorias.item(seleccionado, 'values')
+            nombre_categoria.delete(0, tk.END)
+            descripcion_categoria.delete(0, tk.END)
+            nombre_categoria.insert(0, valores[1])
+            descripcion_categoria.insert(0, valores[2])
+
+    tree_categorias.bind('<<TreeviewSelect>>', copiar_a_formulario_categoria)
+
+    def cargar_categorias():
+        tabla_categorias.recargar(usar_cache=False)
+
+    # Dato 1 : Nombre
+    tk.Label(form_categorias, text="Nombre:", font=("Arial", 12)).grid(row=1, column=0, sticky="w", padx=(0, 10), pady=10)
+    nombre_categoria = tk.Entry(form_categorias, width=25, font=("Arial", 12), relief="solid", bd=1)
+    nombre_categoria.grid(row=1, column=1, sticky="w", pady=10)
+
+    # Dato 2: Descripción
+    tk.Label(form_categorias, text="Descripción:", font=("Arial", 12)).grid(row=2, column=0, sticky="w", padx=(0, 10), pady=10)
+    descripcion_categoria = tk.Entry(form_categorias, width=25, font=("Arial", 12), relief="solid", bd=1)
+    descripcion_categoria.grid(row=2, column=1, sticky="w", pady=10)
+
+    # Botones de acción
+    button_categorias = tk.Frame(tab_categorias)
+    button_categorias.pack(pady=20)
+
+    def guardar_categoria():
+        datos = (nombre_categoria.get(), descripcion_categoria.get())
+
+        def guardado(categoria_id):
+            nombre_categoria.delete(0, tk.END)
+            descripcion_categoria.delete(0, tk.END)
+            tabla_categorias.refrescar_fila(categoria_id)
+            messagebox.showinfo("Guardado", "Categoría guardada correctamente.")
+
+        ejecutor.enviar(lambda: tienda.categorias.crear(*datos),
+                        guardado, grupo=tab_categorias)
+
+    def actualizar_categoria():
+        seleccionado = tree_categorias.focus()
+        if not seleccionado:
+            messagebox.showwarning("Advertencia", "Selecciona un registro para actualizar.")
+            return
+        categoria_id = int(seleccionado)
+        datos = (categoria_id, nombre_categoria.get(), descripcion_categoria.get())
+
+        def actualizado(_):
+            tabla_categorias.refrescar_fila(categoria_id)
+            messagebox.showinfo("Actualizado", "Categoría actualizada correctamente.")
+
+        ejecutor.enviar(lambda: tienda.categorias.actualizar(*datos),
+                        actualizado, grupo=tab_categorias)
+
+    def eliminar_categoria():
+        seleccionado = tree_categorias.focus()
+        if not seleccionado:
+            messagebox.showwarning("Advertencia", "Selecciona un registro para eliminar.")
+            return
+        categoria_id = int(seleccionado)
+
+        def eliminado(_):
+            nombre_categoria.delete(0, tk.END)
+            descripcion_categoria.delete(0, tk.END)
+            tabla_categorias.quitar_fila(categoria_id)
+            messagebox.showinfo("Eliminado", "Categoría eliminada correctamente.")
+
+        ejecutor.enviar(lambda: tienda.categorias.eliminar(categoria_id),
+                        eliminado, grupo=tab_categorias)
+
+    def limpiar_categoria():
+        nombre_categoria.delete(0, tk.END)
+        descripcion_categoria.delete(0, tk.END)
+        cargar_categorias()
+        messagebox.showinfo("Limpiar", "Campos de categoría limpiados.")
+
+
+    btn_save_categoria = tk.Button(button_categorias, text="Guardar", font=("Arial", 12), bg="#4CAF50", fg="white", width=10)
+    btn_save_categoria.pack(side=tk.LEFT, padx=5)
+
+    btn_update_categoria = tk.Button(button_categorias, text="Actualizar", font=("Arial", 12), bg="#2196F3", fg="white", width=10)
+    btn_update_categoria.pack(side=tk.LEFT, padx=5)
+
+    btn_delete_categoria = tk.Button(button_categorias, text="Eliminar", font=("Arial", 12), bg="#f44336", fg="white", width=10)
+    btn_delete_categoria.pack(side=tk.LEFT, padx=5)
+
+    btn_clear_categoria = tk.Button(button_categorias, text="Limpiar", font=("Arial", 12), bg="#FF9800", fg="white", width=10)
+    btn_clear_categoria.pack(side=tk.LEFT, padx=5)
+
+    btn_save_categoria.config(command=guardar_categoria)
+    btn_update_categoria.config(command=actualizar_categoria)
+    btn_delete_categoria.config(command=eliminar_categoria)
+    btn_clear_categoria.config(command=limpiar_categoria)
+
+
+    # PESTAÑA VENTAS
+    # Filtro de búsqueda por cliente_id
+    frame_filtro_ventas = tk.Frame(tab_ventas)
+    frame_filtro_ventas.pack(padx=50, pady=(0,10), anchor="w")
+    tk.Label(frame_filtro_ventas, text="Buscar por cliente_id:", font=("Arial", 12)).pack(side=tk.LEFT)
+    filtro_cliente_id_venta = tk.Entry(frame_filtro_ventas, width=20, font=("Arial", 12))
+    filtro_cliente_id_venta.pack(side=tk.LEFT, padx=5)
+
+    # Rango de fechas (aaaa-mm-dd, vacio: sin limite); las ventas archivadas solo se leen si 'desde' llega a ellas
+    tk.Label(frame_filtro_ventas, text="Desde:", font=("Arial", 12)).pack(side=tk.LEFT)
+    filtro_desde_venta = tk.Entry(frame_filtro_ventas, width=11, font=("Arial", 12))
+    filtro_desde_venta.pack(side=tk.LEFT, padx=5)
+    tk.Label(frame_filtro_ventas, text="Hasta:", font=("Arial", 12)).pack(side=tk.LEFT)
+    filtro_hasta_venta = tk.Entry(frame_filtro_ventas, width=11, font=("Arial", 12))
+    filtro_hasta_venta.pack(side=tk.LEFT, padx=5)
+
+    def leer_fecha(entry):
+        texto = entry.get().strip()
+        return date.fromisoformat(texto) if texto else None
+
+    def filtrar_ventas(avisar=True):
+        condiciones, params = [], []
+        cliente_id = filtro_cliente_id_venta.get()
+        if cliente_id.strip():
+            condicion = condicion_id(cliente_id, "cliente_id")
+            if condicion is None:
+                if avisar:
+                    messagebox.showwarning("Advertencia", "El cliente_id debe ser un número.")
+                return
+            condiciones.append(condicion[0])
+            params.extend(condicion[1])
+        try:
+            desde, hasta = leer_fecha(filtro_desde_venta), leer_fecha(filtro_hasta_venta)
+        except ValueError:
+            if avisar:
+                messagebox.showwarning("Advertencia", "Las fechas van en formato aaaa-mm-dd.")
+            return
+        if desde is not None:
+            condiciones.append("fecha >= %s")
+            params.append(desde)
+        if hasta is not None:
+            condiciones.append("fecha < %s")
+            params.append(hasta + timedelta(days=1))
+        if tienda.archivo.origen(desde) == "VentasHistorico":
+            tabla_ventas.usar_origen("VentasHistorico AS Ventas", {'lineas': LINEAS_VENTA_HISTORICO})
+            tabla_lineas_venta.usar_origen("DetalleVentasHistorico AS DetalleVentas")
+        else:
+            tabla_ventas.usar_origen(None)
+            tabla_lineas_venta.usar_origen(None)
+        tabla_ventas.recargar(" AND ".join(condiciones), params)
+
+    btn_filtrar_venta = tk.Button(frame_filtro_ventas, text="Filtrar", command=filtrar_ventas)
+    btn_filtrar_venta.pack(side=tk.LEFT, padx=5)
+    buscar_al_escribir(filtro_cliente_id_venta, lambda: filtrar_ventas(avisar=False))
+    buscar_al_escribir(filtro_desde_venta, lambda: filtrar_ventas(avisar=False))
+    buscar_al_escribir(filtro_hasta_venta, lambda: filtrar_ventas(avisar=False))
+    contador_ventas = tk.Label(frame_filtro_ventas, text="", font=("Arial", 10), fg="gray")
+    contador_ventas.pack(side=tk.LEFT, padx=5)
+    titulo_ventas = tk.Label(tab_ventas, text="Gestión de Pedidos", font=("Arial", 16, "bold"), fg="red")
+    titulo_ventas.pack(pady=20)
+
+    form_ventas = tk.Frame(tab_ventas)
+    form_ventas.pack(pady=20, anchor="w", padx=50)
+
+    # Treeview para mostrar registros de ventas
+    # Treeview para mostrar registros de ventas
+    marco_tree_ventas = tk.Frame(tab_ventas)
+    marco_tree_ventas.pack(fill="x", padx=50, pady=10)
+    tree_ventas = ttk.Treeview(marco_tree_ventas)
+    tree_ventas.pack(side=tk.LEFT, fill="x", expand=True)
+    scroll_ventas = ttk.Scrollbar(marco_tree_ventas, orient="vertical", command=tree_ventas.yview)
+    scroll_ventas.pack(side=tk.RIGHT, fill="y")
+    # Las columnas añadidas van al final para que los indices de 'values' de los formularios no cambien;
+    # cliente_id se guarda en la fila pero se muestra el nombre
+    tree_ventas['columns'] = ('venta_id', 'cliente_id', 'fecha', 'total', 'cliente', 'lineas')
+    tree_ventas['displaycolumns'] = ('venta_id', 'cliente', 'fecha', 'total', 'lineas')
+    tree_ventas['show'] = 'headings'
+    for col in tree_ventas['columns']:
+        tree_ventas.heading(col, text=col)
+        tree_ventas.column(col, width=120)
+
+    # Una consulta por pagina: el numero de lineas sale del indice idx_detalle_venta_lineas y el nombre
+    # del cliente de la cache de nombres (solo los que falten se piden, todos juntos)
+    LINEAS_VENTA = "(SELECT COUNT(*) FROM DetalleVentas d WHERE d.venta_id = Ventas.venta_id)"
+    # Con el rango de fechas en el archivo: las lineas estan en una de las dos tablas, cada una con su indice
+    LINEAS_VENTA_HISTORICO = (LINEAS_VENTA[:-1]
+                              + " + (SELECT COUNT(*) FROM DetalleVentasArchivo d WHERE d.venta_id = Ventas.venta_id))")
+
+    # Solo se mantiene en memoria una ventana de filas; el resto se pide al desplazarse
+    tabla_ventas = TablaPaginada(tree_ventas, db, ejecutor, "Ventas", "venta_id", grupo=tab_ventas,
+                                 scrollbar=scroll_ventas, etiqueta=contador_ventas,
+                                 cache=cache_consultas, expresiones={'lineas': LINEAS_VENTA},
+                                 nombres={'cliente': ('cliente_id', tienda.nombres_clientes.nombres)},
+                                 ordenables=('venta_id', 'fecha', 'total'))
+
+    # Maestro-detalle: al elegir una venta se cargan sus lineas (DetalleVentas por venta_id)
+    marco_lineas_venta = tk.Frame(tab_ventas)
+    tree_lineas_venta = ttk.Treeview(marco_lineas_venta, height=5)
+    tree_lineas_venta.pack(side=tk.LEFT, fill="x", expand=True)
+    scroll_lineas_venta = ttk.Scrollbar(marco_lineas_venta, orient="vertical", command=tree_lineas_venta.yview)
+    scroll_lineas_venta.pack(side=tk.RIGHT, fill="y")
+    tree_lineas_venta['columns'] = ('detalle_id', 'producto_id', 'cantidad', 'precio_unitario', 'producto', 'subtotal')
+    tree_lineas_venta['displaycolumns'] = ('detalle_id', 'producto', 'cantidad', 'precio_unitario', 'subtotal')
+    tree_lineas_venta['show'] = 'headings'
+    for col in tree_lineas_venta['columns']:
+        tree_lineas_venta.heading(col, text=col)
+        tree_lineas_venta.column(col, width=120)
+
+    # Sin cache: las lineas de una venta son pocas y se quieren al dia
+    tabla_lineas_venta = TablaPaginada(tree_lineas_venta, db, ejecutor, "DetalleVentas", "detalle_id",
+                                       grupo=tab_ventas, scrollbar=scroll_lineas_venta,
+                                       expresiones={'subtotal': "cantidad * precio_unitario"},
+                                       nombres={'producto': ('producto_id', tienda.catalogo.nombres)})
+    ver_lineas_venta = tk.BooleanVar(value=False)
+
+    def mostrar_lineas_venta():
+        if ver_lineas_venta.get():
+            marco_lineas_venta.pack(after=marco_tree_ventas, fill="x", padx=50, pady=(0, 10))
+            cargar_lineas_venta()
+        else:
+            marco_lineas_venta.pack_forget()
+
+    def cargar_lineas_venta():
+        seleccionado = tree_ventas.focus()
+        if not ver_lineas_venta.get() or not seleccionado:
+            return
+        tabla_lineas_venta.recargar("venta_id = %s", (int(seleccionado),))
+
+    tk.Checkbutton(frame_filtro_ventas, text="Ver líneas de la venta", variable=ver_lineas_venta,
+                   command=mostrar_lineas_venta).pack(side=tk.LEFT, padx=5)
+
+    def copiar_a_formulario_venta(event):
+        seleccionado = tree_ventas.focus()
+        if seleccionado:
+            valores = tree_ventas.item(seleccionado, 'values')
+            fecha_ventas.delete(0, tk.END)
+            total_ventas.delete(0, tk.END)
+            poner_id(cliente_id_ventas, valores[1], tienda.nombres_clientes.nombre)
+            fecha_ventas.insert(0, valores[2])
+            total_ventas.insert(0, valores[3])
+            cargar_lineas_venta()
+
+    tree_ventas.bind('<<TreeviewSelect>>', copiar_a_formulario_venta)
+
+    def cargar_ventas():
+        # Sin filtro solo se leen las ventas que no estan archivadas
+        tabla_ventas.usar_origen(None)
+        tabla_lineas_venta.usar_origen(None)
+        tabla_ventas.recargar(usar_cache=False)
+
+    # Dato 1 : Cliente ID
+    tk.Label(form_ventas, text="Cliente:", font=("Arial", 12)).grid(row=1, column=0, sticky="w", padx=(0, 10), pady=10)
+    cliente_id_ventas = Selector(form_ventas, tienda.nombres_clientes.buscar, width=24, font=("Arial", 12))
+    cliente_id_ventas.grid(row=1, column=1, sticky="w", pady=10)
+
+    # Dato 2: Fecha Pedido
+    tk.Label(form_ventas, text="Fecha venta:", font=("Arial", 12)).grid(row=2, column=0, sticky="w", padx=(0, 10), pady=10)
+    from tkcalendar import DateEntry
+    fecha_ventas = DateEntry(form_ventas, width=25, font=("Arial", 12), relief="solid", bd=1, date_pattern='y-mm-dd')
+    fecha_ventas.grid(row=2, column=1, sticky="w", pady=10)
+
+    # Dato 3: Total
+    tk.Label(form_ventas, text="Total:", font=("Arial", 12)).grid(row=3, column=0, sticky="w", padx=(0, 10), pady=10)
+    total_ventas = tk.Entry(form_ventas, width=25, font=("Arial", 12), relief="solid", bd=1)
+    total_ventas.grid(row=3, column=1, sticky="w", pady=10)
+
+    # Botones de acción
+    button_ventas = tk.Frame(tab_ventas)
+    button_ventas.pack(pady=20)
+    def guardar_venta():
+        cliente_id = id_valido(cliente_id_ventas, existe_cliente, "cliente")
+        if cliente_id is False:
+            return
+        datos = (cliente_id, fecha_ventas.get(), total_ventas.get())
+        try:
+            id_local = sincronizador.anotar_venta(*datos)
+        except ErrorVenta as e:
+            messagebox.showwarning("Advertencia", str(e))
+            return
+        except Exception as e:
+            messagebox.showerror("Error", f"No se pudo anotar la venta: {e}")
+            return
+        cliente_id_ventas.delete(0, tk.END)
+        fecha_ventas.delete(0, tk.END)
+        total_ventas.delete(0, tk.END)
+        messagebox.showinfo("Guardado", f"Venta {referencia_local(id_local)} guardada correctamente. "
+                                        "Para añadirle detalle antes de que se envíe usa ese número como Venta ID.")
+
+    def actualizar_venta():
+        seleccionado = tree_ventas.focus()
+        if not seleccionado:
+            messagebox.showwarning("Advertencia", "Selecciona un registro para actualizar.")
+            return
+        venta_id = int(seleccionado)
+        cliente_id = id_valido(cliente_id_ventas, existe_cliente, "cliente")
+        if cliente_id is False:
+            return
+        datos = (venta_id, cliente_id, fecha_ventas.get(), total_ventas.get())
+
+        def actualizado(_):
+            tabla_ventas.refrescar_fila(venta_id)
+            messagebox.showinfo("Actualizado", "Venta actualizada correctamente.")
+
+        ejecutor.enviar(lambda: tienda.ventas.actualizar(*datos), actualizado, grupo=tab_ventas)
+
+    def eliminar_venta():
+        seleccionado = tree_ventas.focus()
+        if not seleccionado:
+            messagebox.showwarning("Advertencia", "Selecciona un registro para eliminar.")
+            return
+        venta_id = int(seleccionado)
+
+        def eliminado(_):
+            cliente_id_ventas.delete(0, tk.END)
+            fecha_ventas.delete(0, tk.END)
+            total_ventas.delete(0, tk.END)
+            tabla_ventas.quitar_fila(venta_id)
+            messagebox.showinfo("Eliminado", "Venta eliminada correctamente.")
+
+        ejecutor.enviar(lambda: tienda.ventas.eliminar(venta_id), eliminado, grupo=tab_ventas)
+
+    def limpiar_venta():
+        cliente_id_ventas.delete(0, tk.END)
+        fecha_ventas.delete(0, tk.END)
+        total_ventas.delete(0, tk.END)
+        cargar_ventas()
+        messagebox.showinfo("Limpiar", "Campos de venta limpiados.")
+
+
+    btn_save_venta = tk.Button(button_ventas, text="Guardar", font=("Arial", 12), bg="#4CAF50", fg="white", width=10)
+    btn_save_venta.pack(side=tk.LEFT, padx=5)
+
+    btn_update_venta = tk.Button(button_ventas, text="Actualizar", font=("Arial", 12), bg="#2196F3", fg="white", width=10)
+    btn_update_venta.pack(side=tk.LEFT, padx=5)
+
+    btn_delete_venta = tk.Button(button_ventas, text="Eliminar", font=("Arial", 12), bg="#f44336", fg="white", width=10)
+    btn_delete_venta.pack(side=tk.LEFT, padx=5)
+
+    btn_clear_venta= tk.Button(button_ventas, text="Limpiar", font=("Arial", 12), bg="#FF9800", fg="white", width=10)
+    btn_clear_venta.pack(side=tk.LEFT, padx=5)
+
+
+    btn_save_venta.config(command=guardar_venta)
+    btn_update_venta.config(command=actualizar_venta)
+    btn_delete_venta.config(command=eliminar_venta)
+    btn_clear_venta.config(command=limpiar_venta)
+
+    # Carrito: varias lineas que se cobran juntas en una sola transaccion
+    frame_carrito = tk.LabelFrame(form_ventas, text="Carrito", font=("Arial", 12))
+    frame_carrito.grid(row=1, column=2, rowspan=3, sticky="n", padx=(40, 0))
+
+    tk.Label(frame_carrito, text="Producto:", font=("Arial", 10)).grid(row=0, column=0, sticky="w")
+    producto_id_carrito = Selector(frame_carrito, tienda.catalogo.buscar, width=20, font=("Arial", 10),
+                                   al_elegir=lambda producto_id: poner_precio(precio_carrito, producto_id))
+    producto_id_carrito.grid(row=0, column=1, padx=5)
+    tk.Label(frame_carrito, text="Cantidad:", font=("Arial", 10)).grid(row=0, column=2, sticky="w")
+    cantidad_carrito = tk.Entry(frame_carrito, width=6, font=("Arial", 10), relief="solid", bd=1)
+    cantidad_carrito.grid(row=0, column=3, padx=5)
+    tk.Label(frame_carrito, text="Precio:", font=("Arial", 10)).grid(row=0, column=4, sticky="w")
+    precio_carrito = tk.Entry(frame_carrito, width=8, font=("Arial", 10), relief="solid", bd=1)
+    precio_carrito.grid(row=0, column=5, padx=5)
+
+    tree_carrito = ttk.Treeview(frame_carrito, height=4)
+    tree_carrito['columns'] = ('producto_id', 'cantidad', 'precio_unitario')
+    tree_carrito['show'] = 'headings'
+    for col in tree_carrito['columns']:
+        tree_carrito.heading(col, text=col)
+        tree_carrito.column(col, width=90)
+    tree_carrito.grid(row=1, column=0, columnspan=6, pady=5)
+
+    def anadir_al_carrito():
+        producto_id = id_valido(producto_id_carrito, existe_producto, "producto")
+        if producto_id is None:
+            messagebox.showwarning("Advertencia", "Elige un producto.")
+        if not producto_id:
+            return
+        try:
+            cantidad = int(cantidad_carrito.get())
+            # Sin precio escrito se toma el del catalogo en memoria, sin consultar al servidor
+            precio = Decimal(precio_carrito.get()) if precio_carrito.get().strip() else tienda.catalogo.precio(producto_id)
+        except (ValueError, InvalidOperation):
+            messagebox.showwarning("Advertencia", "Cantidad y precio deben ser números.")
+            return
+        if precio is None:
+            messagebox.showwarning("Advertencia", f"El producto {producto_id} no está en el catálogo; escribe el precio.")
+            return
+        stock = tienda.catalogo.stock(producto_id)
+        if stock is not None and stock < cantidad:
+            if not messagebox.askyesno("Stock", f"Solo quedan {stock} unidades del producto {producto_id}. "
+                                                "¿Añadir igualmente?"):
+                return
+        linea = (producto_id, cantidad, precio)
+        tree_carrito.insert('', 'end', values=linea)
+        producto_id_carrito.delete(0, tk.END)
+        cantidad_carrito.delete(0, tk.END)
+        precio_carrito.delete(0, tk.END)
+
+    def quitar_del_carrito():
+        seleccionado = tree_carrito.focus()
+        if seleccionado:
+            tree_carrito.delete(seleccionado)
+
+    def cobrar_venta():
+        carrito = [tree_carrito.item(linea, 'values') for linea in tree_carrito.get_children()]
+        cliente_id = id_valido(cliente_id_ventas, existe_cliente, "cliente")
+        if cliente_id is False:
+            return
+        # Si la fecha es la de hoy la venta lleva la hora en que se cobra
+        fecha = fecha_ventas.get_date()
+        fecha = None if fecha == date.today() else fecha
+        try:
+            id_local = sincronizador.anotar_cobro(cliente_id, carrito, fecha)
+        except ErrorVenta as e:
+            messagebox.showwarning("Advertencia", str(e))
+            return
+        except Exception as e:
+            messagebox.showerror("Error", f"No se pudo anotar la venta: {e}")
+            return
+        # El stock se comprueba al enviarla; aqui solo se suma el carrito
+        total = sum(int(cantidad) * Decimal(precio) for _, cantidad, precio in carrito)
+        tree_carrito.delete(*tree_carrito.get_children())
+        messagebox.showinfo("Cobrado", f"Venta {referencia_local(id_local)} registrada. Total: {total}")
+
+    botones_carrito = tk.Frame(frame_carrito)
+    botones_carrito.grid(row=2, column=0, columnspan=6)
+    tk.Button(botones_carrito, text="Añadir", font=("Arial", 10), command=anadir_al_carrito).pack(side=tk.LEFT, padx=5)
+    tk.Button(botones_carrito, text="Quitar", font=("Arial", 10), command=quitar_del_carrito).pack(side=tk.LEFT, padx=5)
+    tk.Button(botones_carrito, text="Cobrar", font=("Arial", 10), bg="#4CAF50", fg="white",
+              command=cobrar_venta).pack(side=tk.LEFT, padx=5)
+
+    # PESTAÑA DETALLE PEDIDO
+    # Filtro de búsqueda por venta_id
+    frame_filtro_detalle = tk.Frame(tab_detalle_ventas)
+    frame_filtro_detalle.pack(padx=50, pady=(0,10), anchor="w")
+    tk.Label(frame_filtro_detalle, text="Buscar por venta_id:", font=("Arial", 12)).pack(side=tk.LEFT)
+    filtro_venta_id_detalle = tk.Entry(frame_filtro_detalle, width=20, font=("Arial", 12))
+    filtro_venta_id_detalle.pack(side=tk.LEFT, padx=5)
+
+    def filtrar_detalle(avisar=True):
+        venta_id = filtro_venta_id_detalle.get()
+        if not venta_id.strip():
+            tabla_detalle.recargar()
+            return
+        condicion = condicion_id(venta_id, "venta_id")
+        if condicion is None:
+            if avisar:
+                messagebox.showwarning("Advertencia", "El venta_id debe ser un número.")
+            return
+        tabla_detalle.recargar(*condicion)
+
+    btn_filtrar_detalle = tk.Button(frame_filtro_detalle, text="Filtrar", command=filtrar_detalle)
+    btn_filtrar_detalle.pack(side=tk.LEFT, padx=5)
+    buscar_al_escribir(filtro_venta_id_detalle, lambda: filtrar_detalle(avisar=False))
+    total_detalle = tk.Label(frame_filtro_detalle, text="", font=("Arial", 10), fg="gray")
+    total_detalle.pack(side=tk.LEFT, padx=5)
+    titulo_detalle = tk.Label(tab_detalle_ventas, text="Gestión de Detalle Ventas", font=("Arial", 16, "bold"), fg="orange")
+    titulo_detalle.pack(pady=20)
+
+    form_detalle = tk.Frame(tab_detalle_ventas)
+    form_detalle.pack(pady=20, anchor="w", padx=50)
+
+    # Treeview para mostrar registros de detalle ventas
+    # Treeview para mostrar registros de detalle ventas
+    marco_tree_detalle = tk.Frame(tab_detalle_ventas)
+    marco_tree_detalle.pack(fill="x", padx=50, pady=10)
+    tree_detalle = ttk.Treeview(marco_tree_detalle)
+    tree_detalle.pack(side=tk.LEFT, fill="x", expand=True)
+    scroll_detalle = ttk.Scrollbar(marco_tree_detalle, orient="vertical", command=tree_detalle.yview)
+    scroll_detalle.pack(side=tk.RIGHT, fill="y")
+    tree_detalle['columns'] = ('detalle_id', 'venta_id', 'producto_id', 'cantidad', 'precio_unitario',
+                               'producto', 'subtotal')
+    tree_detalle['displaycolumns'] = ('detalle_id', 'venta_id', 'producto', 'cantidad', 'precio_unitario', 'subtotal')
+    tree_detalle['show'] = 'headings'
+    for col in tree_detalle['columns']:
+        tree_detalle.heading(col, text=col)
+        tree_detalle.column(col, width=120)
+
+    # Solo se mantiene en memoria una ventana de filas; el resto se pide al desplazarse.
+    # El nombre del producto sale del catalogo en memoria y el subtotal lo calcula la consulta
+    tabla_detalle = TablaPaginada(tree_detalle, db, ejecutor, "DetalleVentas", "detalle_id", grupo=tab_detalle_ventas,
+                                  scrollbar=scroll_detalle, etiqueta=total_detalle,
+                                  cache=cache_consultas, expresiones={'subtotal': "cantidad * precio_unitario"},
+                                  nombres={'producto': ('producto_id', tienda.catalogo.nombres)},
+                                  ordenables=('detalle_id',))
+
+    def copiar_a_formulario_detalle(event):
+        seleccionado = tree_detalle.focus()
+        if seleccionado:
+            valores = tree_detalle.item(seleccionado, 'values')
+            venta_id_detalle.delete(0, tk.END)
+            cantidad_detalle.delete(0, tk.END)
+            precio_unitario_detalle.delete(0, tk.END)
+            venta_id_detalle.insert(0, valores[1])
+            poner_id(producto_id_detalle, valores[2], tienda.catalogo.nombre)
+            cantidad_detalle.insert(0, valores[3])
+            precio_unitario_detalle.insert(0, valores[4])
+
+    tree_detalle.bind('<<TreeviewSelect>>', copiar_a_formulario_detalle)
+
+    def cargar_detalle():
+        tabla_detalle.recargar(usar_cache=False)
+
+    # Dato 1 : Venta ID
+    tk.Label(form_detalle, text="Venta ID:", font=("Arial", 12)).grid(row=1, column=0, sticky="w", padx=(0, 10), pady=10)
+    venta_id_detalle = tk.Entry(form_detalle, width=25, font=("Arial", 12), relief="solid", bd=1)
+    venta_id_detalle.grid(row=1, column=1, sticky="w", pady=10)
+
+    # Dato 2: Producto ID
+    tk.Label(form_detalle, text="Producto:", font=("Arial", 12)).grid(row=2, column=0, sticky="w", padx=(0, 10), pady=10)
+    producto_id_detalle = Selector(form_detalle, tienda.catalogo.buscar, width=24, font=("Arial", 12),
+                                   al_elegir=lambda producto_id: poner_precio(precio_unitario_detalle, producto_id))
+    producto_id_detalle.grid(row=2, column=1, sticky="w", pady=10)
+
+    # Dato 3: Cantidad
+    tk.Label(form_detalle, text="Cantidad:", font=("Arial", 12)).grid(row=3, column=0, sticky="w", padx=(0, 10), pady=10)
+    cantidad_detalle = tk.Entry(form_detalle, width=25, font=("Arial", 12), relief="solid", bd=1)
+    cantidad_detalle.grid(row=3, column=1, sticky="w", pady=10)
+
+    # Dato 4: Precio Unitario
+    tk.Label(form_detalle, text="Precio Unitario:", font=("Arial", 12)).grid(row=4, column=0, sticky="w", padx=(0, 10), pady=10)
+    precio_unitario_detalle = tk.Entry(form_detalle, width=25, font=("Arial", 12), relief="solid", bd=1)
+    precio_unitario_detalle.grid(row=4, column=1, sticky="w", pady=10)
+
+    # Botones de acción
+    button_detalle = tk.Frame(tab_detalle_ventas)
+    button_detalle.pack(pady=20)
+    def campos_detalle():
+        """(venta_id, producto_id, precio) del formulario comprobados en memoria; None tras avisar si falta algo"""
+        venta_id = venta_id_detalle.get().strip().upper()
+        # Una venta guardada sin conexion se indica con su referencia local (L12)
+        if not (venta_id[1:] if venta_id.startswith("L") else venta_id).isdigit():
+            messagebox.showwarning("Advertencia", "Venta ID debe ser un número o una referencia local como L12.")
+            return None
+        producto_id = id_valido(producto_id_detalle, existe_producto, "producto")
+        if producto_id is None:
+            messagebox.showwarning("Advertencia", "Elige un producto.")
+        if not producto_id:
+            return None
+        precio = precio_unitario_detalle.get()
+        if not precio.strip():
+            # Sin precio escrito se usa el del catalogo en memoria
+            precio = tienda.catalogo.precio(producto_id)
+            if precio is None:
+                messagebox.showwarning("Advertencia", "El producto no está en el catálogo; escribe el precio unitario.")
+                return None
+        return (int(venta_id) if venta_id.isdigit() else venta_id), producto_id, precio
+
+    def guardar_detalle():
+        campos = campos_detalle()
+        if campos is None:
+            return
+        venta_id, producto_id, precio = campos
+        datos = (venta_id, producto_id, cantidad_detalle.get(), precio)
+        try:
+            sincronizador.anotar_detalle(*datos)
+        except ErrorVenta as e:
+            messagebox.showwarning("Advertencia", str(e))
+            return
+        except Exception as e:
+            messagebox.showerror("Error", f"No se pudo anotar el detalle: {e}")
+            return
+        venta_id_detalle.delete(0, tk.END)
+        producto_id_detalle.delete(0, tk.END)
+        cantidad_detalle.delete(0, tk.END)
+        precio_unitario_detalle.delete(0, tk.END)
+        messagebox.showinfo("Guardado", "Detalle de venta guardado correctamente.")
+
+    def actualizar_detalle():
+        seleccionado = tree_detalle.focus()
+        if not seleccionado:
+            messagebox.showwarning("Advertencia", "Selecciona un registro para actualizar.")
+            return
+        detalle_id = int(seleccionado)
+        venta_anterior = tree_detalle.item(seleccionado, 'values')[1]
+        campos = campos_detalle()
+        if campos is None:
+            return
+        venta_id, producto_id, precio = campos
+        if not isinstance(venta_id, int):
+            messagebox.showwarning("Advertencia", "La venta todavía no se ha enviado al servidor; espera a que tenga número.")
+            return
+        datos = (detalle_id, venta_id, producto_id, cantidad_detalle.get(), precio)
+
+        def actualizado(_):
+            tabla_detalle.refrescar_fila(detalle_id)
+            # El numero de lineas de la venta (o de las dos, si la linea cambio de venta)
+            tabla_ventas.refrescar_filas([v for v in (venta_anterior, venta_id) if str(v).isdigit()])
+            messagebox.showinfo("Actualizado", "Detalle de venta actualizado correctamente.")
+
+        ejecutor.enviar(lambda: tienda.detalle.actualizar(*datos, venta_anterior=venta_anterior),
+                        actualizado, grupo=tab_detalle_ventas)
+
+    def eliminar_detalle():
+        seleccionado = tree_detalle.focus()
+        if not seleccionado:
+            messagebox.showwarning("Advertencia", "Selecciona un registro para eliminar.")
+            return
+        detalle_id = int(seleccionado)
+        venta_id = tree_detalle.item(seleccionado, 'values')[1]
+
+        def eliminado(_):
+            venta_id_detalle.delete(0, tk.END)
+            producto_id_detalle.delete(0, tk.END)
+            cantidad_detalle.delete(0, tk.END)
+            precio_unitario_detalle.delete(0, tk.END)
+            tabla_detalle.quitar_fila(detalle_id)
+            if str(venta_id).isdigit():
+                tabla_ventas.refrescar_fila(venta_id)
+            messagebox.showinfo("Eliminado", "Detalle de venta eliminado correctamente.")
+
+        ejecutor.enviar(lambda: tienda.detalle.eliminar(detalle_id, venta_id), eliminado, grupo=tab_detalle_ventas)
+
+    def limpiar_detalle():
+        venta_id_detalle.delete(0, tk.END)
+        producto_id_detalle.delete(0, tk.END)
+        cantidad_detalle.delete(0, tk.END)
+        precio_unitario_detalle.delete(0, tk.END)
+        cargar_detalle()
+        messagebox.showinfo("Limpiar", "Campos de detalle de venta limpiados.")
+
+
+    btn_save_detalle = tk.Button(button_detalle, text="Guardar", font=("Arial", 12), bg="#4CAF50", fg="white", width=10)
+    btn_save_detalle.pack(side=tk.LEFT, padx=5)
+
+    btn_update_detalle = tk.Button(button_detalle, text="Actualizar", font=("Arial", 12), bg="#2196F3", fg="white", width=10)
+    btn_update_detalle.pack(side=tk.LEFT, padx=5)
+
+    btn_delete_detalle = tk.Button(button_detalle, text="Eliminar", font=("Arial", 12), bg="#f44336", fg="white", width=10)
+    btn_delete_detalle.pack(side=tk.LEFT, padx=5)
+
+    btn_clear_detalle = tk.Button(button_detalle, text="Limpiar", font=("Arial", 12), bg="#FF9800", fg="white", width=10)
+    btn_clear_detalle.pack(side=tk.LEFT, padx=5)
+
+    btn_save_detalle.config(command=guardar_detalle)
+    btn_update_detalle.config(command=actualizar_detalle)
+    btn_delete_detalle.config(command=eliminar_detalle)
+    btn_clear_detalle.config(command=limpiar_detalle)
+
+    # PESTAÑA REPORTES
+    # Los informes se calculan con GROUP BY sobre el resumen diario VentasDiarias
+    titulo_reportes = tk.Label(tab_reportes, text="Reportes de Ventas", font=("Arial", 16, "bold"), fg="purple")
+    titulo_reportes.pack(pady=20)
+
+    form_reportes = tk.Frame(tab_reportes)
+    form_reportes.pack(anchor="w", padx=50)
+
+    tk.Label(form_reportes, text="Informe:", font=("Arial", 12)).grid(row=0, column=0, sticky="w", padx=(0, 10), pady=10)
+    informe_reporte = ttk.Combobox(form_reportes, values=list(INFORMES), state="readonly", width=25, font=("Arial", 12))
+    informe_reporte.current(0)
+    informe_reporte.grid(row=0, column=1, sticky="w", pady=10)
+
+    tk.Label(form_reportes, text="Desde:", font=("Arial", 12)).grid(row=0, column=2, sticky="w", padx=(20, 10), pady=10)
+    desde_reporte = DateEntry(form_reportes, width=12, font=("Arial", 12), relief="solid", bd=1, date_pattern='y-mm-dd')
+    desde_reporte.set_date(date.today().replace(day=1))
+    desde_reporte.grid(row=0, column=3, sticky="w", pady=10)
+
+    tk.Label(form_reportes, text="Hasta:", font=("Arial", 12)).grid(row=0, column=4, sticky="w", padx=(20, 10), pady=10)
+    hasta_reporte = DateEntry(form_reportes, width=12, font=("Arial", 12), relief="solid", bd=1, date_pattern='y-mm-dd')
+    hasta_reporte.grid(row=0, column=5, sticky="w", pady=10)
+
+    marco_tree_reportes = tk.Frame(tab_reportes)
+    marco_tree_reportes.pack(fill="x", padx=50, pady=10)
+    tree_reportes = ttk.Treeview(marco_tree_reportes, show='headings')
+    tree_reportes.pack(side=tk.LEFT, fill="x", expand=True)
+    scroll_reportes = ttk.Scrollbar(marco_tree_reportes, orient="vertical", command=tree_reportes.yview)
+    scroll_reportes.pack(side=tk.RIGHT, fill="y")
+    tree_reportes.configure(yscrollcommand=scroll_reportes.set)
+
+    ultimo_reporte = [(), []]  # columnas y filas del ultimo informe, para copiarlo
+
+    def generar_reporte():
+        funcion = INFORMES[informe_reporte.get()]
+        desde, hasta = desde_reporte.get_date(), hasta_reporte.get_date()
+
+        def generado(resultado):
+            columnas, filas = resultado
+            ultimo_reporte[:] = [columnas, filas]
+            tree_reportes.delete(*tree_reportes.get_children())
+            tree_reportes['columns'] = columnas
+            for col in columnas:
+                tree_reportes.heading(col, text=col)
+                tree_reportes.column(col, width=150)
+            for fila in filas:
+                tree_reportes.insert('', 'end', values=fila)
+
+        ejecutor.enviar(lambda: funcion(db, desde, hasta), generado, clave=tree_reportes, grupo=tab_reportes)
+
+    def copiar_reporte():
+        columnas, filas = ultimo_reporte
+        if not filas:
+            messagebox.showwarning("Advertencia", "Genera un informe antes de copiarlo.")
+            return
+        root.clipboard_clear()
+        from tabulate import tabulate  # solo hace falta al copiar un informe
+        root.clipboard_append(tabulate(filas, headers=columnas))
+        messagebox.showinfo("Copiado", "Informe copiado al portapapeles.")
+
+    def reconstruir_reporte():
+        if not messagebox.askyesno("Reconstruir", "¿Recalcular todo el resumen diario a partir de DetalleVentas?"):
+            return
+
+        def reconstruido(filas):
+            messagebox.showinfo("Reconstruir", f"Resumen diario recalculado: {filas} filas.")
+            generar_reporte()
+
+        ejecutor.enviar(lambda: reconstruir_resumen(db), reconstruido, grupo=tab_reportes)
+
+    button_reportes = tk.Frame(tab_reportes)
+    button_reportes.pack(pady=20)
+    tk.Button(button_reportes, text="Generar", font=("Arial", 12), bg="#4CAF50", fg="white", width=10,
+              command=generar_reporte).pack(side=tk.LEFT, padx=5)
+    tk.Button(button_reportes, text="Copiar", font=("Arial", 12), bg="#2196F3", fg="white", width=10,
+              command=copiar_reporte).pack(side=tk.LEFT, padx=5)
+    tk.Button(button_reportes, text="Reconstruir", font=("Arial", 12), bg="#FF9800", fg="white", width=10,
+              command=reconstruir_reporte).pack(side=tk.LEFT, padx=5)
+
+
+    # Carga perezosa: cada pestaña pide sus datos la primera vez que se abre
+    # y se refresca al volver a ella si lleva mas de 'caducidad_pestanas' segundos sin recargarse
+    cargadores = {
+        str(tab_clientes): (tabla_clientes, cargar_clientes),
+        str(tab_productos): (tabla_productos, cargar_productos),
+        str(tab_categorias): (tabla_categorias, cargar_categorias),
+        str(tab_ventas): (tabla_ventas, cargar_ventas),
+        str(tab_detalle_ventas): (tabla_detalle, cargar_detalle),
+    }
+
+    def cargar_pestana_activa(event=None):
+        tabla, cargar = cargadores.get(notebook.select(), (None, None))
+        if tabla is None:
+            return
+        if tabla.cargada_en is None:
+            cargar()
+        elif tabla.caducada(INTERFAZ_CONFIG['caducidad_pestanas']):
+            tabla.refrescar()
+
+    def revisar_caducidad():
+        # Solo se refresca sola si se esta viendo el principio de la tabla, para no mover la vista al usuario
+        tabla, _ = cargadores.get(notebook.select(), (None, None))
+        if tabla is not None and tabla.cargada_en is not None and tabla.tree.yview()[0] == 0:
+            if tabla.caducada(INTERFAZ_CONFIG['caducidad_pestanas']):
+                tabla.refrescar()
+        root.after(INTERFAZ_CONFIG['revision_caducidad'] * 1000, revisar_caducidad)
+
+    def catalogo_revisado(cambiados):
+        # None: el catalogo se ha recargado entero
+        if cambiados is not None and not cambiados:
+            return
+        cache_consultas.invalidar("Productos")
+        if tabla_productos.cargada_en is None:
+            return
+        if cambiados is None:
+            tabla_productos.refrescar()
+        else:
+            tabla_productos.refrescar_filas(cambiados)
+
+    def revisar_catalogo(programar=True):
+        # Solo pide COUNT(*) y MAX(actualizado_en); sin conexion no avisa (ya lo indica la barra de estado)
+        ejecutor.enviar(tienda.catalogo.sincronizar, catalogo_revisado, lambda e: None, clave="catalogo")
+        if programar:
+            root.after(INTERFAZ_CONFIG['revision_catalogo'] * 1000, revisar_catalogo)
+
+    # Registro de cambios: cada pocos segundos se traen solo las filas que han tocado otras terminales
+    lector_cambios = LectorCambios(db, CAMBIOS_CONFIG['limite'], CAMBIOS_CONFIG['espera_huecos'])
+    tablas_con_cambios = {
+        'Clientes': (tabla_clientes,),
+        'Productos': (tabla_productos,),
+        'Categorias': (tabla_categorias,),
+        'Ventas': (tabla_ventas,),
+        'DetalleVentas': (tabla_detalle, tabla_lineas_venta),
+    }
+
+    def cambios_recibidos(cambios):
+        if cambios is None:
+            # Demasiados para ir fila a fila (una importacion, por ejemplo): se recarga lo abierto
+            for nombre, tablas in tablas_con_cambios.items():
+                cache_consultas.invalidar(nombre)
+                for tabla in tablas:
+                    if tabla.cargada_en is not None:
+                        tabla.refrescar()
+            revisar_catalogo(programar=False)
+            ejecutor.enviar(tienda.nombres_clientes.cargar, None, lambda e: None, clave="nombres_clientes")
+            return
+        for nombre, claves in cambios.items():
+            cache_consultas.invalidar(nombre)
+            nuevas = {clave for clave, operacion in claves.items() if operacion == 'I'}
+            for tabla in tablas_con_cambios.get(nombre, ()):
+                tabla.refrescar_filas(claves, nuevas)
+        if 'Clientes' in cambios:
+            clientes = list(cambios['Clientes'])
+            ejecutor.enviar(lambda: tienda.nombres_clientes.recargar(clientes), None, lambda e: None)
+        if 'Productos' in cambios:
+            productos = list(cambios['Productos'])
+            ejecutor.enviar(lambda: tienda.catalogo.recargar_productos(productos), None, lambda e: None)
+
+    def revisar_cambios():
+        # Una consulta por el indice primario de Cambios; sin conexion o sin la tabla no avisa
+        ejecutor.enviar(lector_cambios.leer, cambios_recibidos, lambda e: None, clave="cambios")
+        root.after(CAMBIOS_CONFIG['intervalo'] * 1000, revisar_cambios)
+
+    def purgar_cambios():
+        ejecutor.enviar(lambda: lector_cambios.purgar(CAMBIOS_CONFIG['conservar_horas']), None, lambda e: None,
+                        clave="purgar_cambios")
+        root.after(3600 * 1000, purgar_cambios)
+
+    # Los meses cerrados pasan al archivo por lotes; las demas terminales lo ven por el registro de cambios
+    def archivar_ventas():
+        if ARCHIVO_CONFIG['activo']:
+            ejecutor.enviar(lambda: tienda.archivo.archivar(ARCHIVO_CONFIG['meses_calientes'],
+                                                            ARCHIVO_CONFIG['tam_lote'], ARCHIVO_CONFIG['pausa']),
+                            None, lambda e: None, clave="archivar_ventas")
+        else:
+            ejecutor.enviar(tienda.archivo.actualizar, None, lambda e: None, clave="archivar_ventas")
+        root.after(ARCHIVO_CONFIG['intervalo_horas'] * 3600 * 1000, archivar_ventas)
+
+    notebook.bind('<<NotebookTabChanged>>', cargar_pestana_activa)
+    # La pestaña inicial ya esta seleccionada antes de enlazar el evento
+    cargar_pestana_activa()
+    root.after(INTERFAZ_CONFIG['revision_caducidad'] * 1000, revisar_caducidad)
+    # El catalogo de productos y los nombres de clientes se cargan en segundo plano y luego se mantienen al dia
+    revisar_catalogo()
+    cargar_nombres_clientes()
+    revisar_cambios()
+    purgar_cambios()
+    archivar_ventas()
+
+
+    # Importar / exportar CSV de la tabla de la pestaña activa
+    tablas_por_pestana = {
+        str(tab_clientes): ("Clientes", tabla_clientes),
+        str(tab_productos): ("Productos", tabla_productos),
+        str(tab_categorias): ("Categorias", tabla_categorias),
+        str(tab_ventas): ("Ventas", tabla_ventas),
+        str(tab_detalle_ventas): ("DetalleVentas", tabla_detalle),
+    }
+
+    def mostrar_progreso(pestana, accion):
+        """Devuelve un al_progresar que muestra filas y velocidad en el indicador de la pestaña"""
+        def al_progresar(progreso):
+            # Se llama desde el hilo de la tarea: el texto se pone en el hilo de Tk
+            texto = f"{accion}: {progreso.filas} filas ({progreso.filas_por_segundo:.0f} filas/s)"
+            ejecutor.notificar(lambda t: indicadores[pestana].config(text=t), texto)
+        return al_progresar
+
+    def importar_tabla():
+        pestana = root.nametowidget(notebook.select())
+        if str(pestana) not in tablas_por_pestana:
+            messagebox.showwarning("Advertencia", "Selecciona la pestaña de la tabla a importar.")
+            return
+        tabla, paginada = tablas_por_pestana[str(pestana)]
+        ruta = filedialog.askopenfilename(title=f"Importar {tabla}", filetypes=[("CSV", "*.csv"), ("Todos", "*.*")])
+        if not ruta:
+            return
+
+        def importado(resumen):
+            cache_consultas.invalidar(tabla)
+            paginada.recargar(usar_cache=False)
+            mensaje = (f"{resumen['filas']} filas importadas en {resumen['segundos']} s "
+                       f"({resumen['filas_por_segundo']} filas/s).")
+            if resumen['rechazadas']:
+                lineas = "\n".join(f"Línea {linea}: {error}" for linea, error in resumen['errores'][:10])
+                mensaje += f"\n{resumen['rechazadas']} filas rechazadas:\n{lineas}"
+            messagebox.showinfo("Importar", mensaje)
+
+        def fallido(e):
+            # Los lotes anteriores al fallo quedan guardados
+            cache_consultas.invalidar(tabla)
+            paginada.recargar(usar_cache=False)
+            if isinstance(e, ErrorImportacion):
+                messagebox.showerror("Importar", str(e))
+            else:
+                ejecutor.mostrar_error(e)
+
+        def importar():
+            resumen = importar_csv(db, tabla, ruta, IMPORT_CONFIG['tam_lote'], IMPORT_CONFIG['usar_load_data'],
+                                   mostrar_progreso(pestana, "Importando"))
+            if tabla in ("Ventas", "DetalleVentas"):
+                # Las filas importadas no pasan por el cobro: el resumen de reportes se rehace entero
+                reconstruir_resumen(db)
+            return resumen
+
+        ejecutor.enviar(importar, importado, fallido, grupo=pestana)
+
+    def exportar_tabla():
+        pestana = root.nametowidget(notebook.select())
+        if str(pestana) not in tablas_por_pestana:
+            messagebox.showwarning("Advertencia", "Selecciona la pestaña de la tabla a exportar.")
+            return
+        tabla, _ = tablas_por_pestana[str(pestana)]
+        ruta = filedialog.asksaveasfilename(title=f"Exportar {tabla}", defaultextension=".csv",
+                                            initialfile=f"{tabla}.csv", filetypes=[("CSV", "*.csv")])
+        if not ruta:
+            return
+
+        def exportado(resumen):
+            messagebox.showinfo("Exportar", f"{resumen['filas']} filas exportadas en {resumen['segundos']} s "
+                                            f"({resumen['filas_por_segundo']} filas/s).")
+
+        ejecutor.enviar(lambda: exportar_csv(db, tabla, ruta, al_progresar=mostrar_progreso(pestana, "Exportando")),
+                        exportado, grupo=pestana)
+
+    menu_principal = tk.Menu(root)
+    menu_archivo = tk.Menu(menu_principal, tearoff=0)
+    menu_archivo.add_command(label="Importar CSV...", command=importar_tabla)
+    menu_archivo.add_command(label="Exportar CSV...", command=exportar_tabla)
+    menu_principal.add_cascade(label="Archivo", menu=menu_archivo)
+
+
+    # Diagnostico: latencia por sentencia, espera del pool y consultas lentas (db.instrumentacion)
+    ventana_diagnostico = None
+
+    def mostrar_diagnostico():
+        nonlocal ventana_diagnostico
+        if ventana_diagnostico is not None and ventana_diagnostico.winfo_exists():
+            ventana_diagnostico.lift()
+            return
+        ventana = ventana_diagnostico = tk.Toplevel(root)
+        ventana.title("Diagnóstico de consultas")
+        ventana.geometry('900x500')
+        instrumentacion = db.instrumentacion
+
+        resumen_pool = ttk.Label(ventana, anchor="w", justify="left")
+        resumen_pool.pack(fill="x", padx=5, pady=5)
+
+        columnas = ("llamadas", "total_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms", "filas", "errores", "sentencia")
+        arbol = ttk.Treeview(ventana, columns=columnas, show="headings", height=12)
+        for columna in columnas:
+            arbol.heading(columna, text=columna)
+            arbol.column(columna, width=70, anchor="e", stretch=False)
+        arbol.column("sentencia", width=500, anchor="w", stretch=True)
+        arbol.pack(expand=True, fill="both", padx=5)
+
+        ttk.Label(ventana, text="Consultas lentas").pack(anchor="w", padx=5)
+        lista_lentas = tk.Listbox(ventana, height=6)
+        lista_lentas.pack(fill="x", padx=5)
+
+        def actualizar():
+            pool = db.estadisticas_pool()
+            espera = instrumentacion.resumen()['espera_pool']
+            # Solo el motor MySQL guarda sentencias preparadas por conexion
+            preparadas = (f"; sentencias: {pool['preparadas']} preparadas, {pool['reutilizadas']} reutilizadas"
+                          if 'preparadas' in pool else "")
+            replicas = "".join(
+                f"\nRéplica {r['nombre']}: {'sana' if r['sana'] else 'sin usar'}, retraso {r['retraso']} s, "
+                f"{r['lecturas']} lecturas, {r['fallos']} fallos" + (f" ({r['error']})" if r['error'] else "")
+                for r in pool.get('replicas', ()))
+            resumen_pool.config(text=(
+                f"Pool: {pool['en_uso']} en uso, {pool['libres']} libres de {pool['max_conexiones']}; "
+                f"{pool['checkouts']} préstamos, {pool['esperas']} esperas, {pool['creadas']} creadas, "
+                f"{pool['reconexiones']} reconexiones{preparadas}\n"
+                f"Espera por conexión: p50 {espera['p50_ms']} ms, p95 {espera['p95_ms']} ms, máx {espera['max_ms']} ms; "
+                f"caché de filtros: {cache_consultas.aciertos} aciertos, {cache_consultas.fallos} fallos{replicas}"))
+            arbol.delete(*arbol.get_children())
+            for sentencia, datos in instrumentacion.sentencias():
+                arbol.insert("", "end", values=[datos[c] for c in columnas[:-1]] + [sentencia])
+            lista_lentas.delete(0, "end")
+            for lenta in reversed(instrumentacion.lentas()):
+                lista_lentas.insert("end", f"{lenta['fecha']}  {lenta['ms']} ms  {lenta['sentencia']}  {lenta['parametros']}")
+
+        def reiniciar():
+            instrumentacion.reiniciar()
+            actualizar()
+
+        def guardar():
+            ruta = filedialog.asksaveasfilename(title="Guardar diagnóstico", defaultextension=".json",
+                                                initialfile="diagnostico.json", filetypes=[("JSON", "*.json")])
+            if ruta:
+                instrumentacion.volcar(ruta, {'pool': db.estadisticas_pool(),
+                                              'cache': {'aciertos': cache_consultas.aciertos,
+                                                        'fallos': cache_consultas.fallos}})
+
+        botones = ttk.Frame(ventana)
+        botones.pack(fill="x", padx=5, pady=5)
+        ttk.Button(botones, text="Actualizar", command=actualizar).pack(side="left")
+        ttk.Button(botones, text="Reiniciar", command=reiniciar).pack(side="left", padx=5)
+        ttk.Button(botones, text="Guardar JSON...", command=guardar).pack(side="left")
+
+        def refrescar():
+            if ventana.winfo_exists():
+                actualizar()
+                ventana.after(2000, refrescar)
+
+        refrescar()
+
+    menu_ver = tk.Menu(menu_principal, tearoff=0)
+    menu_ver.add_command(label="Diagnóstico...", command=mostrar_diagnostico)
+    menu_principal.add_cascade(label="Ver", menu=menu_ver)
+    root.config(menu=menu_principal)
+
+
+    sincronizador.iniciar()
+    root.mainloop()
+    sincronizador.detener()
+    ejecutor.cerrar()
+    diario.cerrar()
+    db.disconnect()
+
+
+if __name__ == "__main__":
+    main()
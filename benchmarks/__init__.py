@@ -0,0 +1 @@
+# Medidas de rendimiento de TiendaDB con datos sinteticos: python -m benchmarks --help
@@ -0,0 +1,105 @@
+# python -m benchmarks [--motor sqlite|mysql] [--ventas N] [--salida resultados.json] [--comparar anterior.json]
+import argparse
+import json
+import platform
+import subprocess
+import sys
+from datetime import datetime
+
+import config
+from benchmarks.datos import generar
+from benchmarks.mediciones import comparar, medir, operaciones
+from tienda import DatabaseConnection, Tienda
+
+
+def _argumentos():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks",
+                                     description="Genera datos sinteticos y mide las operaciones de la tienda")
+    parser.add_argument("--motor", choices=("sqlite", "mysql"), default="sqlite")
+    parser.add_argument("--ruta", default="benchmark.sqlite3", help="fichero SQLite")
+    parser.add_argument("--base", default="TiendaBench",
+                        help="base de datos MySQL (en el servidor de DATABASE_CONFIG); se llena de datos de prueba")
+    parser.add_argument("--clientes", type=int, default=10000)
+    parser.add_argument("--productos", type=int, default=2000)
+    parser.add_argument("--categorias", type=int, default=24)
+    parser.add_argument("--ventas", type=int, default=100000)
+    parser.add_argument("--lineas", type=int, default=5, help="lineas como maximo por venta")
+    parser.add_argument("--dias", type=int, default=365)
+    parser.add_argument("--sesgo", type=float, default=1.1, help="exponente de Zipf de la popularidad")
+    parser.add_argument("--semilla", type=int, default=1)
+    parser.add_argument("--sin-generar", action="store_true", help="medir sobre los datos que ya hay")
+    parser.add_argument("--repeticiones", type=int, default=50)
+    parser.add_argument("--solo", help="operaciones a medir separadas por comas")
+    parser.add_argument("--salida", help="fichero JSON con los resultados")
+    parser.add_argument("--comparar", help="JSON de una ejecucion anterior para ver las diferencias")
+    return parser.parse_args()
+
+
+def _conexion(args):
+    if args.motor == 'sqlite':
+        from tienda.sqlite import SQLiteConnection
+        return SQLiteConnection(args.ruta, **config.POOL_CONFIG)
+    return DatabaseConnection(**{**config.DATABASE_CONFIG, 'database': args.base, **config.POOL_CONFIG})
+
+
+def _version():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    args = _argumentos()
+    db = _conexion(args)
+    db.connect()
+    db.create_tables()
+    tienda = Tienda(db)
+    resultado = {
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'version': _version(),
+        'motor': args.motor,
+        'python': platform.python_version(),
+        'parametros': {k: v for k, v in vars(args).items() if k not in ('salida', 'comparar')},
+        'generacion': None,
+        'filas': {},
+        'operaciones': {},
+    }
+    try:
+        if not args.sin_generar:
+            print("Generando datos...", file=sys.stderr)
+            resultado['generacion'] = generar(
+                db, args.clientes, args.productos, args.categorias, args.ventas, args.lineas, args.dias,
+                args.sesgo, args.semilla,
+                al_progresar=lambda tabla, datos: print(f"  {tabla}: {datos['filas']} filas, {datos['segundos']} s",
+                                                        file=sys.stderr))
+        for tabla in ("Clientes", "Productos", "Categorias", "Ventas", "DetalleVentas", "VentasDiarias"):
+            resultado['filas'][tabla] = db.consultar(f"SELECT COUNT(*) FROM {tabla}")[0][0]
+        tienda.catalogo.cargar()
+        medidas = operaciones(tienda, args.semilla)
+        elegidas = args.solo.split(",") if args.solo else list(medidas)
+        for nombre in elegidas:
+            print(f"Midiendo {nombre}...", file=sys.stderr)
+            resultado['operaciones'][nombre] = medir(medidas[nombre], args.repeticiones)
+    finally:
+        db.disconnect()
+
+    print(f"{'operacion':<36}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'filas/s':>12}")
+    for nombre, medida in resultado['operaciones'].items():
+        print(f"{nombre:<36}{medida['p50_ms']:>10}{medida['p95_ms']:>10}{medida['p99_ms']:>10}"
+              f"{medida['filas_por_segundo'] or 0:>12}")
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            json.dump(resultado, f, ensure_ascii=False, indent=2)
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            anterior = json.load(f)
+        print(f"\nComparado con {args.comparar} ({anterior.get('version')}), p95:")
+        for nombre, antes, ahora, cociente in comparar(anterior, resultado):
+            aviso = "  <-- mas lento" if cociente > 1.2 else ""
+            print(f"{nombre:<36}{antes:>10}{ahora:>10}{cociente:>8}x{aviso}")
+
+
+if __name__ == "__main__":
+    main()
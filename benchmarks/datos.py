@@ -0,0 +1,147 @@
+# Generador de datos sinteticos con la forma de una tienda real
+import random
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+from itertools import accumulate
+
+from tienda.reportes import reconstruir_resumen
+
+_NOMBRES = ["Ana", "Luis", "María", "José", "Carmen", "Javier", "Lucía", "Pablo", "Elena", "Jorge",
+            "Marta", "Sergio", "Laura", "Raúl", "Paula", "Andrés", "Sofía", "Diego", "Irene", "Álvaro"]
+_APELLIDOS = ["García", "López", "Martínez", "Sánchez", "Pérez", "Gómez", "Ruiz", "Díaz", "Moreno",
+              "Muñoz", "Romero", "Navarro", "Torres", "Ramos", "Gil", "Serrano", "Molina", "Ortiz"]
+_CALLES = ["Mayor", "Real", "Sol", "Luna", "Olivo", "Río", "Prado", "Estación", "Iglesia", "Mercado"]
+_CATEGORIAS = ["Alimentación", "Bebidas", "Limpieza", "Higiene", "Papelería", "Ferretería",
+               "Electrónica", "Juguetes", "Textil", "Mascotas", "Jardín", "Hogar"]
+_PRODUCTOS = ["Leche", "Pan", "Arroz", "Aceite", "Café", "Agua", "Zumo", "Detergente", "Jabón",
+              "Champú", "Cuaderno", "Bolígrafo", "Tornillos", "Pilas", "Cable", "Pelota", "Camiseta",
+              "Pienso", "Maceta", "Vaso", "Plato", "Galletas", "Queso", "Yogur", "Tomate"]
+_VARIANTES = ["clásico", "grande", "pequeño", "eco", "premium", "oferta", "familiar", "mini", "extra"]
+
+
+def _lotes(filas, tam_lote):
+    lote = []
+    for fila in filas:
+        lote.append(fila)
+        if len(lote) >= tam_lote:
+            yield lote
+            lote = []
+    if lote:
+        yield lote
+
+
+def _insertar(db, consulta, filas, tam_lote):
+    """executemany en transacciones de tam_lote filas; devuelve el numero de filas"""
+    total = 0
+    for lote in _lotes(filas, tam_lote):
+        with db.conexion() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.executemany(consulta, lote)
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+            finally:
+                cursor.close()
+        total += len(lote)
+    return total
+
+
+def _siguiente_id(db, tabla, clave):
+    return (db.consultar(f"SELECT MAX({clave}) FROM {tabla}")[0][0] or 0) + 1
+
+
+def generar(db, clientes=1000, productos=500, categorias=12, ventas=10000, lineas_max=5, dias=365,
+            sesgo=1.1, semilla=1, tam_lote=1000, al_progresar=None):
+    """Llenar las tablas de create_tables con datos sinteticos; devuelve filas y segundos por tabla
+
+    La popularidad de los productos sigue una ley de Zipf con exponente 'sesgo' (unos pocos
+    productos se llevan la mayor parte de las ventas) y los clientes habituales compran mas que
+    el resto. Las ventas se reparten en los ultimos 'dias' dias, con mas actividad en fin de
+    semana. Los ids se asignan aqui para enlazar lineas y ventas sin leerlos de vuelta.
+    """
+    azar = random.Random(semilla)
+    resumen = {}
+
+    def paso(tabla, consulta, filas):
+        inicio = time.perf_counter()
+        n = _insertar(db, consulta, filas, tam_lote)
+        resumen[tabla] = {'filas': n, 'segundos': round(time.perf_counter() - inicio, 3)}
+        if al_progresar is not None:
+            al_progresar(tabla, resumen[tabla])
+
+    primera_categoria = _siguiente_id(db, "Categorias", "categoria_id")
+    # El nombre de categoria es unico: se numera por id para poder generar varias veces sobre la misma base
+    paso("Categorias", "INSERT INTO Categorias (categoria_id, nombre, descripcion) VALUES (%s, %s, %s)",
+         ((primera_categoria + i, f"{_CATEGORIAS[(primera_categoria + i) % len(_CATEGORIAS)]} "
+                                  f"{(primera_categoria + i) // len(_CATEGORIAS) + 1}",
+           "Categoría generada") for i in range(categorias)))
+
+    primer_cliente = _siguiente_id(db, "Clientes", "cliente_id")
+    paso("Clientes", "INSERT INTO Clientes (cliente_id, nombre, telefono, direccion) VALUES (%s, %s, %s, %s)",
+         ((primer_cliente + i,
+           f"{azar.choice(_NOMBRES)} {azar.choice(_APELLIDOS)} {azar.choice(_APELLIDOS)}",
+           f"6{azar.randrange(10**8):08d}",
+           f"Calle {azar.choice(_CALLES)} {azar.randint(1, 200)}") for i in range(clientes)))
+
+    primer_producto = _siguiente_id(db, "Productos", "producto_id")
+    precios = [Decimal(azar.randint(50, 5000)) / 100 for _ in range(productos)]
+    paso("Productos", "INSERT INTO Productos (producto_id, nombre, descripcion, precio, stock, categoria_id) "
+                      "VALUES (%s, %s, %s, %s, %s, %s)",
+         ((primer_producto + i,
+           f"{azar.choice(_PRODUCTOS)} {azar.choice(_VARIANTES)} {i + 1}",
+           "Producto generado para pruebas de rendimiento",
+           precios[i], 10**6,
+           primera_categoria + azar.randrange(categorias) if categorias else None) for i in range(productos)))
+
+    # Pesos acumulados para elegir con random.choices sin recalcularlos en cada venta
+    pesos_productos = list(accumulate(1 / (rango + 1) ** sesgo for rango in range(productos)))
+    pesos_clientes = list(accumulate(1 / (rango + 1) ** (sesgo / 2) for rango in range(clientes)))
+    orden_productos = list(range(productos))
+    azar.shuffle(orden_productos)  # el producto mas vendido no es siempre el de menor id
+    ahora = datetime.now().replace(microsecond=0)
+
+    primera_venta = _siguiente_id(db, "Ventas", "venta_id")
+    primer_detalle = _siguiente_id(db, "DetalleVentas", "detalle_id")
+    lineas = []  # lineas de DetalleVentas del tramo de ventas en curso
+
+    def cabeceras():
+        detalle_id = primer_detalle
+        for i in range(ventas):
+            venta_id = primera_venta + i
+            fecha = ahora - timedelta(days=azar.randrange(dias), seconds=azar.randrange(12 * 3600))
+            if fecha.weekday() < 5 and azar.random() < 0.3:
+                # Se vuelve a sortear parte de los dias laborables: el fin de semana sale mas
+                fecha = ahora - timedelta(days=azar.randrange(dias), seconds=azar.randrange(12 * 3600))
+            cliente = azar.choices(range(clientes), cum_weights=pesos_clientes)[0] if clientes else None
+            total = Decimal(0)
+            elegidos = azar.choices(orden_productos, cum_weights=pesos_productos, k=azar.randint(1, lineas_max))
+            for producto in dict.fromkeys(elegidos):
+                cantidad = azar.choices((1, 2, 3, 4, 6, 12), weights=(50, 20, 10, 8, 7, 5))[0]
+                lineas.append((detalle_id, venta_id, primer_producto + producto, cantidad, precios[producto]))
+                detalle_id += 1
+                total += cantidad * precios[producto]
+            yield venta_id, primer_cliente + cliente if cliente is not None else None, fecha, total
+
+    def por_tramos():
+        # Las lineas se insertan despues de cada tramo de cabeceras para no tenerlas todas en memoria
+        inicio = time.perf_counter()
+        n_ventas = n_lineas = 0
+        for lote in _lotes(cabeceras(), tam_lote):
+            n_ventas += _insertar(db, "INSERT INTO Ventas (venta_id, cliente_id, fecha, total) "
+                                      "VALUES (%s, %s, %s, %s)", lote, tam_lote)
+            n_lineas += _insertar(db, "INSERT INTO DetalleVentas (detalle_id, venta_id, producto_id, cantidad, "
+                                      "precio_unitario) VALUES (%s, %s, %s, %s, %s)", lineas, tam_lote)
+            lineas.clear()
+            if al_progresar is not None:
+                al_progresar("Ventas", {'filas': n_ventas, 'segundos': round(time.perf_counter() - inicio, 3)})
+        segundos = round(time.perf_counter() - inicio, 3)
+        resumen["Ventas"] = {'filas': n_ventas, 'segundos': segundos}
+        resumen["DetalleVentas"] = {'filas': n_lineas, 'segundos': segundos}
+
+    por_tramos()
+    inicio = time.perf_counter()
+    resumen["VentasDiarias"] = {'filas': reconstruir_resumen(db), 'segundos': round(time.perf_counter() - inicio, 3)}
+    return resumen
@@ -0,0 +1,126 @@
+# Operaciones de la aplicacion medidas una a una (las mismas consultas que lanzan las pestañas)
+import random
+import time
+from datetime import date, timedelta
+
+from benchmarks.datos import _APELLIDOS, _NOMBRES, _PRODUCTOS
+from tienda.busqueda import condicion_id, condicion_texto
+from tienda.reportes import INFORMES
+
+TAM_PAGINA = 100  # el de TablaPaginada
+
+
+def percentil(ordenados, p):
+    """Percentil p (0-100) por rango mas cercano sobre una lista ya ordenada"""
+    if not ordenados:
+        return None
+    indice = max(0, min(len(ordenados) - 1, round(p / 100 * len(ordenados) + 0.5) - 1))
+    return ordenados[indice]
+
+
+def medir(funcion, repeticiones=50, calentamiento=2):
+    """Ejecutar funcion() repetidas veces; funcion devuelve las filas leidas o escritas (o None)"""
+    for _ in range(calentamiento):
+        funcion()
+    tiempos = []
+    filas = 0
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        tiempos.append(time.perf_counter() - inicio)
+        filas += resultado or 0
+    tiempos.sort()
+    total = sum(tiempos)
+    ms = lambda segundos: round(segundos * 1000, 3)
+    return {
+        'repeticiones': repeticiones,
+        'p50_ms': ms(percentil(tiempos, 50)),
+        'p95_ms': ms(percentil(tiempos, 95)),
+        'p99_ms': ms(percentil(tiempos, 99)),
+        'media_ms': ms(total / repeticiones),
+        'max_ms': ms(tiempos[-1]),
+        'operaciones_por_segundo': round(repeticiones / total, 1) if total else None,
+        'filas_por_segundo': round(filas / total, 1) if total else None,
+    }
+
+
+def _primera_pagina(db, tabla, condicion="", params=()):
+    """Lo que hace TablaPaginada.recargar: COUNT(*) del filtro y la primera pagina por clave"""
+    clave = {'Clientes': 'cliente_id', 'Productos': 'producto_id', 'Ventas': 'venta_id',
+             'DetalleVentas': 'detalle_id', 'Categorias': 'categoria_id'}[tabla]
+    donde = f" WHERE {condicion}" if condicion else ""
+    db.consultar(f"SELECT COUNT(*) FROM {tabla}{donde}", params)
+    filas = db.consultar(f"SELECT * FROM {tabla}{donde} ORDER BY {clave} LIMIT %s", tuple(params) + (TAM_PAGINA,))
+    return len(filas)
+
+
+def operaciones(tienda, semilla=1):
+    """{nombre: funcion} con las operaciones a medir sobre los datos que haya en la base"""
+    db = tienda.db
+    azar = random.Random(semilla)
+    fulltext = db.dialecto == 'mysql'
+    rango = {tabla: db.consultar(f"SELECT MIN({clave}), MAX({clave}) FROM {tabla}")[0]
+             for tabla, clave in (('Clientes', 'cliente_id'), ('Productos', 'producto_id'),
+                                  ('Ventas', 'venta_id'))}
+
+    def id_de(tabla):
+        minimo, maximo = rango[tabla]
+        return azar.randint(minimo, maximo) if minimo is not None else 1
+
+    def filtrar(tabla, termino, columna, columnas_fulltext):
+        return _primera_pagina(db, tabla, *condicion_texto(termino, columna, columnas_fulltext, fulltext))
+
+    def cobro():
+        carrito = []
+        for _ in range(azar.randint(1, 5)):
+            producto_id = id_de('Productos')
+            carrito.append((producto_id, 1, tienda.catalogo.precio(producto_id) or 1))
+        tienda.ventas.cobrar(id_de('Clientes'), carrito)
+        return len(carrito)
+
+    def ordenada(tabla, clave, columna):
+        # Primera pagina y la siguiente por (valor, clave), como TablaPaginada al ordenar por una cabecera
+        consulta = f"SELECT * FROM {tabla}{{}} ORDER BY {columna} DESC, {clave} DESC LIMIT %s"
+        filas = db.consultar(consulta.format(""), (TAM_PAGINA,))
+        if not filas:
+            return 0
+        ultima = db.consultar(f"SELECT {columna}, {clave} FROM {tabla} WHERE {clave} = %s", (filas[-1][0],))[0]
+        siguiente = consulta.format(f" WHERE {columna} < %s OR {columna} IS NULL OR ({columna} = %s AND {clave} < %s)")
+        return len(filas) + len(db.consultar(siguiente, (ultima[0], ultima[0], ultima[1], TAM_PAGINA)))
+
+    hasta = date.today()
+    desde = hasta - timedelta(days=30)
+    medidas = {
+        'cargar_clientes': lambda: _primera_pagina(db, 'Clientes'),
+        'cargar_productos': lambda: _primera_pagina(db, 'Productos'),
+        'cargar_ventas': lambda: _primera_pagina(db, 'Ventas'),
+        'cargar_detalle': lambda: _primera_pagina(db, 'DetalleVentas'),
+        'desplazar_ventas': lambda: len(tienda.ventas.listar(id_de('Ventas'), TAM_PAGINA)),
+        'filtrar_clientes': lambda: filtrar('Clientes', azar.choice(_NOMBRES + _APELLIDOS), 'nombre', ('nombre',)),
+        'filtrar_productos': lambda: filtrar('Productos', azar.choice(_PRODUCTOS), 'nombre',
+                                             ('nombre', 'descripcion')),
+        'filtrar_ventas': lambda: _primera_pagina(db, 'Ventas', *condicion_id(str(id_de('Clientes')), 'cliente_id')),
+        'filtrar_detalle': lambda: _primera_pagina(db, 'DetalleVentas',
+                                                   *condicion_id(str(id_de('Ventas')), 'venta_id')),
+        'insertar_cliente': lambda: tienda.clientes.crear("Cliente de prueba", "600000000", "Calle Prueba 1") and 1,
+        'insertar_detalle': lambda: tienda.detalle.crear(id_de('Ventas'), id_de('Productos'), 1, 1) and 1,
+        'ordenar_ventas_fecha': lambda: ordenada('Ventas', 'venta_id', 'fecha'),
+        'ordenar_ventas_total': lambda: ordenada('Ventas', 'venta_id', 'total'),
+        'ordenar_productos_precio': lambda: ordenada('Productos', 'producto_id', 'precio'),
+        'cobro': cobro,
+        'cargar_catalogo': tienda.catalogo.cargar,
+    }
+    for nombre, informe in INFORMES.items():
+        medidas['informe: ' + nombre] = lambda informe=informe: len(informe(db, desde, hasta)[1])
+    return medidas
+
+
+def comparar(anterior, actual, campo='p95_ms'):
+    """Filas (operacion, antes, ahora, cociente) para ver regresiones entre dos ficheros JSON"""
+    filas = []
+    for nombre, medida in actual['operaciones'].items():
+        previa = anterior.get('operaciones', {}).get(nombre)
+        if previa is None or not previa.get(campo):
+            continue
+        filas.append((nombre, previa[campo], medida[campo], round(medida[campo] / previa[campo], 2)))
+    return filas
@@ -1,7 +1,77 @@
-# Modulo de configuracion de la aplicacion
-DATABASE_CONFIG = {
-    'host': 'localhost',
-    'user': 'root',
-    'password': '', 
-    'database': 'TiendaDB'
-}
\ No newline at end of file
+# Modulo de configuracion de la aplicacion
+
+# Motor de base de datos: 'mysql' (servidor central, DATABASE_CONFIG) o 'sqlite' (fichero local, SQLITE_CONFIG)
+BACKEND = 'mysql'
+
+DATABASE_CONFIG = {
+    'host': 'localhost',
+    'user': 'root',
+    'password': '', 
+    'database': 'TiendaDB',
+    'allow_local_infile': False,   # necesario para importar con LOAD DATA LOCAL INFILE
+    'sentencias_preparadas': 64,   # sentencias preparadas en el servidor que guarda cada conexion
+    # Replicas de lectura, cada una con su pool: [{'host': 'replica1'}, {'host': 'localhost', 'port': 3307}]
+    # Las claves que falten se toman de la primaria. Sin replicas todo va a la primaria.
+    'replicas': [],
+    'retraso_maximo': 5,           # segundos de retraso a partir de los que una replica no se usa
+    'intervalo_salud': 10          # segundos entre comprobaciones de cada replica
+}
+
+# Base de datos local para sucursales sin servidor, pruebas y benchmarks
+SQLITE_CONFIG = {
+    'ruta': 'TiendaDB.sqlite3',
+    'sentencias_preparadas': 256   # sentencias compiladas que guarda cada conexion
+}
+
+# Pool de conexiones compartido por todas las pestañas
+POOL_CONFIG = {
+    'max_conexiones': 5,           # conexiones abiertas como maximo
+    'tiempo_espera': 10,           # segundos esperando una conexion libre
+    'tiempo_inactividad': 300,     # segundos antes de cerrar una conexion ociosa
+    'intervalo_verificacion': 30   # segundos de inactividad tras los que se hace ping
+}
+
+# Medida de las consultas (ventana Ver > Diagnostico)
+INSTRUMENTACION_CONFIG = {
+    'activa': True,
+    'umbral_ms': 200,              # consultas mas lentas se guardan y se escriben en el log
+    'max_lentas': 100              # consultas lentas que se conservan
+}
+
+# Importacion masiva de CSV
+IMPORT_CONFIG = {
+    'tam_lote': 1000,              # filas por transaccion
+    'usar_load_data': False        # LOAD DATA LOCAL INFILE en lugar de executemany
+}
+
+# Ventana principal
+INTERFAZ_CONFIG = {
+    'caducidad_pestanas': 300,     # segundos tras los que una pestaña se recarga al volver a ella
+    'revision_caducidad': 60,      # cada cuantos segundos se revisa si la pestaña visible esta caducada
+    'revision_catalogo': 30        # cada cuantos segundos se buscan productos cambiados en otras terminales
+}
+
+# Registro de cambios de otras terminales (tabla Cambios, escrita por disparadores)
+CAMBIOS_CONFIG = {
+    'intervalo': 3,                # segundos entre lecturas de cambios nuevos
+    'limite': 500,                 # con mas cambios pendientes se recargan las pestañas abiertas
+    'espera_huecos': 60,           # segundos que se espera a un cambio con seq menor aun sin confirmar
+    'conservar_horas': 24          # los cambios mas viejos se borran
+}
+
+# Archivo de ventas: las de meses cerrados pasan a VentasArchivo/DetalleVentasArchivo
+ARCHIVO_CONFIG = {
+    'activo': True,
+    'meses_calientes': 3,          # meses (el actual incluido) que se quedan en Ventas y DetalleVentas
+    'tam_lote': 500,               # ventas movidas por transaccion
+    'pausa': 0.1,                  # segundos entre lotes, para no frenar las cajas
+    'intervalo_horas': 6           # cada cuantas horas se busca algo que archivar
+}
+
+# Diario local de ventas: se anotan al momento y se envian al servidor en segundo plano
+DIARIO_CONFIG = {
+    'ruta': 'diario_ventas.sqlite3',
+    'intervalo': 5,                # segundos entre envios con la cola vacia
+    'tam_lote': 50,                # operaciones por transaccion en el servidor
+    'espera_maxima': 60            # segundos maximos entre reintentos sin conexion
+}
@@ -0,0 +1,80 @@
+# Ejecutor de consultas en segundo plano para no congelar la ventana de Tk
+import itertools
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from tkinter import messagebox
+
+
+class EjecutorConsultas:
+    """Ejecuta funciones en un pool de hilos y entrega los resultados en el hilo de Tk"""
+
+    def __init__(self, root, max_hilos=4, intervalo=50, al_cambiar_ocupado=None):
+        self.root = root
+        self.intervalo = intervalo
+        self.al_cambiar_ocupado = al_cambiar_ocupado
+        self._hilos = ThreadPoolExecutor(max_workers=max_hilos, thread_name_prefix="consulta")
+        self._resultados = queue.Queue()
+        self._numeros = itertools.count(1)
+        self._ultima = {}    # clave -> (numero, futuro, grupo) de la ultima tarea enviada
+        self._ocupados = {}  # grupo -> tareas pendientes
+        self._cerrado = False
+        self.root.after(self.intervalo, self._revisar)
+
+    def enviar(self, funcion, al_terminar=None, al_fallar=None, clave=None, grupo=None):
+        """Encolar funcion(); si se repite la clave, la tarea anterior queda descartada"""
+        numero = next(self._numeros)
+        if clave is not None and clave in self._ultima:
+            _, anterior, grupo_anterior = self._ultima[clave]
+            # Si todavia no ha empezado ni siquiera llega a ejecutarse
+            if anterior.cancel():
+                self._marcar(grupo_anterior, -1)
+        self._marcar(grupo, 1)
+        futuro = self._hilos.submit(self._ejecutar, funcion, numero, clave, grupo, al_terminar, al_fallar)
+        if clave is not None:
+            self._ultima[clave] = (numero, futuro, grupo)
+        return numero
+
+    def _ejecutar(self, funcion, numero, clave, grupo, al_terminar, al_fallar):
+        # Corre en un hilo del pool: nunca tocar widgets aqui
+        try:
+            resultado = funcion()
+        except Exception as e:
+            self._resultados.put((numero, clave, grupo, al_fallar or self.mostrar_error, e))
+        else:
+            self._resultados.put((numero, clave, grupo, al_terminar, resultado))
+
+    def _revisar(self):
+        while True:
+            try:
+                numero, clave, grupo, callback, valor = self._resultados.get_nowait()
+            except queue.Empty:
+                break
+            self._marcar(grupo, -1)
+            if clave is not None:
+                if self._ultima.get(clave, (None,))[0] != numero:
+                    continue  # una tarea mas reciente con la misma clave la sustituye
+                del self._ultima[clave]
+            if callback is not None:
+                callback(valor)
+        if not self._cerrado:
+            self.root.after(self.intervalo, self._revisar)
+
+    def notificar(self, callback, valor):
+        """Llamar a callback(valor) en el hilo de Tk; se puede usar desde una tarea en curso"""
+        self._resultados.put((None, None, None, callback, valor))
+
+    def _marcar(self, grupo, cambio):
+        if grupo is None:
+            return
+        antes = self._ocupados.get(grupo, 0)
+        ahora = antes + cambio
+        self._ocupados[grupo] = ahora
+        if self.al_cambiar_ocupado and (antes == 0) != (ahora == 0):
+            self.al_cambiar_ocupado(grupo, ahora > 0)
+
+    def mostrar_error(self, e):
+        messagebox.showerror("Error de Base de Datos", f"Error al ejecutar consulta: {e}")
+
+    def cerrar(self):
+        self._cerrado = True
+        self._hilos.shutdown(wait=False, cancel_futures=True)
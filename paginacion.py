@@ -0,0 +1,471 @@
+# Carga paginada de tablas grandes en un ttk.Treeview
+from bisect import bisect_left, bisect_right
+import time
+
+from tienda.busqueda import coincide, condicion_texto, normalizar
+
+
+def _comparable(clave, plegar=None):
+    """(valor, pk) -> tupla que ordena como ORDER BY valor, pk en MySQL y SQLite (NULL el menor)
+
+    plegar: como compara el servidor los textos (normalizar para la collation *_ai_ci de MySQL).
+    """
+    valor, pk = clave
+    if plegar is not None and isinstance(valor, str):
+        valor = plegar(valor)
+    return (valor is not None, valor, pk)
+
+
+def _celdas(fila):
+    """Valores de una fila para el Treeview: NULL como celda vacia (ttk lo mostraria como "None")"""
+    return tuple("" if valor is None else valor for valor in fila)
+
+
+class TablaPaginada:
+    """Mantiene en el Treeview solo una ventana de filas, pidiendo paginas por clave al desplazarse
+
+    Columnas calculadas: 'expresiones' da el SQL de las que no son columnas de la tabla (p. ej. un
+    COUNT de las lineas de cada venta) y 'nombres' las que se rellenan con el nombre de un id,
+    {columna: (columna_id, resolver)}, donde resolver(ids) devuelve {id: nombre} de una vez para
+    toda la pagina (desde una cache en memoria, no con una consulta por fila).
+
+    Las columnas de 'ordenables' se ordenan al pulsar su cabecera. El orden lo hace el servidor con
+    ORDER BY columna, clave y las paginas se piden por el par (valor, clave) de la primera o la
+    ultima fila cargada, asi que cada pagina es un recorrido corto del indice de esa columna.
+
+    usar_origen cambia de donde se leen las filas (una vista con el nombre de la tabla como alias,
+    p. ej. las ventas archivadas junto a las actuales) sin cambiar la tabla de la cache.
+    """
+
+    def __init__(self, tree, db, ejecutor, tabla, clave, grupo=None, scrollbar=None, etiqueta=None,
+                 tam_pagina=100, max_filas=400, margen=0.2, cache=None, expresiones=None, nombres=None,
+                 ordenables=()):
+        self.tree = tree
+        self.db = db
+        self.ejecutor = ejecutor
+        self.tabla = tabla
+        self.origen = tabla       # lo que va tras FROM
+        self.clave = clave
+        self.columnas = tuple(tree['columns'])
+        self.expresiones = expresiones or {}
+        self._expresiones_tabla = self.expresiones
+        self.nombres = nombres or {}
+        self._columnas_sql = [c for c in self.columnas if c not in self.nombres]
+        self.grupo = grupo
+        self.scrollbar = scrollbar
+        self.etiqueta = etiqueta
+        self.tam_pagina = tam_pagina
+        self.max_filas = max_filas
+        self.margen = margen
+        self.cache = cache
+        self.condicion = ""
+        self.params = ()
+        self.total = 0
+        self.orden = clave        # columna por la que se ordena
+        self.ascendente = True
+        # MySQL ordena el texto sin distinguir mayusculas ni acentos; SQLite, byte a byte
+        self._plegar = normalizar if getattr(db, 'dialecto', 'mysql') == 'mysql' else None
+        self._valores = {}        # iid -> valor de la columna de orden de cada fila cargada
+        self._primera = None  # (valor, clave) de la primera fila cargada
+        self._ultima = None   # (valor, clave) de la ultima fila cargada
+        self._hay_antes = False
+        self._hay_despues = False
+        self._cargando = False
+        self._generacion = 0
+        self._termino = None
+        self._completa = None  # (condicion, termino, filas) de la ultima busqueda descargada entera
+        self.cargada_en = None  # time.monotonic() de la ultima recarga; None si aun no se ha cargado
+        self.tree.configure(yscrollcommand=self._al_desplazar)
+        self._titulos = {}
+        for columna in ordenables:
+            self._titulos[columna] = self.tree.heading(columna, 'text')
+            self.tree.heading(columna, command=lambda c=columna: self.ordenar(c))
+        self._mostrar_orden()
+
+    def _select(self, condiciones, despues=True):
+        """SELECT de una pagina en el orden de la vista (despues=True) o en el contrario"""
+        columnas = ", ".join(f"{self.expresiones[c]} AS {c}" if c in self.expresiones else c
+                             for c in self._columnas_sql)
+        consulta = f"SELECT {columnas} FROM {self.origen}"
+        if condiciones:
+            consulta += " WHERE " + " AND ".join(f"({c})" for c in condiciones)
+        direccion = "ASC" if despues == self.ascendente else "DESC"
+        if self.orden == self.clave:
+            return consulta + f" ORDER BY {self.clave} {direccion} LIMIT %s"
+        return consulta + f" ORDER BY {self.orden} {direccion}, {self.clave} {direccion} LIMIT %s"
+
+    def _tras(self, clave, despues=True):
+        """Condicion y parametros de las filas que van despues (o antes) de (valor, clave) en la vista"""
+        valor, pk = clave
+        mayor = despues == self.ascendente
+        if self.orden == self.clave:
+            return (f"{self.clave} > %s" if mayor else f"{self.clave} < %s"), (pk,)
+        columna = self.orden
+        # NULL va primero en orden ascendente tanto en MySQL como en SQLite
+        if mayor:
+            if valor is None:
+                return f"({columna} IS NULL AND {self.clave} > %s) OR {columna} IS NOT NULL", (pk,)
+            return f"{columna} > %s OR ({columna} = %s AND {self.clave} > %s)", (valor, valor, pk)
+        if valor is None:
+            return f"{columna} IS NULL AND {self.clave} < %s", (pk,)
+        return (f"{columna} < %s OR {columna} IS NULL OR ({columna} = %s AND {self.clave} < %s)",
+                (valor, valor, pk))
+
+    def _leer(self, consulta, params, primaria=False):
+        """Ejecutar la consulta de una pagina y completar las columnas de nombres (en el hilo de trabajo)"""
+        filas = self.db.consultar(consulta, params, primaria=primaria)
+        if not self.nombres or not filas:
+            return filas
+        posiciones = {c: i for i, c in enumerate(self._columnas_sql)}
+        resueltos = {}
+        for columna, (columna_id, resolver) in self.nombres.items():
+            ids = {fila[posiciones[columna_id]] for fila in filas} - {None}
+            resueltos[columna] = resolver(ids) if ids else {}
+        completas = []
+        for fila in filas:
+            completas.append(tuple(
+                resueltos[c].get(fila[posiciones[self.nombres[c][0]]], "") if c in self.nombres
+                else fila[posiciones[c]] for c in self.columnas))
+        return completas
+
+    def _condiciones(self, extra=None):
+        condiciones = [self.condicion] if self.condicion else []
+        if extra:
+            condiciones.append(extra)
+        return condiciones
+
+    def _clave_cache(self, condicion):
+        # El mismo filtro en otro orden, o sobre otro origen, es otra consulta
+        if self.origen != self.tabla:
+            condicion = f"FROM {self.origen} WHERE {condicion}"
+        return condicion if self.orden == self.clave and self.ascendente else \
+            f"{condicion} ORDER BY {self.orden} {'ASC' if self.ascendente else 'DESC'}"
+
+    def usar_origen(self, origen=None, expresiones=None):
+        """Leer de 'origen' (None: de la propia tabla) con esas columnas calculadas; vale al recargar"""
+        self.origen = origen or self.tabla
+        self.expresiones = expresiones if origen and expresiones is not None else self._expresiones_tabla
+        self._completa = None
+
+    def recargar(self, condicion="", params=(), usar_cache=True, termino=None, desde=None):
+        """Vaciar la vista y cargar la primera pagina con el filtro indicado
+
+        Con desde=clave la pagina empieza en esa fila (la que estaba a la vista al cambiar de orden).
+        """
+        self.condicion = condicion
+        self.params = tuple(params)
+        self._termino = termino
+        self._generacion += 1
+        generacion = self._generacion
+        clave_cache = self._clave_cache(condicion)
+        if desde is None and usar_cache and self.cache is not None:
+            guardado = self.cache.obtener(self.tabla, clave_cache, self.params)
+            if guardado is not None:
+                self._recargada(generacion, *guardado)
+                return
+        self._cargando = True
+        consulta_total = f"SELECT COUNT(*) FROM {self.origen}"
+        if condicion:
+            consulta_total += f" WHERE {condicion}"
+        params_total = self.params
+        version = self.cache.version(self.tabla) if self.cache is not None else None
+
+        def tarea():
+            total = self.db.consultar(consulta_total, params_total)[0][0]
+            extra, params_extra = None, ()
+            if desde is not None:
+                fila = self.db.consultar(f"SELECT {self.orden} FROM {self.origen} WHERE {self.clave} = %s",
+                                         (desde,))
+                if fila:
+                    # Las claves son enteras: la fila vecina (desde - 1, o desde + 1 en orden descendente)
+                    # sirve de limite para que la propia fila entre en la pagina
+                    vecina = desde - 1 if self.ascendente else desde + 1
+                    extra, params_extra = self._tras((fila[0][0], vecina))
+            consulta = self._select(self._condiciones(extra))
+            return total, self._leer(consulta, params_total + params_extra + (self.tam_pagina,)), extra is not None
+
+        def recibida(resultado):
+            total, filas, a_mitad = resultado
+            if self.cache is not None and not a_mitad:
+                self.cache.guardar(self.tabla, clave_cache, params_total, (total, filas), version)
+            self._recargada(generacion, total, filas, hay_antes=a_mitad)
+
+        self.ejecutor.enviar(tarea, recibida, self._fallo, clave=self.tree, grupo=self.grupo)
+
+    def refrescar(self):
+        """Volver a cargar desde el servidor manteniendo el filtro actual"""
+        self.recargar(self.condicion, self.params, usar_cache=False, termino=self._termino)
+
+    def ordenar(self, columna):
+        """Ordenar por 'columna' (otra vez la misma: al reves) manteniendo el filtro y la fila a la vista"""
+        if columna == self.orden:
+            self.ascendente = not self.ascendente
+        else:
+            self.orden, self.ascendente = columna, True
+        self._mostrar_orden()
+        visible = self._primera_visible()
+        self.recargar(self.condicion, self.params, termino=self._termino,
+                      desde=int(visible) if visible else None)
+
+    def _primera_visible(self):
+        """iid de la fila de arriba de la vista, o '' si no hay filas
+
+        Con show='headings' la y=1 cae en la cabecera (identify_row da ''): la fila se saca de yview.
+        """
+        hijos = self.tree.get_children()
+        if not hijos:
+            return ''
+        return hijos[min(round(self.tree.yview()[0] * len(hijos)), len(hijos) - 1)]
+
+    def _mostrar_orden(self):
+        for columna, titulo in self._titulos.items():
+            flecha = (" ▲" if self.ascendente else " ▼") if columna == self.orden else ""
+            self.tree.heading(columna, text=titulo + flecha)
+
+    def caducada(self, segundos):
+        return self.cargada_en is not None and time.monotonic() - self.cargada_en > segundos
+
+    def buscar(self, termino, columna, columnas_fulltext):
+        """Filtrar por texto; si amplia la busqueda anterior ya descargada entera, se refina en memoria"""
+        condicion, params = condicion_texto(termino, columna, columnas_fulltext,
+                                            fulltext=self.db.dialecto == 'mysql')
+        termino = termino.strip()
+        anterior = self._completa
+        if anterior is not None and anterior[0] == condicion and termino.startswith(anterior[1]):
+            indices = [self.columnas.index(c) for c in (columna,) + tuple(columnas_fulltext)]
+            filas = [fila for fila in anterior[2]
+                     if coincide([fila[i] for i in dict.fromkeys(indices)], termino)]
+            self.condicion = condicion
+            self.params = tuple(params)
+            self._termino = termino
+            self._generacion += 1
+            self._recargada(self._generacion, len(filas), filas)
+            return
+        self.recargar(condicion, params, termino=termino)
+
+    def _recargada(self, generacion, total, filas, hay_antes=False):
+        if generacion != self._generacion:
+            return
+        self._cargando = False
+        self.cargada_en = time.monotonic()
+        self.tree.delete(*self.tree.get_children())
+        self._valores.clear()
+        self._primera = self._ultima = None
+        self._hay_antes = hay_antes
+        self._hay_despues = len(filas) == self.tam_pagina
+        self._insertar(filas, 'end')
+        self.total = total
+        self._mostrar_total()
+        if self._termino is not None and total == len(filas):
+            self._completa = (self.condicion, self._termino, filas)
+        else:
+            self._completa = None
+
+    def _mostrar_total(self):
+        if self.etiqueta is not None:
+            self.etiqueta.config(text=f"{self.total} registros")
+
+    def _fallo(self, e):
+        self._cargando = False
+        self.ejecutor.mostrar_error(e)
+
+    def _al_desplazar(self, primero, ultimo):
+        if self.scrollbar is not None:
+            self.scrollbar.set(primero, ultimo)
+        if self._cargando:
+            return
+        if float(ultimo) >= 1 - self.margen and self._hay_despues:
+            self._pedir_pagina(despues=True)
+        elif float(primero) <= self.margen and self._hay_antes:
+            self._pedir_pagina(despues=False)
+
+    def _pedir_pagina(self, despues):
+        """Pedir la pagina siguiente o anterior a la ventana cargada (paginacion por clave)"""
+        limite = self._ultima if despues else self._primera
+        if limite is None:
+            self._hay_antes = self._hay_despues = False
+            return
+        extra, params_extra = self._tras(limite, despues)
+        consulta = self._select(self._condiciones(extra), despues)
+        params = self.params + params_extra + (self.tam_pagina,)
+        self._cargando = True
+        generacion = self._generacion
+        self.ejecutor.enviar(lambda: self._leer(consulta, params),
+                             lambda filas: self._pagina_recibida(generacion, despues, filas),
+                             self._fallo, clave=self.tree, grupo=self.grupo)
+
+    def _pagina_recibida(self, generacion, despues, filas):
+        if generacion != self._generacion:
+            return
+        self._cargando = False
+        completa = len(filas) == self.tam_pagina
+        visible = self._primera_visible()
+        if despues:
+            self._hay_despues = completa
+            self._insertar(filas, 'end')
+        else:
+            self._hay_antes = completa
+            self._insertar(filas, 0)  # llegan en orden inverso
+        self._recortar(despues)
+        if visible and self.tree.exists(visible):
+            # Mantener a la vista la misma fila aunque se hayan quitado filas por arriba
+            hijos = len(self.tree.get_children())
+            self.tree.yview_moveto(self.tree.index(visible) / max(hijos, 1))
+
+    def _insertar(self, filas, posicion):
+        # El iid de cada fila es su clave primaria
+        indice = self.columnas.index(self.clave)
+        indice_orden = self.columnas.index(self.orden)
+        for fila in filas:
+            iid = str(fila[indice])
+            self.tree.insert('', posicion, iid=iid, values=_celdas(fila))
+            self._valores[iid] = fila[indice_orden]
+        self._actualizar_limites()
+
+    def _borrar(self, iids):
+        self.tree.delete(*iids)
+        for iid in iids:
+            self._valores.pop(iid, None)
+
+    def _recortar(self, despues):
+        """Descartar filas del extremo contrario para que la memoria no crezca"""
+        hijos = self.tree.get_children()
+        sobran = len(hijos) - self.max_filas
+        if sobran <= 0:
+            return
+        if despues:
+            self._borrar(hijos[:sobran])
+            self._hay_antes = True
+        else:
+            self._borrar(hijos[-sobran:])
+            self._hay_despues = True
+        self._actualizar_limites()
+
+    def _clave_de(self, iid):
+        return self._valores.get(iid), int(iid)
+
+    def _actualizar_limites(self):
+        hijos = self.tree.get_children()
+        if hijos:
+            self._primera = self._clave_de(hijos[0])
+            self._ultima = self._clave_de(hijos[-1])
+        else:
+            self._primera = self._ultima = None
+
+    def refrescar_fila(self, pk):
+        """Releer solo la fila pk tras una escritura y actualizarla, insertarla o quitarla"""
+        self.refrescar_filas([pk])
+
+    def refrescar_filas(self, pks, nuevas=None):
+        """Igual que refrescar_fila para varias claves con una sola consulta
+
+        nuevas: las claves recien insertadas, si se saben (registro de cambios); las demas que no
+        esten en el Treeview ya contaban en el total. Sin nuevas, toda fila que no esta es nueva.
+        """
+        self._datos_cambiados()
+        pks = sorted(set(int(pk) for pk in pks))
+        if not pks or self.cargada_en is None:
+            return  # una pestaña sin abrir todavia ya leera la fila al cargarse
+        marcas = ", ".join(["%s"] * len(pks))
+        consulta = self._select(self._condiciones(f"{self.clave} IN ({marcas})"))
+        params = self.params + tuple(pks) + (len(pks),)
+        generacion = self._generacion
+        nuevas = None if nuevas is None else {int(pk) for pk in nuevas}
+        # De la primaria: los cambios se acaban de ver alli y una replica puede no tenerlos aun
+        self.ejecutor.enviar(lambda: self._leer(consulta, params, primaria=True),
+                             lambda filas: self._filas_recibidas(generacion, pks, filas, nuevas),
+                             grupo=self.grupo)
+
+    def _filas_recibidas(self, generacion, pks, filas, nuevas=None):
+        if generacion != self._generacion:
+            return
+        indice = self.columnas.index(self.clave)
+        indice_orden = self.columnas.index(self.orden)
+        encontradas = {int(fila[indice]): fila for fila in filas}
+        for pk in pks:
+            iid = str(pk)
+            fila = encontradas.get(pk)
+            if fila is None:
+                # Borrada o ya no cumple el filtro actual
+                self.quitar_fila(pk)
+                continue
+            contaba = nuevas is not None and pk not in nuevas
+            if self.tree.exists(iid):
+                if self._valores.get(iid) == fila[indice_orden]:
+                    self.tree.item(iid, values=_celdas(fila))
+                    continue
+                # Ha cambiado el valor por el que se ordena: la fila cambia de sitio
+                self._borrar([iid])
+                self._actualizar_limites()
+                contaba = True
+            clave = (fila[indice_orden], pk)
+            if self._dentro_de_ventana(clave):
+                self.tree.insert('', self._posicion(clave), iid=iid, values=_celdas(fila))
+                self._valores[iid] = fila[indice_orden]
+                self._actualizar_limites()
+            if not contaba:
+                self.total += 1
+            self._mostrar_total()
+
+    def _posicion(self, clave):
+        """Indice del Treeview en el que va una fila con esa (valor, clave) segun el orden actual"""
+        claves = [_comparable(self._clave_de(hijo), self._plegar) for hijo in self.tree.get_children()]
+        buscada = _comparable(clave, self._plegar)
+        if self.ascendente:
+            return bisect_left(claves, buscada)
+        claves.reverse()
+        return len(claves) - bisect_right(claves, buscada)
+
+    def cargar_nuevas(self):
+        """Añadir las filas que van despues de la ultima cargada, si la ventana esta al final"""
+        self._datos_cambiados()
+        if self._hay_despues or self.cargada_en is None:
+            return
+        if self._ultima is None:
+            self.refrescar()
+            return
+        extra, params_extra = self._tras(self._ultima)
+        consulta = self._select(self._condiciones(extra))
+        params = self.params + params_extra + (self.tam_pagina,)
+        generacion = self._generacion
+
+        def recibidas(filas):
+            if generacion != self._generacion:
+                return
+            nuevas = [fila for fila in filas if not self.tree.exists(str(fila[self.columnas.index(self.clave)]))]
+            self._insertar(nuevas, 'end')
+            self._hay_despues = len(filas) == self.tam_pagina
+            self._recortar(True)
+            self.total += len(nuevas)
+            self._mostrar_total()
+
+        self.ejecutor.enviar(lambda: self._leer(consulta, params), recibidas, grupo=self.grupo)
+
+    def quitar_fila(self, pk):
+        self._datos_cambiados()
+        iid = str(pk)
+        if self.tree.exists(iid):
+            self._borrar([iid])
+            self._actualizar_limites()
+            self.total -= 1
+            self._mostrar_total()
+
+    def _dentro_de_ventana(self, clave):
+        """Indica si una fila (valor, clave) cae dentro del tramo de filas cargado en el Treeview"""
+        if not self.tree.get_children():
+            return not self._hay_antes and not self._hay_despues
+        buscada = _comparable(clave, self._plegar)
+        primera, ultima = _comparable(self._primera, self._plegar), _comparable(self._ultima, self._plegar)
+        antes = buscada < primera if self.ascendente else buscada > primera
+        despues = buscada > ultima if self.ascendente else buscada < ultima
+        if antes:
+            return not self._hay_antes
+        if despues:
+            return not self._hay_despues
+        return True
+
+    def _datos_cambiados(self):
+        # Lo guardado de esta tabla ya no es fiable tras una escritura
+        self._completa = None
+        if self.cache is not None:
+            self.cache.invalidar(self.tabla)
@@ -0,0 +1,63 @@
+# Campo con autocompletado de clientes y productos servido desde memoria
+import re
+import tkinter as tk
+from tkinter import ttk
+
+# Texto de una opcion elegida: "Nombre (#12)"
+_ELEGIDA = re.compile(r"\(#(\d+)\)\s*$")
+
+
+class Selector(ttk.Combobox):
+    """Combobox que propone nombres mientras se escribe y devuelve el id elegido
+
+    buscar(texto, limite) -> [(id, nombre)] debe responder desde memoria (Catalogo.buscar,
+    Nombres.buscar): escribir no lanza consultas. La flecha abajo despliega las propuestas e
+    Intro elige la unica que haya. Tambien se puede escribir el id directamente.
+    """
+
+    def __init__(self, master, buscar, al_elegir=None, limite=10, **opciones):
+        super().__init__(master, **opciones)
+        self.buscar = buscar
+        self.al_elegir = al_elegir
+        self.limite = limite
+        self.bind('<KeyRelease>', self._al_escribir)
+        self.bind('<Return>', self._al_confirmar)
+        self.bind('<<ComboboxSelected>>', lambda event: self._elegido())
+
+    def _al_escribir(self, event):
+        if event.keysym in ('Up', 'Down', 'Return', 'Escape', 'Tab'):
+            return
+        texto = self.get()
+        if not texto.strip() or texto.strip().isdigit() or _ELEGIDA.search(texto):
+            self['values'] = ()
+            return
+        self['values'] = [f"{nombre} (#{id_})" for id_, nombre in self.buscar(texto, self.limite)]
+
+    def _al_confirmar(self, event):
+        opciones = self['values']
+        if len(opciones) == 1 and not _ELEGIDA.search(self.get()):
+            self.set(opciones[0])
+        self._elegido()
+
+    def _elegido(self):
+        if self.al_elegir is not None and self.valor() is not None:
+            self.al_elegir(self.valor())
+
+    def valor(self):
+        """id elegido o escrito; None si esta vacio o el texto no corresponde a una opcion"""
+        texto = self.get().strip()
+        if texto.isdigit():
+            return int(texto)
+        elegida = _ELEGIDA.search(texto)
+        return int(elegida.group(1)) if elegida else None
+
+    def escrito(self):
+        """Indica si hay algo escrito (para distinguir 'vacio' de 'no valido')"""
+        return bool(self.get().strip())
+
+    def poner(self, id_, nombre=None):
+        self.delete(0, tk.END)
+        self['values'] = ()
+        if id_ in (None, "", "None"):
+            return
+        self.insert(0, f"{nombre} (#{id_})" if nombre else str(id_))
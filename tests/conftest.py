@@ -0,0 +1,35 @@
+# Las pruebas usan el motor SQLite sobre un fichero temporal: no hace falta servidor ni pantalla
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from tienda import Tienda  # noqa: E402
+from tienda.sqlite import SQLiteConnection  # noqa: E402
+
+
+@pytest.fixture
+def db(tmp_path):
+    conexion = SQLiteConnection(str(tmp_path / "tienda.sqlite3"))
+    conexion.connect()
+    conexion.create_tables()
+    yield conexion
+    conexion.disconnect()
+
+
+@pytest.fixture
+def tienda(db):
+    return Tienda(db)
+
+
+@pytest.fixture
+def producto(db):
+    """producto_id de un producto de 1.20 con 10 unidades"""
+    return db.insertar("INSERT INTO Productos (nombre, precio, stock) VALUES ('Pan', 1.20, 10)")
+
+
+@pytest.fixture
+def cliente(db):
+    return db.insertar("INSERT INTO Clientes (nombre) VALUES ('Ana')")
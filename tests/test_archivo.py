@@ -0,0 +1,50 @@
+from datetime import date, datetime
+from decimal import Decimal
+
+from tienda.archivo import Archivo, archivar, inicio_periodo_abierto, origen_ventas
+
+
+def _venta(db, cliente, producto, fecha):
+    venta_id = db.insertar("INSERT INTO Ventas (cliente_id, fecha, total) VALUES (%s, %s, %s)",
+                           (cliente, fecha, Decimal("1.20")))
+    db.ejecutar("INSERT INTO DetalleVentas (venta_id, producto_id, cantidad, precio_unitario) "
+                "VALUES (%s, %s, 1, %s)", (venta_id, producto, Decimal("1.20")))
+    return venta_id
+
+
+def _contar(db, tabla):
+    return db.consultar(f"SELECT COUNT(*) FROM {tabla}")[0][0]
+
+
+def test_archivar_por_lotes_mueve_solo_lo_anterior(db, cliente, producto):
+    antiguas = [_venta(db, cliente, producto, datetime(2026, 1, dia, 10)) for dia in range(1, 6)]
+    reciente = _venta(db, cliente, producto, datetime(2026, 3, 1, 10))
+    progreso = []
+    assert archivar(db, date(2026, 2, 1), tam_lote=2, pausa=0, al_progresar=progreso.append) == 5
+    assert progreso == [2, 4, 5]
+    assert [fila[0] for fila in db.consultar("SELECT venta_id FROM Ventas")] == [reciente]
+    assert (_contar(db, "VentasArchivo"), _contar(db, "DetalleVentasArchivo"), _contar(db, "DetalleVentas")) == (5, 5, 1)
+    # Las vistas siguen viendo todas las ventas y sus lineas
+    historico = db.consultar("SELECT venta_id FROM VentasHistorico ORDER BY venta_id")
+    assert [fila[0] for fila in historico] == antiguas + [reciente]
+    assert _contar(db, "DetalleVentasHistorico") == 6
+    # Repetirlo no mueve nada
+    assert archivar(db, date(2026, 2, 1), pausa=0) == 0
+
+
+def test_origen_segun_lo_archivado(db, cliente, producto):
+    archivo = Archivo(db)
+    assert archivo.actualizar() is None
+    assert archivo.origen(date(2020, 1, 1)) == "Ventas"
+    _venta(db, cliente, producto, datetime(2026, 1, 15, 10))
+    archivar(db, date(2026, 2, 1), pausa=0)
+    assert archivo.actualizar() == datetime(2026, 1, 15, 10)
+    assert archivo.origen(date(2026, 1, 15)) == "VentasHistorico"
+    assert archivo.origen(date(2026, 1, 16)) == "Ventas"
+    assert origen_ventas(archivo.hasta, None) == "Ventas"
+
+
+def test_inicio_periodo_abierto():
+    assert inicio_periodo_abierto(3, date(2026, 3, 20)) == date(2026, 1, 1)
+    assert inicio_periodo_abierto(1, date(2026, 1, 5)) == date(2026, 1, 1)
+    assert inicio_periodo_abierto(2, date(2026, 1, 5)) == date(2025, 12, 1)
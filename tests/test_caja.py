@@ -0,0 +1,42 @@
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+from tienda.caja import ErrorVenta, registrar_venta
+
+
+def _stock(db, producto_id):
+    return db.consultar("SELECT stock FROM Productos WHERE producto_id = %s", (producto_id,))[0][0]
+
+
+def test_registrar_venta_escribe_lineas_stock_total_y_resumen(db, cliente, producto):
+    otro = db.insertar("INSERT INTO Productos (nombre, precio, stock) VALUES ('Leche', 0.90, 5)")
+    venta_id, total = registrar_venta(db, cliente, [(producto, 2, Decimal("1.20")), (otro, 1, Decimal("0.90")),
+                                                    (producto, 1, Decimal("1.20"))],
+                                      fecha=datetime(2026, 3, 1, 10))
+    assert Decimal(str(total)) == Decimal("4.50")
+    assert db.consultar("SELECT COUNT(*) FROM DetalleVentas WHERE venta_id = %s", (venta_id,)) == [(3,)]
+    assert (_stock(db, producto), _stock(db, otro)) == (7, 4)
+    assert db.consultar("SELECT SUM(cantidad) FROM VentasDiarias WHERE fecha = '2026-03-01'") == [(4,)]
+
+
+def test_sin_stock_no_se_escribe_nada(db, cliente, producto):
+    with pytest.raises(ErrorVenta, match="Stock insuficiente de: Pan"):
+        registrar_venta(db, cliente, [(producto, 11, Decimal("1.20"))])
+    assert db.consultar("SELECT COUNT(*) FROM Ventas") == [(0,)]
+    assert _stock(db, producto) == 10
+
+
+def test_carrito_vacio_o_producto_inexistente(db, cliente, producto):
+    with pytest.raises(ErrorVenta, match="vacío"):
+        registrar_venta(db, cliente, [])
+    with pytest.raises(ErrorVenta, match="mayores que cero"):
+        registrar_venta(db, cliente, [(producto, 0, Decimal("1.20"))])
+    with pytest.raises(ErrorVenta, match="No existen los productos: 999"):
+        registrar_venta(db, cliente, [(999, 1, Decimal("1.20"))])
+
+
+def test_sin_exigir_stock_puede_quedar_negativo(db, cliente, producto):
+    registrar_venta(db, cliente, [(producto, 12, Decimal("1.20"))], exigir_stock=False)
+    assert _stock(db, producto) == -2
@@ -0,0 +1,53 @@
+import time
+
+from tienda.cambios import LectorCambios
+from tienda.sqlite import SQLiteConnection
+
+
+def _con_replica(tmp_path, retraso_maximo=5):
+    """Primaria con una replica que se ha quedado sin nada (otro fichero), dada por sana"""
+    vacia = SQLiteConnection(str(tmp_path / "replica.sqlite3"))
+    vacia.connect()
+    vacia.create_tables()
+    vacia.disconnect()
+    db = SQLiteConnection(str(tmp_path / "primaria.sqlite3"), retraso_maximo=retraso_maximo,
+                          replicas=[{'ruta': str(tmp_path / "replica.sqlite3")}])
+    db.connect()
+    db.create_tables()
+    replica = db.replicas[0]
+    replica.sana, replica.retraso, replica.comprobada_en = True, 0, time.monotonic()
+    return db
+
+
+def test_leer_trae_los_cambios_nuevos(db, producto):
+    lector = LectorCambios(db)
+    lector.iniciar()
+    otro = db.insertar("INSERT INTO Productos (nombre, precio, stock) VALUES ('Leche', 0.90, 5)")
+    db.ejecutar("UPDATE Productos SET stock = 4 WHERE producto_id = %s", (otro,))
+    db.ejecutar("UPDATE Productos SET stock = 9 WHERE producto_id = %s", (producto,))
+    assert lector.leer() == {'Productos': {otro: 'I', producto: 'U'}}
+    assert lector.leer() == {}
+
+
+def test_leer_va_a_la_primaria_aunque_haya_replica(tmp_path):
+    db = _con_replica(tmp_path)
+    try:
+        lector = LectorCambios(db)
+        lector.iniciar()
+        producto = db.insertar("INSERT INTO Productos (nombre, precio, stock) VALUES ('Pan', 1.20, 10)")
+        db._escrito_en = None  # que la replica siga siendo apta para leer
+        assert lector.leer() == {'Productos': {producto: 'I'}}
+    finally:
+        db.disconnect()
+
+
+def test_iniciar_con_replicas_vuelve_a_leer_lo_reciente(tmp_path):
+    db = _con_replica(tmp_path)
+    try:
+        # Escrito justo antes de cargar: la replica de la que se carga puede no tenerlo aun
+        producto = db.insertar("INSERT INTO Productos (nombre, precio, stock) VALUES ('Pan', 1.20, 10)")
+        lector = LectorCambios(db)
+        assert lector.iniciar() == 0
+        assert lector.leer() == {'Productos': {producto: 'I'}}
+    finally:
+        db.disconnect()
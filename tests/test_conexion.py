@@ -0,0 +1,10 @@
+from tienda.conexion import DatabaseConnection
+
+
+def test_replicas_heredan_la_contrasena_de_la_primaria():
+    # Sin abrir conexiones: solo los parametros con los que se crearia cada pool
+    db = DatabaseConnection("primaria", "tienda", "secreta", "TiendaDB",
+                            replicas=[{'host': "replica1"}, {'host': "replica2", 'password': "otra"}])
+    assert db.password == "secreta"
+    assert [(r.nombre, r.db.password) for r in db.replicas] == [("replica1:3306", "secreta"),
+                                                                 ("replica2:3306", "otra")]
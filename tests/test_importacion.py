@@ -0,0 +1,21 @@
+from datetime import datetime, timedelta
+
+from tienda.importacion import exportar_csv, importar_csv
+
+
+def test_fecha_vacia_toma_la_actual(db, cliente, tmp_path):
+    ruta = tmp_path / "ventas.csv"
+    ruta.write_text(f"cliente_id,fecha,total\n{cliente},,3.50\n{cliente},2026-01-02,1.00\n", encoding="utf-8")
+    resumen = importar_csv(db, "Ventas", str(ruta))
+    assert (resumen['filas'], resumen['rechazadas']) == (2, 0)
+    fechas = [fila[0] for fila in db.consultar("SELECT fecha FROM Ventas ORDER BY venta_id")]
+    assert abs(fechas[0] - datetime.now()) < timedelta(minutes=1)
+    assert fechas[1] == datetime(2026, 1, 2)
+
+
+def test_exportar_e_importar_de_nuevo(db, producto, tmp_path):
+    ruta = tmp_path / "productos.csv"
+    assert exportar_csv(db, "Productos", str(ruta))['filas'] == 1
+    db.ejecutar("DELETE FROM Productos")
+    assert importar_csv(db, "Productos", str(ruta))['filas'] == 1
+    assert db.consultar("SELECT producto_id, nombre, stock FROM Productos") == [(producto, 'Pan', 10)]
@@ -0,0 +1,22 @@
+from tienda.cambios import LectorCambios
+
+
+def test_nombres_de_clientes_al_dia_sin_releer_la_tabla(db, tienda, cliente):
+    nombres = tienda.nombres_clientes
+    assert nombres.cargar() == 1
+    lector = LectorCambios(db)
+    lector.iniciar()
+
+    # Escrituras de esta terminal: los repositorios ponen y quitan en memoria
+    luis = tienda.clientes.crear("Luis Pérez")
+    tienda.clientes.actualizar(cliente, "Ana Ruiz", None, None)
+    assert nombres.buscar("ruiz") == [(cliente, "Ana Ruiz")]
+    assert nombres.buscar("perez") == [(luis, "Luis Pérez")]
+
+    # Escrituras de otra terminal: llegan por el registro de cambios y se releen solo esas claves
+    marta = db.insertar("INSERT INTO Clientes (nombre) VALUES ('Marta')")
+    db.ejecutar("DELETE FROM Clientes WHERE cliente_id = %s", (luis,))
+    nombres.recargar(lector.leer()['Clientes'])
+    assert nombres.nombre(marta) == "Marta"
+    assert not nombres.existe(luis)
+    assert nombres.nombre(cliente) == "Ana Ruiz"
@@ -0,0 +1,69 @@
+# Comprobaciones de la ventana que no necesitan pantalla ni base de datos: se lee el codigo con ast
+import ast
+from pathlib import Path
+
+SCRIPT = Path(__file__).resolve().parent.parent / "Gestor de Tienda Codigo.py"
+
+
+def _ambitos(arbol):
+    """El modulo y cada funcion, con sus sentencias directas (y las de if/for/with/try dentro)"""
+    yield arbol
+    for nodo in ast.walk(arbol):
+        if isinstance(nodo, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            yield nodo
+
+
+def _sentencias(ambito):
+    pendientes = list(ambito.body)
+    while pendientes:
+        nodo = pendientes.pop()
+        yield nodo
+        if isinstance(nodo, (ast.If, ast.For, ast.While, ast.With, ast.Try)):
+            for campo in ('body', 'orelse', 'finalbody', 'handlers'):
+                pendientes.extend(getattr(nodo, campo, []))
+        elif isinstance(nodo, ast.ExceptHandler):
+            pendientes.extend(nodo.body)
+
+
+def test_ninguna_funcion_queda_tapada_por_una_variable():
+    # Una funcion auxiliar con el mismo nombre que un widget deja de ser llamable (nombre_producto)
+    arbol = ast.parse(SCRIPT.read_text(encoding="utf-8"))
+    for ambito in _ambitos(arbol):
+        funciones, asignados = set(), set()
+        for nodo in _sentencias(ambito):
+            if isinstance(nodo, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                funciones.add(nodo.name)
+            elif isinstance(nodo, (ast.Assign, ast.AnnAssign)):
+                objetivos = nodo.targets if isinstance(nodo, ast.Assign) else [nodo.target]
+                asignados.update(t.id for t in objetivos if isinstance(t, ast.Name))
+        assert not funciones & asignados, f"Nombres usados a la vez como funcion y como variable: {funciones & asignados}"
+
+
+def _es_widget(valor):
+    return (isinstance(valor, ast.Call) and isinstance(valor.func, ast.Attribute)
+            and isinstance(valor.func.value, ast.Name) and valor.func.value.id in ('tk', 'ttk'))
+
+
+def test_ningun_widget_se_crea_dos_veces_con_el_mismo_nombre():
+    # El segundo widget tapa al primero y el codigo de despues usa el que no es (total_ventas)
+    arbol = ast.parse(SCRIPT.read_text(encoding="utf-8"))
+    for ambito in _ambitos(arbol):
+        vistos, repetidos = set(), set()
+        for nodo in _sentencias(ambito):
+            if isinstance(nodo, ast.Assign) and _es_widget(nodo.value):
+                for objetivo in nodo.targets:
+                    if isinstance(objetivo, ast.Name):
+                        (repetidos if objetivo.id in vistos else vistos).add(objetivo.id)
+        assert not repetidos, f"Widgets creados dos veces con el mismo nombre: {repetidos}"
+
+
+def test_importar_el_script_no_abre_la_ventana():
+    # Todo el arranque va en main(): importarlo no conecta con la base de datos ni crea la ventana
+    arbol = ast.parse(SCRIPT.read_text(encoding="utf-8"))
+    for nodo in arbol.body:
+        if isinstance(nodo, (ast.Import, ast.ImportFrom, ast.FunctionDef, ast.ClassDef)):
+            continue
+        if isinstance(nodo, ast.If) and ast.unparse(nodo.test) == "__name__ == '__main__'":
+            continue
+        llamadas = {ast.unparse(n.func) for n in ast.walk(nodo) if isinstance(n, ast.Call)}
+        assert llamadas <= {'backend_configurado'}, f"Se ejecuta al importar: {ast.unparse(nodo)}"
@@ -0,0 +1,36 @@
+from tienda.migraciones import MIGRACIONES, migrar
+
+
+def _version(db):
+    return db.consultar("SELECT MAX(version) FROM SchemaVersion")[0][0]
+
+
+def test_migrar_otra_vez_no_aplica_nada(db):
+    assert _version(db) == MIGRACIONES[-1][0] == 6
+    assert migrar(db) == []
+    assert db.consultar("SELECT COUNT(*) FROM SchemaVersion") == [(len(MIGRACIONES),)]
+
+
+def _esquema(db):
+    return db.consultar("SELECT type, name FROM sqlite_master ORDER BY type, name")
+
+
+def test_migraciones_repetidas_sobre_un_esquema_que_ya_las_tiene(db, cliente):
+    # Una terminal que se cae tras aplicar los pasos y antes de anotarlos: se repiten sin error
+    esquema = _esquema(db)
+    db.ejecutar("DELETE FROM SchemaVersion WHERE version >= 5")
+    assert migrar(db) == [5, 6]
+    assert migrar(db) == []
+    assert _version(db) == 6
+    assert _esquema(db) == esquema
+    # Los disparadores no quedan duplicados: un cambio deja una sola fila en Cambios
+    antes = db.consultar("SELECT COUNT(*) FROM Cambios")[0][0]
+    db.ejecutar("UPDATE Clientes SET nombre = 'Ana Ruiz' WHERE cliente_id = %s", (cliente,))
+    assert db.consultar("SELECT COUNT(*) FROM Cambios")[0][0] == antes + 1
+
+
+def test_migrar_hasta_una_version(db):
+    db.ejecutar("DELETE FROM SchemaVersion WHERE version >= 4")
+    assert migrar(db, hasta=4) == [4]
+    assert _version(db) == 4
+    assert migrar(db) == [5, 6]
@@ -0,0 +1,88 @@
+# TablaPaginada con un Treeview falso: solo lo que usa la clase, sin Tk
+from paginacion import TablaPaginada
+
+
+class TreeFalso(dict):
+    """Treeview con show='headings': identify_row(1) cae en la cabecera"""
+
+    def __init__(self, columnas, filas=0, arriba=0):
+        super().__init__(columns=columnas)
+        self.hijos = [str(i) for i in range(1, filas + 1)]
+        self.arriba = arriba
+        self.valores = {}
+
+    def configure(self, **opciones):
+        pass
+
+    def heading(self, columna, *args, **opciones):
+        return columna
+
+    def get_children(self, *args):
+        return tuple(self.hijos)
+
+    def yview(self):
+        return (self.arriba / len(self.hijos), 1.0) if self.hijos else (0.0, 1.0)
+
+    def identify_row(self, y):
+        return ''
+
+    def insert(self, padre, posicion, iid, values):
+        self.hijos.insert(len(self.hijos) if posicion == 'end' else posicion, iid)
+        self.valores[iid] = values
+
+
+def _tabla(tree):
+    return TablaPaginada(tree, None, None, "Ventas", "venta_id", ordenables=('fecha',))
+
+
+def test_primera_visible_sale_de_yview():
+    assert _tabla(TreeFalso(('venta_id', 'fecha'), filas=400, arriba=137))._primera_visible() == '138'
+    assert _tabla(TreeFalso(('venta_id', 'fecha'), filas=400))._primera_visible() == '1'
+    assert _tabla(TreeFalso(('venta_id', 'fecha')))._primera_visible() == ''
+
+
+def test_ordenar_recarga_desde_la_fila_a_la_vista():
+    tabla = _tabla(TreeFalso(('venta_id', 'fecha'), filas=400, arriba=137))
+    pedidas = []
+    tabla.recargar = lambda *args, **opciones: pedidas.append(opciones['desde'])
+    tabla.ordenar('fecha')
+    assert pedidas == [138]
+    assert (tabla.orden, tabla.ascendente) == ('fecha', True)
+
+
+def test_null_se_muestra_como_celda_vacia():
+    # ttk convierte None en el texto "None", que el formulario copiaria y volveria a guardar
+    tree = TreeFalso(('producto_id', 'nombre', 'descripcion', 'categoria_id'))
+    tabla = TablaPaginada(tree, None, None, "Productos", "producto_id")
+    tabla._insertar([(7, "Pan", None, None)], 'end')
+    assert tree.valores['7'] == (7, "Pan", "", "")
+
+
+class DbFalsa:
+    def __init__(self, dialecto):
+        self.dialecto = dialecto
+
+
+def _por_nombre(dialecto, nombres):
+    tree = TreeFalso(('cliente_id', 'nombre'))
+    tabla = TablaPaginada(tree, DbFalsa(dialecto), None, "Clientes", "cliente_id", ordenables=('nombre',))
+    tabla.orden = 'nombre'
+    tabla._insertar(list(enumerate(nombres, start=1)), 'end')
+    tabla._hay_despues = True
+    return tabla
+
+
+def test_fila_refrescada_se_coloca_como_ordena_mysql():
+    # utf8mb4_0900_ai_ci: "álvaro" va antes que "Ana" y "carlos" entre "Beatriz" y "Daniel"
+    tabla = _por_nombre('mysql', ["Ana", "Beatriz", "Daniel"])
+    assert tabla._posicion(("álvaro", 9)) == 0
+    assert tabla._posicion(("carlos", 9)) == 2
+    assert tabla._dentro_de_ventana(("Álvaro", 9))
+    assert not tabla._dentro_de_ventana(("eva", 9))
+
+
+def test_fila_refrescada_se_coloca_como_ordena_sqlite():
+    # SQLite compara byte a byte: las minusculas y los acentos van detras de las mayusculas
+    tabla = _por_nombre('sqlite', ["Ana", "Beatriz", "Daniel"])
+    assert tabla._posicion(("Carlos", 9)) == 2
+    assert not tabla._dentro_de_ventana(("álvaro", 9))
@@ -0,0 +1,49 @@
+from datetime import date, datetime
+from decimal import Decimal
+
+from tienda.archivo import archivar
+from tienda.reportes import INFORMES, con_resumen, reconstruir_resumen
+
+
+def _venta(db, cliente, producto, fecha, cantidad):
+    venta_id = db.insertar("INSERT INTO Ventas (cliente_id, fecha, total) VALUES (%s, %s, %s)",
+                           (cliente, fecha, Decimal("1.20") * cantidad))
+    db.ejecutar("INSERT INTO DetalleVentas (venta_id, producto_id, cantidad, precio_unitario) "
+                "VALUES (%s, %s, %s, %s)", (venta_id, producto, cantidad, Decimal("1.20")))
+    return venta_id
+
+
+def _resumen(db, fecha):
+    return db.consultar("SELECT cantidad, importe FROM VentasDiarias WHERE fecha = %s", (fecha,))
+
+
+def test_con_resumen_rehace_los_dias_antes_y_despues_del_cambio(db, cliente, producto):
+    venta_id = _venta(db, cliente, producto, datetime(2026, 3, 1, 10), 2)
+    con_resumen(db, [venta_id], lambda cursor: None)
+    assert _resumen(db, date(2026, 3, 1)) == [(2, Decimal("2.40"))]
+
+    # Mover la venta de dia deja vacio el dia de antes y suma en el nuevo
+    con_resumen(db, [venta_id], lambda cursor: cursor.execute(
+        "UPDATE Ventas SET fecha = %s WHERE venta_id = %s", (datetime(2026, 3, 2, 10), venta_id)))
+    assert _resumen(db, date(2026, 3, 1)) == []
+    assert _resumen(db, date(2026, 3, 2)) == [(2, Decimal("2.40"))]
+
+
+def test_rehacer_un_dia_archivado_conserva_lo_archivado(db, cliente, producto):
+    archivada = _venta(db, cliente, producto, datetime(2026, 1, 10, 9), 2)
+    con_resumen(db, [archivada], lambda cursor: None)
+    assert archivar(db, date(2026, 2, 1), pausa=0) == 1
+
+    caliente = _venta(db, cliente, producto, datetime(2026, 3, 5, 9), 1)
+    con_resumen(db, [caliente], lambda cursor: cursor.execute(
+        "UPDATE Ventas SET fecha = %s WHERE venta_id = %s", (datetime(2026, 1, 10, 18), caliente)))
+    assert _resumen(db, date(2026, 1, 10)) == [(3, Decimal("3.60"))]
+
+
+def test_informes_devuelven_importes_decimales(db, cliente, producto):
+    for hora in (9, 10, 11):
+        _venta(db, cliente, producto, datetime(2026, 4, 1, hora), 1)
+    reconstruir_resumen(db)
+    for nombre, informe in INFORMES.items():
+        _, filas = informe(db, date(2026, 4, 1), date(2026, 4, 30))
+        assert [fila[-1] for fila in filas] == [Decimal("3.60")], nombre
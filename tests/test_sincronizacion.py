@@ -0,0 +1,71 @@
+import sqlite3
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+from tienda.caja import ErrorVenta
+from tienda.diario import Diario
+from tienda.sincronizacion import Sincronizador, es_error_conexion
+from tienda.sqlite import SQLiteConnection
+
+
+@pytest.fixture
+def diario(tmp_path):
+    diario = Diario(str(tmp_path / "diario.sqlite3"))
+    yield diario
+    diario.cerrar()
+
+
+def test_bloqueos_y_caidas_son_pasajeros():
+    assert es_error_conexion(sqlite3.OperationalError("database is locked"))
+    assert es_error_conexion(sqlite3.OperationalError("database is busy"))
+    assert es_error_conexion(ConnectionRefusedError())
+    assert not es_error_conexion(sqlite3.OperationalError("no such table: Ventas"))
+    assert not es_error_conexion(sqlite3.IntegrityError("FOREIGN KEY constraint failed"))
+
+
+def test_venta_con_la_base_bloqueada_sigue_pendiente(db, cliente, diario):
+    # Otra terminal tiene abierta una escritura: la venta espera en el diario en vez de perderse
+    ocupada = SQLiteConnection(db.ruta, tiempo_espera=0.05)
+    ocupada.connect()
+    bloqueo = sqlite3.connect(db.ruta, isolation_level=None)
+    sincronizador = Sincronizador(ocupada, diario)
+    try:
+        sincronizador.anotar_venta(cliente, datetime(2026, 3, 1, 10), "2.40")
+        bloqueo.execute("BEGIN IMMEDIATE")
+        with pytest.raises(sqlite3.OperationalError):
+            sincronizador.sincronizar()
+        assert diario.resumen()['pendiente'] == 1
+
+        bloqueo.execute("ROLLBACK")
+        assert sincronizador.sincronizar() == 1
+        assert diario.resumen() == {'pendiente': 0, 'hecha': 1, 'fallida': 0}
+    finally:
+        bloqueo.close()
+        ocupada.disconnect()
+
+
+def test_datos_mal_escritos_se_avisan_al_anotar(db, diario):
+    sincronizador = Sincronizador(db, diario)
+    with pytest.raises(ErrorVenta, match="Total"):
+        sincronizador.anotar_venta(None, "2026-03-01", "12,3x")
+    with pytest.raises(ErrorVenta, match="Fecha"):
+        sincronizador.anotar_venta(None, "31/02/2026", "2.40")
+    with pytest.raises(ErrorVenta, match="Cantidad"):
+        sincronizador.anotar_detalle("L1", 1, "dos", "1.20")
+    with pytest.raises(ErrorVenta, match="Cantidad"):
+        sincronizador.anotar_detalle("L1", 1, "0", "1.20")
+    with pytest.raises(ErrorVenta, match="Precio unitario"):
+        sincronizador.anotar_detalle("L1", 1, "2", "")
+    assert diario.resumen()['pendiente'] == 0
+
+
+def test_venta_y_detalle_anotados_llegan_convertidos(db, cliente, producto, diario):
+    sincronizador = Sincronizador(db, diario)
+    sincronizador.anotar_venta(cliente, "2026-03-01", "2,40")
+    sincronizador.anotar_detalle("L1", producto, " 2 ", Decimal("1.20"))
+    assert sincronizador.sincronizar() == 2
+    assert diario.resumen()['fallida'] == 0
+    assert db.consultar("SELECT fecha, total FROM Ventas") == [(datetime(2026, 3, 1), Decimal("2.40"))]
+    assert db.consultar("SELECT cantidad, precio_unitario FROM DetalleVentas") == [(2, Decimal("1.20"))]
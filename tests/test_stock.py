@@ -0,0 +1,23 @@
+from decimal import Decimal
+
+from tienda.stock import guardar_cambios_producto
+
+
+def _producto(db, producto_id):
+    return db.consultar("SELECT nombre, stock, version FROM Productos WHERE producto_id = %s", (producto_id,))[0]
+
+
+def test_edicion_con_la_version_leida_suma_la_diferencia_de_stock(db, producto):
+    _, _, version = _producto(db, producto)
+    # Entretanto se venden 3 (las ventas no cambian la version): +5 se suma a lo que quede
+    db.ejecutar("UPDATE Productos SET stock = stock - 3 WHERE producto_id = %s", (producto,))
+    assert guardar_cambios_producto(db, producto, version, "Pan de leña", "", Decimal("1.30"), None, 5)
+    assert _producto(db, producto) == ("Pan de leña", 12, version + 1)
+
+
+def test_conflicto_de_version_no_cambia_nada(db, producto):
+    _, _, version = _producto(db, producto)
+    assert guardar_cambios_producto(db, producto, version, "Pan", "", Decimal("1.20"), None, 0)
+    # La segunda terminal edita con la version que leyo antes del primer guardado
+    assert guardar_cambios_producto(db, producto, version, "Pan integral", "", Decimal("1.50"), None, -4) is False
+    assert _producto(db, producto) == ("Pan", 10, version + 1)
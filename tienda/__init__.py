@@ -0,0 +1,56 @@
+# Logica de la tienda sin interfaz: conexion, repositorios por tabla, caja, stock, importacion y reportes
+# Importar el paquete no abre conexiones ni carga mysql.connector; eso ocurre al usar la base de datos.
+from tienda.archivo import Archivo
+from tienda.catalogo import Catalogo
+from tienda.conexion import ConexionBase, DatabaseConnection, ErrorPool
+from tienda.indice import Nombres
+from tienda.instrumentacion import Instrumentacion
+from tienda.repositorios import Categorias, Clientes, DetalleVentas, Productos, Ventas
+
+
+class Tienda:
+    """Punto de entrada para procesos por lotes: un repositorio por tabla sobre la misma conexion
+
+    El catalogo de productos se carga al primer catalogo.cargar() o catalogo.sincronizar() y
+    los nombres de clientes con nombres_clientes.cargar(); las escrituras hechas con estos
+    repositorios los mantienen al dia.
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self.catalogo = Catalogo(db)
+        self.nombres_clientes = Nombres(db, "Clientes", "cliente_id")
+        self.clientes = Clientes(db, self.nombres_clientes)
+        self.productos = Productos(db, self.catalogo)
+        self.categorias = Categorias(db)
+        self.ventas = Ventas(db, self.catalogo)
+        self.detalle = DetalleVentas(db)
+        self.archivo = Archivo(db)
+
+    def cerrar(self):
+        self.db.disconnect()
+
+
+def backend_configurado(config=None):
+    """Clase del motor elegido en config.BACKEND y sus parametros: (clase, kwargs)"""
+    if config is None:
+        import config
+    comunes = dict(config.POOL_CONFIG)
+    if hasattr(config, 'INSTRUMENTACION_CONFIG'):
+        comunes['instrumentacion'] = Instrumentacion(**config.INSTRUMENTACION_CONFIG)
+    if config.BACKEND == 'sqlite':
+        from tienda.sqlite import SQLiteConnection
+        return SQLiteConnection, {**config.SQLITE_CONFIG, **comunes}
+    if config.BACKEND == 'mysql':
+        return DatabaseConnection, {**config.DATABASE_CONFIG, **comunes}
+    raise ValueError(f"Motor de base de datos desconocido: {config.BACKEND}")
+
+
+def abrir(config=None, crear_tablas=False):
+    """Crear la conexion del motor de config.py (u otro modulo de configuracion) y devolver una Tienda"""
+    clase, parametros = backend_configurado(config)
+    db = clase(**parametros)
+    db.connect()
+    if crear_tablas:
+        db.create_tables()
+    return Tienda(db)
@@ -0,0 +1,97 @@
+# Archivo de ventas: las de periodos cerrados salen de Ventas/DetalleVentas para que no crezcan sin fin
+# Las tablas y las vistas VentasHistorico y DetalleVentasHistorico las crea la migracion 6.
+import time
+from datetime import date, datetime
+
+_COLUMNAS_VENTAS = "venta_id, cliente_id, fecha, total"
+_COLUMNAS_DETALLE = "detalle_id, venta_id, producto_id, cantidad, precio_unitario"
+
+
+def inicio_periodo_abierto(meses_calientes, hoy=None):
+    """Dia 1 del mes mas antiguo que se queda en las tablas calientes (hoy incluido en el mes en curso)"""
+    hoy = hoy or date.today()
+    meses = hoy.year * 12 + hoy.month - 1 - (meses_calientes - 1)
+    return date(meses // 12, meses % 12 + 1, 1)
+
+
+def archivado_hasta(db):
+    """Fecha de la ultima venta archivada, o None si el archivo esta vacio (por el indice de fecha)"""
+    hasta = db.consultar("SELECT MAX(fecha) FROM VentasArchivo")[0][0]
+    if isinstance(hasta, str):
+        hasta = datetime.fromisoformat(hasta)
+    return hasta
+
+
+def origen_ventas(hasta, desde):
+    """'Ventas' si lo pedido desde esa fecha ya esta entero en las tablas calientes; si no, la vista
+
+    hasta: lo que devuelve archivado_hasta. Sin fecha desde solo se miran las calientes.
+    """
+    if hasta is None or desde is None:
+        return "Ventas"
+    if isinstance(desde, datetime):
+        desde = desde.date()
+    return "VentasHistorico" if desde <= hasta.date() else "Ventas"
+
+
+def archivar(db, antes_de, tam_lote=500, pausa=0.1, al_progresar=None):
+    """Mover a las tablas de archivo las ventas (y sus lineas) con fecha anterior a antes_de
+
+    Por lotes de tam_lote ventas, cada uno en su propia transaccion: las filas bloqueadas son
+    pocas y durante poco tiempo, y entre lote y lote se cede el paso (pausa) a las cajas. Varias
+    terminales pueden lanzarlo a la vez; FOR UPDATE hace que cada venta la mueva solo una.
+    VentasDiarias no se toca: los informes siguen contando las ventas archivadas.
+    Devuelve el numero de ventas movidas.
+    """
+    movidas = 0
+    while True:
+        with db.conexion() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute("SELECT venta_id FROM Ventas WHERE fecha < %s "
+                               "ORDER BY fecha, venta_id LIMIT %s FOR UPDATE", (antes_de, tam_lote))
+                ids = [fila[0] for fila in cursor.fetchall()]
+                if ids:
+                    marcas = ", ".join(["%s"] * len(ids))
+                    # Primero las lineas: DetalleVentas.venta_id referencia a Ventas
+                    cursor.execute(f"INSERT INTO DetalleVentasArchivo ({_COLUMNAS_DETALLE}) "
+                                   f"SELECT {_COLUMNAS_DETALLE} FROM DetalleVentas WHERE venta_id IN ({marcas})", ids)
+                    cursor.execute(f"INSERT INTO VentasArchivo ({_COLUMNAS_VENTAS}) "
+                                   f"SELECT {_COLUMNAS_VENTAS} FROM Ventas WHERE venta_id IN ({marcas})", ids)
+                    cursor.execute(f"DELETE FROM DetalleVentas WHERE venta_id IN ({marcas})", ids)
+                    cursor.execute(f"DELETE FROM Ventas WHERE venta_id IN ({marcas})", ids)
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+            finally:
+                cursor.close()
+        if not ids:
+            return movidas
+        movidas += len(ids)
+        if al_progresar is not None:
+            al_progresar(movidas)
+        if len(ids) < tam_lote:
+            return movidas
+        time.sleep(pausa)
+
+
+class Archivo:
+    """Hasta donde llega el archivo, guardado en memoria para decidir sin consultar si un filtro lo necesita"""
+
+    def __init__(self, db):
+        self.db = db
+        self.hasta = None
+
+    def actualizar(self):
+        self.hasta = archivado_hasta(self.db)
+        return self.hasta
+
+    def origen(self, desde):
+        return origen_ventas(self.hasta, desde)
+
+    def archivar(self, meses_calientes=3, tam_lote=500, pausa=0.1):
+        """Archivar todo lo anterior a los ultimos meses_calientes meses; devuelve las ventas movidas"""
+        movidas = archivar(self.db, inicio_periodo_abierto(meses_calientes), tam_lote, pausa)
+        self.actualizar()
+        return movidas
@@ -0,0 +1,69 @@
+# Condiciones de busqueda para los filtros que aprovechan los indices de create_tables
+import re
+import unicodedata
+
+# Palabras mas cortas no entran en el indice FULLTEXT de InnoDB (innodb_ft_min_token_size)
+LONGITUD_MINIMA_FULLTEXT = 3
+
+
+def condicion_texto(termino, columna, columnas_fulltext, fulltext=True):
+    """Elegir busqueda exacta, por prefijo o de texto completo segun lo escrito
+
+    - "texto" entre comillas: igualdad exacta sobre la columna
+    - solo palabras cortas: prefijo (LIKE 'texto%'), que usa el indice B-tree
+    - el resto: MATCH ... AGAINST en modo booleano, cada palabra como prefijo obligatorio
+      (sin FULLTEXT, como en SQLite, cada palabra como prefijo de alguna palabra con LIKE)
+    Devuelve (condicion, params) para TablaPaginada.recargar
+    """
+    termino = termino.strip()
+    if len(termino) >= 2 and termino[0] == termino[-1] == '"':
+        return f"{columna} = %s", (termino[1:-1],)
+    # MySQL escapa con \\ por defecto en LIKE; SQLite necesita la clausula ESCAPE
+    escape = "" if fulltext else " ESCAPE '\\'"
+    palabras = [p for p in re.findall(r"\w+", termino) if len(p) >= LONGITUD_MINIMA_FULLTEXT]
+    if not palabras:
+        return f"{columna} LIKE %s{escape}", (escapar_like(termino) + "%",)
+    if not fulltext:
+        condiciones, params = [], []
+        for palabra in palabras:
+            patron = escapar_like(palabra)
+            condiciones.append("(" + " OR ".join(f"{c} LIKE %s{escape} OR {c} LIKE %s{escape}"
+                                                 for c in columnas_fulltext) + ")")
+            params.extend([patron + "%", "% " + patron + "%"] * len(columnas_fulltext))
+        return " AND ".join(condiciones), tuple(params)
+    expresion = " ".join(f"+{p}*" for p in palabras)
+    return f"MATCH({', '.join(columnas_fulltext)}) AGAINST (%s IN BOOLEAN MODE)", (expresion,)
+
+
+def condicion_id(texto, columna):
+    """Igualdad numerica sobre una columna de id; None si el texto no es un numero"""
+    texto = texto.strip()
+    if not texto.isdigit():
+        return None
+    return f"{columna} = %s", (int(texto),)
+
+
+def escapar_like(texto):
+    return texto.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def coincide(textos, termino):
+    """Evaluar en memoria la misma busqueda que condicion_texto sobre los textos de una fila
+
+    textos[0] es la columna principal y el resto las demas columnas del indice FULLTEXT.
+    Se usa para refinar resultados ya descargados sin volver a consultar.
+    """
+    termino = termino.strip()
+    if len(termino) >= 2 and termino[0] == termino[-1] == '"':
+        return normalizar(textos[0]) == normalizar(termino[1:-1])
+    palabras = [p for p in re.findall(r"\w+", termino) if len(p) >= LONGITUD_MINIMA_FULLTEXT]
+    if not palabras:
+        return normalizar(textos[0]).startswith(normalizar(termino))
+    encontradas = re.findall(r"\w+", normalizar(" ".join(str(t) for t in textos if t is not None)))
+    return all(any(e.startswith(normalizar(p)) for e in encontradas) for p in palabras)
+
+
+def normalizar(texto):
+    """Minusculas y sin acentos, como la collation *_ai_ci de MySQL"""
+    texto = unicodedata.normalize("NFD", str(texto or "").lower())
+    return "".join(c for c in texto if unicodedata.category(c) != "Mn")
@@ -0,0 +1,47 @@
+# Cache LRU de resultados de consultas de los filtros
+import threading
+from collections import OrderedDict
+
+
+class CacheConsultas:
+    """Guarda las ultimas consultas (tabla, condicion, params) -> resultado y las invalida por tabla"""
+
+    def __init__(self, max_entradas=64):
+        self.max_entradas = max_entradas
+        self._entradas = OrderedDict()
+        self._versiones = {}  # tabla -> numero de invalidaciones
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+
+    def obtener(self, tabla, condicion, params):
+        clave = (tabla, condicion, tuple(params))
+        with self._lock:
+            if clave not in self._entradas:
+                self.fallos += 1
+                return None
+            self._entradas.move_to_end(clave)
+            self.aciertos += 1
+            return self._entradas[clave]
+
+    def version(self, tabla):
+        with self._lock:
+            return self._versiones.get(tabla, 0)
+
+    def guardar(self, tabla, condicion, params, valor, version=None):
+        """Guardar un resultado; si se pidio antes de una invalidacion (version vieja) se ignora"""
+        clave = (tabla, condicion, tuple(params))
+        with self._lock:
+            if version is not None and version != self._versiones.get(tabla, 0):
+                return
+            self._entradas[clave] = valor
+            self._entradas.move_to_end(clave)
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+
+    def invalidar(self, tabla):
+        """Descartar todo lo guardado de una tabla tras escribir en ella"""
+        with self._lock:
+            self._versiones[tabla] = self._versiones.get(tabla, 0) + 1
+            for clave in [c for c in self._entradas if c[0] == tabla]:
+                del self._entradas[clave]
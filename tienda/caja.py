@@ -0,0 +1,84 @@
+# Cobro de una venta completa (cabecera, lineas y stock) en una sola transaccion
+from tienda.reportes import acumular_venta
+from tienda.stock import bloquear_productos, con_reintentos, descontar_stock
+
+
+class ErrorVenta(Exception):
+    """La venta no se puede registrar (carrito vacio, cantidades no validas o falta de stock)"""
+
+
+def registrar_venta(db, cliente_id, carrito, fecha=None, exigir_stock=True):
+    """Registrar una venta con todas sus lineas y confirmar una sola vez
+
+    carrito es una lista de (producto_id, cantidad, precio_unitario). Los productos se bloquean
+    con SELECT ... FOR UPDATE, se inserta la cabecera, las lineas con un solo executemany, se
+    descuenta el stock con un unico UPDATE relativo, se suma al resumen diario de ventas y el
+    total lo calcula el servidor a partir de las lineas. Si InnoDB aborta por interbloqueo se
+    repite. Devuelve (venta_id, total).
+    """
+    lineas, cantidades = _preparar(carrito)
+    return con_reintentos(lambda: _registrar(db, cliente_id, lineas, cantidades, fecha, exigir_stock))
+
+
+def _preparar(carrito):
+    lineas = [(int(producto_id), int(cantidad), precio) for producto_id, cantidad, precio in carrito]
+    if not lineas:
+        raise ErrorVenta("El carrito está vacío.")
+    if any(cantidad <= 0 for _, cantidad, _ in lineas):
+        raise ErrorVenta("Las cantidades deben ser mayores que cero.")
+    cantidades = {}
+    for producto_id, cantidad, _ in lineas:
+        cantidades[producto_id] = cantidades.get(producto_id, 0) + cantidad
+    return lineas, cantidades
+
+
+def _registrar(db, cliente_id, lineas, cantidades, fecha, exigir_stock):
+    with db.conexion() as conn:
+        cursor = db.cursor_preparado(conn)
+        try:
+            resultado = _escribir_venta(cursor, db.dialecto, cliente_id, lineas, cantidades, fecha, exigir_stock)
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+    return resultado
+
+
+def cobrar_en(cursor, dialecto, cliente_id, carrito, fecha=None, exigir_stock=True):
+    """Lo mismo que registrar_venta dentro de una transaccion ya abierta por quien llama (sin commit)
+
+    Con exigir_stock=False la venta se registra aunque el stock quede negativo: es el caso de
+    las ventas hechas sin conexion, que ya se entregaron al cliente.
+    """
+    lineas, cantidades = _preparar(carrito)
+    return _escribir_venta(cursor, dialecto, cliente_id, lineas, cantidades, fecha, exigir_stock)
+
+
+def _escribir_venta(cursor, dialecto, cliente_id, lineas, cantidades, fecha, exigir_stock):
+    existencias = bloquear_productos(cursor, cantidades)
+    no_existen = sorted(set(cantidades) - set(existencias))
+    if no_existen:
+        raise ErrorVenta("No existen los productos: " + ", ".join(str(p) for p in no_existen))
+    sin_stock = sorted(nombre for producto_id, (nombre, stock) in existencias.items()
+                       if stock < cantidades[producto_id])
+    if sin_stock and exigir_stock:
+        raise ErrorVenta("Stock insuficiente de: " + ", ".join(sin_stock))
+    if fecha:
+        cursor.execute("INSERT INTO Ventas (cliente_id, fecha, total) VALUES (%s, %s, 0)", (cliente_id, fecha))
+    else:
+        cursor.execute("INSERT INTO Ventas (cliente_id, total) VALUES (%s, 0)", (cliente_id,))
+    venta_id = cursor.lastrowid
+    cursor.executemany(
+        "INSERT INTO DetalleVentas (venta_id, producto_id, cantidad, precio_unitario) VALUES (%s, %s, %s, %s)",
+        [(venta_id, producto_id, cantidad, precio) for producto_id, cantidad, precio in lineas])
+    descontar_stock(cursor, cantidades)
+    acumular_venta(cursor, venta_id, dialecto)
+    cursor.execute(
+        """UPDATE Ventas SET total = (SELECT SUM(cantidad * precio_unitario)
+                                     FROM DetalleVentas WHERE venta_id = %s)
+           WHERE venta_id = %s""", (venta_id, venta_id))
+    cursor.execute("SELECT total FROM Ventas WHERE venta_id = %s", (venta_id,))
+    total = cursor.fetchall()[0][0]
+    return venta_id, total
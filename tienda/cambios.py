@@ -0,0 +1,116 @@
+# Lectura del registro de cambios (tabla Cambios, migracion 5) para ver lo que escriben otras terminales
+import threading
+import time
+
+# Condicion de las filas anteriores a 'horas' horas, por motor
+_ANTIGUAS = {
+    'mysql': "fecha < NOW() - INTERVAL %s HOUR",
+    'sqlite': "fecha < datetime('now', 'localtime', '-' || %s || ' hours')",
+}
+
+# Lo mismo en segundos, para el arranque con replicas
+_ANTERIORES = {
+    'mysql': "fecha < NOW() - INTERVAL %s SECOND",
+    'sqlite': "fecha < datetime('now', 'localtime', '-' || %s || ' seconds')",
+}
+
+
+class LectorCambios:
+    """Trae de Cambios las filas posteriores al ultimo seq visto y las agrupa por tabla
+
+    En MySQL el seq se asigna al insertar y no al confirmar: una transaccion larga puede
+    confirmar un seq menor despues de que otro mayor ya se haya leido. Los huecos que quedan
+    por debajo del ultimo seq se vuelven a pedir durante espera_huecos segundos; pasado ese
+    tiempo se dan por perdidos (transacciones deshechas, que no dejan cambios).
+    Cambios se lee siempre de la primaria: en una replica con retraso faltarian los ultimos.
+    """
+
+    def __init__(self, db, limite=500, espera_huecos=60, max_huecos=1000):
+        self.db = db
+        self.limite = limite
+        self.espera_huecos = espera_huecos
+        self.max_huecos = max_huecos
+        self._lock = threading.Lock()
+        self.ultimo = None
+        self._huecos = {}  # seq -> time.monotonic() en que se vio que faltaba
+
+    def iniciar(self):
+        """Empezar a partir del ultimo cambio actual (lo anterior ya esta en lo que se carga ahora)
+
+        Con replicas lo que se carga puede venir de una que va hasta retraso_maximo segundos por
+        detras: se empieza en el ultimo cambio anterior a ese retraso y los mas recientes se
+        vuelven a leer (refrescar una fila que ya estaba al dia no cambia nada).
+        """
+        if self.db.replicas:
+            margen = max(replica.retraso_maximo for replica in self.db.replicas) + 1
+            filas = self.db.consultar(f"SELECT seq FROM Cambios WHERE {_ANTERIORES[self.db.dialecto]} "
+                                      "ORDER BY seq DESC LIMIT 1", (margen,), primaria=True)
+            ultimo = filas[0][0] if filas else 0
+        else:
+            ultimo = self.db.consultar("SELECT COALESCE(MAX(seq), 0) FROM Cambios", primaria=True)[0][0]
+        with self._lock:
+            self.ultimo = int(ultimo)
+            self._huecos = {}
+        return self.ultimo
+
+    def leer(self):
+        """{tabla: {clave: operacion}} de los cambios nuevos, o None si son demasiados
+
+        Con None quien llama recarga lo que tenga abierto; la lectura sigue desde el ultimo
+        cambio actual. Una clave con varios cambios se queda con el ultimo, salvo que se
+        insertara y luego cambiara ('I').
+        """
+        with self._lock:
+            ultimo = self.ultimo
+            ahora = time.monotonic()
+            self._huecos = {seq: visto for seq, visto in self._huecos.items()
+                            if ahora - visto < self.espera_huecos}
+            huecos = sorted(self._huecos)
+        if ultimo is None:
+            self.iniciar()
+            return {}
+        filas = self.db.consultar("SELECT seq, tabla, clave, operacion FROM Cambios "
+                                  "WHERE seq > %s ORDER BY seq LIMIT %s", (ultimo, self.limite + 1),
+                                  preparada=True, primaria=True)
+        if len(filas) > self.limite:
+            self.iniciar()
+            return None
+        if huecos:
+            marcas = ", ".join(["%s"] * len(huecos))
+            filas = self.db.consultar("SELECT seq, tabla, clave, operacion FROM Cambios "
+                                      f"WHERE seq IN ({marcas})", huecos, primaria=True) + filas
+        cambios = {}
+        with self._lock:
+            if self.ultimo != ultimo:
+                return {}  # otra lectura se ha adelantado; ya trae estos cambios
+            esperado = ultimo + 1
+            for seq, tabla, clave, operacion in filas:
+                seq = int(seq)
+                por_clave = cambios.setdefault(tabla, {})
+                # Insertada y luego cambiada sigue siendo nueva para quien la lee
+                if not (operacion == 'U' and por_clave.get(int(clave)) == 'I'):
+                    por_clave[int(clave)] = operacion
+                if seq in self._huecos:
+                    del self._huecos[seq]
+                    continue
+                if seq > esperado and seq - esperado <= self.max_huecos:
+                    for falta in range(esperado, seq):
+                        self._huecos[falta] = ahora
+                esperado = seq + 1
+                self.ultimo = seq
+        return cambios
+
+    def purgar(self, horas=24, tam_lote=5000):
+        """Borrar por lotes los cambios de hace mas de 'horas' horas; devuelve cuantos se borraron"""
+        condicion = _ANTIGUAS[self.db.dialecto]
+        hasta = self.db.consultar(f"SELECT MAX(seq) FROM Cambios WHERE {condicion}", (horas,), primaria=True)[0][0]
+        if hasta is None:
+            return 0
+        desde = self.db.consultar("SELECT MIN(seq) FROM Cambios", primaria=True)[0][0]
+        borrados = 0
+        # Por tramos de seq: cada DELETE es una transaccion corta que no bloquea a las cajas
+        while desde <= hasta:
+            tope = min(desde + tam_lote - 1, hasta)
+            borrados += self.db.ejecutar("DELETE FROM Cambios WHERE seq BETWEEN %s AND %s", (desde, tope))
+            desde = tope + 1
+        return borrados
@@ -0,0 +1,180 @@
+# Catalogo de productos en memoria para consultar precio y stock sin ir al servidor
+import threading
+from datetime import datetime, timedelta
+
+from tienda.indice import IndicePrefijos
+
+_COLUMNAS = "producto_id, nombre, precio, stock, categoria_id, version, actualizado_en"
+
+
+class Producto:
+    """Fila del catalogo; __slots__ para que miles de productos ocupen poco"""
+
+    __slots__ = ('producto_id', 'nombre', 'precio', 'stock', 'categoria_id', 'version', 'actualizado_en')
+
+    def __init__(self, producto_id, nombre, precio, stock, categoria_id, version, actualizado_en):
+        self.producto_id = producto_id
+        self.nombre = nombre
+        self.precio = precio
+        self.stock = stock
+        self.categoria_id = categoria_id
+        self.version = version
+        self.actualizado_en = actualizado_en
+
+    def __eq__(self, otro):
+        return isinstance(otro, Producto) and all(getattr(self, c) == getattr(otro, c) for c in self.__slots__)
+
+
+def _fecha(valor):
+    # Por si el motor devuelve la marca de tiempo como texto
+    return datetime.fromisoformat(valor) if isinstance(valor, str) else valor
+
+
+class Catalogo:
+    """Todos los productos indexados por producto_id y por nombre, compartidos por todo el proceso
+
+    Las escrituras de esta terminal llaman a recargar_productos; los cambios de otras terminales
+    se traen con sincronizar(), que pide COUNT(*) y, por el indice de actualizado_en, solo las
+    filas tocadas desde la ultima revision (menos 'margen' segundos, por las transacciones que
+    confirman tarde y los cambios dentro del mismo milisegundo). Un borrado se nota porque no
+    cuadra el numero de filas: entonces se recarga entero.
+    """
+
+    def __init__(self, db, margen=5):
+        self.db = db
+        self.margen = timedelta(seconds=margen)
+        self._lock = threading.Lock()
+        self._por_id = {}
+        self._por_nombre = {}
+        self._indice = None     # IndicePrefijos de los nombres; se rehace al buscar tras un cambio
+        self._marca = None      # mayor actualizado_en visto
+        self.cargado = False
+
+    def cargar(self):
+        """Leer el catalogo entero (al arrancar o cuando las revisiones no cuadran)"""
+        filas = self.db.consultar(f"SELECT {_COLUMNAS} FROM Productos")
+        por_id = {fila[0]: Producto(*fila) for fila in filas}
+        with self._lock:
+            self._por_id = por_id
+            self._por_nombre = {}
+            self._indice = None
+            for producto in por_id.values():
+                self._indexar(producto)
+            self._marca = max((_fecha(p.actualizado_en) for p in por_id.values() if p.actualizado_en),
+                              default=None)
+            self.cargado = True
+        return len(por_id)
+
+    def _indexar(self, producto):
+        self._por_nombre.setdefault(producto.nombre.lower(), []).append(producto.producto_id)
+
+    def _desindexar(self, producto):
+        ids = self._por_nombre.get(producto.nombre.lower(), [])
+        if producto.producto_id in ids:
+            ids.remove(producto.producto_id)
+            if not ids:
+                del self._por_nombre[producto.nombre.lower()]
+
+    def _aplicar(self, filas, pedidos=()):
+        """Sustituir las filas recibidas y quitar las pedidas que ya no existen; devuelve los ids cambiados"""
+        cambiados = set()
+        with self._lock:
+            recibidos = set()
+            for fila in filas:
+                producto = Producto(*fila)
+                recibidos.add(producto.producto_id)
+                anterior = self._por_id.get(producto.producto_id)
+                if anterior is not None:
+                    if anterior == producto:
+                        continue
+                    self._desindexar(anterior)
+                self._por_id[producto.producto_id] = producto
+                self._indexar(producto)
+                cambiados.add(producto.producto_id)
+                fecha = _fecha(producto.actualizado_en)
+                if fecha is not None and (self._marca is None or fecha > self._marca):
+                    self._marca = fecha
+            for producto_id in set(pedidos) - recibidos:
+                anterior = self._por_id.pop(producto_id, None)
+                if anterior is not None:
+                    self._desindexar(anterior)
+                    cambiados.add(producto_id)
+            if cambiados:
+                self._indice = None
+        return cambiados
+
+    def recargar_productos(self, producto_ids):
+        """Volver a leer unos productos tras escribirlos desde esta terminal"""
+        ids = sorted({int(p) for p in producto_ids})
+        if not ids or not self.cargado:
+            return set()
+        marcas = ", ".join(["%s"] * len(ids))
+        filas = self.db.consultar(f"SELECT {_COLUMNAS} FROM Productos WHERE producto_id IN ({marcas})", ids,
+                                  primaria=True)
+        return self._aplicar(filas, ids)
+
+    def sincronizar(self):
+        """Traer los cambios de otras terminales; devuelve los ids cambiados o None si se recargo entero"""
+        if not self.cargado:
+            self.cargar()
+            return None
+        with self._lock:
+            marca = self._marca
+        if marca is None:
+            self.cargar()
+            return None
+        total = self.db.consultar("SELECT COUNT(*) FROM Productos")[0][0]
+        filas = self.db.consultar(f"SELECT {_COLUMNAS} FROM Productos WHERE actualizado_en >= %s",
+                                  (marca - self.margen,))
+        cambiados = self._aplicar(filas)
+        if total != len(self):
+            self.cargar()
+            return None
+        return cambiados
+
+    def producto(self, producto_id):
+        with self._lock:
+            return self._por_id.get(producto_id)
+
+    def nombres(self, producto_ids):
+        """{producto_id: nombre} de varios productos; los que falten se leen con una sola consulta"""
+        ids = {int(p) for p in producto_ids}
+        with self._lock:
+            encontrados = {p: self._por_id[p].nombre for p in ids if p in self._por_id}
+        faltan = sorted(ids - set(encontrados))
+        if faltan:
+            marcas = ", ".join(["%s"] * len(faltan))
+            filas = self.db.consultar(f"SELECT {_COLUMNAS} FROM Productos WHERE producto_id IN ({marcas})", faltan)
+            if self.cargado:
+                self._aplicar(filas)
+            encontrados.update((fila[0], fila[1]) for fila in filas)
+        return encontrados
+
+    def por_nombre(self, nombre):
+        """Productos con ese nombre exacto (sin distinguir mayusculas)"""
+        with self._lock:
+            return [self._por_id[p] for p in self._por_nombre.get(nombre.lower(), [])]
+
+    def buscar(self, texto, limite=10):
+        """[(producto_id, nombre)] con palabras que empiezan por las escritas, para el selector"""
+        with self._lock:
+            if self._indice is None:
+                self._indice = IndicePrefijos((p.producto_id, p.nombre) for p in self._por_id.values())
+            indice = self._indice
+        return indice.buscar(texto, limite)
+
+    def nombre(self, producto_id):
+        producto = self.producto(producto_id)
+        return producto.nombre if producto is not None else None
+
+    def precio(self, producto_id):
+        producto = self.producto(producto_id)
+        return producto.precio if producto is not None else None
+
+    def stock(self, producto_id):
+        producto = self.producto(producto_id)
+        return producto.stock if producto is not None else None
+
+    def __len__(self):
+        with self._lock:
+            return len(self._por_id)
@@ -0,0 +1,482 @@
+# Conexion a la base de datos con un pool propio, sin nada de la interfaz
+# Los errores se lanzan; la ventana (o el proceso por lotes) decide como mostrarlos
+import threading
+import time
+from contextlib import contextmanager
+
+from tienda.instrumentacion import ConexionMedida, CursorMedido, Instrumentacion
+from tienda.migraciones import migrar
+from tienda.preparadas import CursorPreparado, SentenciasPreparadas
+from tienda.replicas import Replica
+
+from tienda.reportes import TABLA_RESUMEN
+
+# Claves de idempotencia de las operaciones del diario ya aplicadas (ver tienda.sincronizacion):
+# una operacion reenviada tras un corte no se aplica dos veces. Valida tambien para SQLite.
+TABLA_SINCRONIZACIONES = '''CREATE TABLE IF NOT EXISTS Sincronizaciones (
+    clave CHAR(36) NOT NULL PRIMARY KEY,
+    id_remoto INT,
+    fecha DATETIME DEFAULT CURRENT_TIMESTAMP
+)'''
+
+
+class ErrorPool(Exception):
+    """Todas las conexiones del pool siguen ocupadas tras esperar tiempo_espera segundos"""
+
+
+class ConexionBase:
+    """Pool de conexiones y operaciones comunes a todos los motores de base de datos
+
+    Cada motor implementa _abrir (una conexion nueva con cursor(), commit(), rollback() e
+    in_transaction) y create_tables; 'dialecto' indica a los modulos que SQL usar cuando
+    el de MySQL no es portable.
+
+    Con replicas, las lecturas de consultar() y de conexion(lectura=True) van a una replica
+    sana; las escrituras, y las lecturas mientras la replica no ha recibido aun lo ultimo que
+    ha escrito esta terminal, van a la primaria. Cada motor implementa _replica para crearlas.
+    """
+
+    dialecto = None
+
+    def __init__(self, max_conexiones=5, tiempo_espera=10, tiempo_inactividad=300, intervalo_verificacion=30,
+                 instrumentacion=None):
+        # Pool de conexiones: se reutilizan en lugar de abrir una por cada clic
+        self.max_conexiones = max_conexiones
+        self.tiempo_espera = tiempo_espera
+        self.tiempo_inactividad = tiempo_inactividad
+        self.intervalo_verificacion = intervalo_verificacion
+        self._libres = []  # (conexion, instante en que se devolvio), la mas reciente al final
+        self._en_uso = 0
+        self._condicion = threading.Condition()
+        self.estadisticas = {
+            'checkouts': 0,
+            'esperas': 0,
+            'reconexiones': 0,
+            'creadas': 0,
+            'cerradas': 0,
+        }
+        # Todas las consultas hechas con conexion() quedan medidas aqui
+        self.instrumentacion = instrumentacion or Instrumentacion()
+        self.replicas = []
+        self._turno = 0
+        self._escrito_en = None  # time.monotonic() de la ultima escritura confirmada desde esta terminal
+
+    def _replica(self, datos):
+        """(ConexionBase, nombre) de una replica a partir de su entrada en la configuracion"""
+        raise NotImplementedError
+
+    def _crear_replicas(self, replicas, retraso_maximo, intervalo_salud):
+        # Cada replica tiene su propio pool, con los mismos limites que la primaria salvo que se indiquen
+        self.replicas = [Replica(*self._replica(datos), retraso_maximo, intervalo_salud) for datos in replicas or ()]
+
+    def _abrir(self):
+        raise NotImplementedError
+
+    def _nueva_conexion(self):
+        conn = self._abrir()
+        with self._condicion:
+            self.estadisticas['creadas'] += 1
+        return conn
+
+    def _verificar(self, conn):
+        """Comprobar que una conexion que ha estado ociosa sigue viva (cada motor a su manera)"""
+        return conn
+
+    def _cerrar(self, conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+        with self._condicion:
+            self.estadisticas['cerradas'] += 1
+
+    def _retirar_inactivas(self):
+        """Sacar del pool las conexiones libres que llevan demasiado tiempo sin usarse"""
+        limite = time.monotonic() - self.tiempo_inactividad
+        inactivas = [conn for conn, devuelta in self._libres if devuelta < limite]
+        self._libres = [(conn, devuelta) for conn, devuelta in self._libres if devuelta >= limite]
+        return inactivas
+
+    def obtener_conexion(self):
+        """Tomar una conexion del pool, esperando si todas estan ocupadas"""
+        inicio = time.monotonic()
+        fin = inicio + self.tiempo_espera
+        with self._condicion:
+            inactivas = self._retirar_inactivas()
+            esperado = False
+            while not self._libres and self._en_uso >= self.max_conexiones:
+                restante = fin - time.monotonic()
+                if restante <= 0:
+                    raise ErrorPool("No hay conexiones libres en el pool")
+                if not esperado:
+                    self.estadisticas['esperas'] += 1
+                    esperado = True
+                self._condicion.wait(restante)
+            conn, devuelta = self._libres.pop() if self._libres else (None, None)
+            self._en_uso += 1
+            self.estadisticas['checkouts'] += 1
+        for vieja in inactivas:
+            self._cerrar(vieja)
+        try:
+            if conn is None:
+                conn = self._nueva_conexion()
+            elif time.monotonic() - devuelta > self.intervalo_verificacion:
+                conn = self._verificar(conn)
+        except BaseException:
+            with self._condicion:
+                self._en_uso -= 1
+                self._condicion.notify()
+            raise
+        # Espera por una conexion libre mas lo que cueste abrirla o comprobarla
+        self.instrumentacion.anotar_espera(time.monotonic() - inicio)
+        return conn
+
+    def devolver_conexion(self, conn):
+        """Devolver una conexion al pool; si esta rota se descarta"""
+        reutilizable = True
+        try:
+            # Cerrar la transaccion abierta para no arrastrar snapshots viejos
+            if conn.in_transaction:
+                conn.rollback()
+        except Exception:
+            reutilizable = False
+        with self._condicion:
+            self._en_uso -= 1
+            if reutilizable:
+                self._libres.append((conn, time.monotonic()))
+            self._condicion.notify()
+        if not reutilizable:
+            self._cerrar(conn)
+
+    @contextmanager
+    def conexion(self, lectura=False):
+        """Conexion del pool para una transaccion; devuelta al salir del with
+
+        lectura=True para las que solo leen (exportaciones, listados enteros): pueden ir a una
+        replica. Sus cursores son los normales, no los de cursor_preparado.
+        """
+        replica = self._replica_de_lectura() if lectura else None
+        if replica is not None:
+            try:
+                conn = replica.db.obtener_conexion()
+            except Exception:
+                replica.fallo()
+            else:
+                replica.lecturas += 1
+                try:
+                    yield ConexionMedida(conn, replica.db.instrumentacion) if replica.db.instrumentacion.activa else conn
+                finally:
+                    replica.db.devolver_conexion(conn)
+                return
+        with self._conexion(escritura=not lectura) as conn:
+            yield conn
+
+    @contextmanager
+    def _conexion(self, escritura=True):
+        conn = self.obtener_conexion()
+        try:
+            yield ConexionMedida(conn, self.instrumentacion) if self.instrumentacion.activa else conn
+        finally:
+            if escritura:
+                self._escrito_en = time.monotonic()
+            self.devolver_conexion(conn)
+
+    def _replica_de_lectura(self):
+        """Replica sana que ya tiene lo escrito desde esta terminal (por turnos), o None para la primaria"""
+        if not self.replicas:
+            return None
+        escrito_en = self._escrito_en
+        desde = None if escrito_en is None else time.monotonic() - escrito_en
+        aptas = [replica for replica in self.replicas if replica.apta(desde)]
+        if not aptas:
+            return None
+        with self._condicion:
+            self._turno += 1
+            return aptas[self._turno % len(aptas)]
+
+    def retraso_replica(self):
+        """Segundos que lleva esta base por detras de su primaria (None: replicacion detenida)
+
+        Tambien sirve de comprobacion de salud: lanza el error si no se puede conectar. En los
+        motores sin replicacion (SQLite haciendo de replica en pruebas) el retraso es 0.
+        """
+        self.consultar("SELECT 1")
+        return 0
+
+    def cursor_preparado(self, conn):
+        """Cursor de conn (la de conexion()) que reutiliza sentencias preparadas si el motor las guarda
+
+        Para sentencias fijas que se repiten mucho (cobros, lineas de venta, lecturas por clave).
+        En los motores sin ellas es un conn.cursor() normal; se cierra igual en ambos casos.
+        """
+        return conn.cursor()
+
+    @contextmanager
+    def _cursor(self, preparada, escritura=True):
+        with self._conexion(escritura) as conn:
+            cursor = self.cursor_preparado(conn) if preparada else conn.cursor()
+            try:
+                yield conn, cursor
+            finally:
+                cursor.close()
+
+    def estadisticas_pool(self):
+        """Copia de los contadores del pool para monitorizacion"""
+        with self._condicion:
+            datos = dict(self.estadisticas)
+            datos['libres'] = len(self._libres)
+            datos['en_uso'] = self._en_uso
+            datos['max_conexiones'] = self.max_conexiones
+        if self.replicas:
+            datos['replicas'] = [replica.estado() for replica in self.replicas]
+        return datos
+
+    def connect(self):
+        """Abrir la primera conexion del pool para validar la configuracion; lanza el error si falla"""
+        with self.conexion():
+            pass
+        return True
+    
+    def disconnect(self):
+        with self._condicion:
+            libres = [conn for conn, _ in self._libres]
+            self._libres = []
+        for conn in libres:
+            self._cerrar(conn)
+        for replica in self.replicas:
+            replica.db.disconnect()
+    
+    def ejecutar(self, query, params=None, preparada=False):
+        """Ejecutar una escritura y confirmarla; lanza el error si falla (seguro desde hilos)
+
+        preparada=True para las sentencias fijas: ver cursor_preparado.
+        """
+        with self._cursor(preparada) as (conn, cursor):
+            cursor.execute(query, params or ())
+            conn.commit()
+            return cursor.rowcount
+
+    def insertar(self, query, params=None, preparada=False):
+        """Ejecutar un INSERT y devolver la clave primaria generada; lanza el error si falla"""
+        with self._cursor(preparada) as (conn, cursor):
+            cursor.execute(query, params or ())
+            conn.commit()
+            return cursor.lastrowid
+
+    def consultar(self, query, params=None, preparada=False, primaria=False):
+        """Ejecutar una lectura y devolver todas las filas; lanza el error si falla
+
+        Con replicas va a una de ellas salvo primaria=True; si la replica falla se repite en la
+        primaria y la replica no se vuelve a usar hasta comprobarla de nuevo.
+        """
+        replica = None if primaria else self._replica_de_lectura()
+        if replica is not None:
+            try:
+                filas = replica.db.consultar(query, params, preparada)
+            except Exception:
+                replica.fallo()
+            else:
+                replica.lecturas += 1
+                return filas
+        with self._cursor(preparada, escritura=False) as (conn, cursor):
+            cursor.execute(query, params or ())
+            return cursor.fetchall()
+
+    def create_tables(self):
+        raise NotImplementedError
+
+
+class DatabaseConnection(ConexionBase):
+    """Motor MySQL: la base de datos central TiendaDB"""
+
+    dialecto = 'mysql'
+
+    def __init__(self, host, user, password, database, max_conexiones=5, tiempo_espera=10,
+                 tiempo_inactividad=300, intervalo_verificacion=30, allow_local_infile=False, instrumentacion=None,
+                 sentencias_preparadas=64, port=3306, replicas=None, retraso_maximo=5, intervalo_salud=10):
+        super().__init__(max_conexiones, tiempo_espera, tiempo_inactividad, intervalo_verificacion, instrumentacion)
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.database = database
+        self.allow_local_infile = allow_local_infile
+        self.sentencias_preparadas = sentencias_preparadas
+        self._preparadas = {}  # id(conexion) -> SentenciasPreparadas
+        self.estadisticas.update(preparadas=0, reutilizadas=0)
+        self._crear_replicas(replicas, retraso_maximo, intervalo_salud)
+
+    def _replica(self, datos):
+        parametros = dict(host=self.host, port=self.port, user=self.user, password=self.password,
+                          database=self.database, max_conexiones=self.max_conexiones,
+                          tiempo_espera=self.tiempo_espera, tiempo_inactividad=self.tiempo_inactividad,
+                          intervalo_verificacion=self.intervalo_verificacion,
+                          sentencias_preparadas=self.sentencias_preparadas, instrumentacion=self.instrumentacion)
+        parametros.update(datos)
+        return DatabaseConnection(**parametros), f"{parametros['host']}:{parametros['port']}"
+
+    def retraso_replica(self):
+        # SHOW REPLICA STATUS desde MySQL 8.0.22; antes, SHOW SLAVE STATUS. Sin filas: no es replica
+        with self._cursor(False, escritura=False) as (conn, cursor):
+            try:
+                cursor.execute("SHOW REPLICA STATUS")
+            except Exception:
+                cursor.execute("SHOW SLAVE STATUS")
+            filas = cursor.fetchall()
+            columnas = [d[0] for d in cursor.description or ()]
+        if not filas:
+            return 0
+        for nombre in ('Seconds_Behind_Source', 'Seconds_Behind_Master'):
+            if nombre in columnas:
+                return filas[0][columnas.index(nombre)]
+        return None
+
+    def _abrir(self):
+        import mysql.connector  # tarda en importarse: solo al abrir la primera conexion
+        return mysql.connector.connect(
+            host=self.host,
+            port=self.port,
+            user=self.user,
+            password=self.password,
+            database=self.database,
+            allow_local_infile=self.allow_local_infile
+        )
+
+    def _verificar(self, conn):
+        """Comprobar que una conexion que ha estado ociosa sigue viva"""
+        try:
+            conn.ping(reconnect=False)
+        except Exception:
+            # Las sentencias preparadas mueren con la sesion
+            self._olvidar_preparadas(conn)
+            conn.reconnect(attempts=1, delay=0)
+            with self._condicion:
+                self.estadisticas['reconexiones'] += 1
+        return conn
+
+    def _cerrar(self, conn):
+        self._olvidar_preparadas(conn)
+        super()._cerrar(conn)
+
+    def _olvidar_preparadas(self, conn):
+        with self._condicion:
+            sentencias = self._preparadas.pop(id(conn), None)
+            if sentencias is not None:
+                self.estadisticas['preparadas'] += sentencias.preparadas
+                self.estadisticas['reutilizadas'] += sentencias.reutilizadas
+        if sentencias is not None:
+            sentencias.cerrar()
+
+    def cursor_preparado(self, conn):
+        """Cursor cuyas sentencias se preparan en el servidor una vez por conexion y se reutilizan"""
+        medida = isinstance(conn, ConexionMedida)
+        cruda = conn.cruda if medida else conn
+        with self._condicion:
+            sentencias = self._preparadas.get(id(cruda))
+            if sentencias is None:
+                sentencias = self._preparadas[id(cruda)] = SentenciasPreparadas(cruda, self.sentencias_preparadas)
+        envolver = (lambda cursor: CursorMedido(cursor, self.instrumentacion)) if medida else None
+        return CursorPreparado(sentencias, conn.cursor(), envolver)
+
+    def estadisticas_pool(self):
+        datos = super().estadisticas_pool()
+        with self._condicion:
+            for sentencias in self._preparadas.values():
+                datos['preparadas'] += sentencias.preparadas
+                datos['reutilizadas'] += sentencias.reutilizadas
+            datos['sentencias_guardadas'] = sum(len(s) for s in self._preparadas.values())
+        return datos
+
+    def create_tables(self):
+        """Crear las tablas si no existen"""
+        tablas = [
+            '''CREATE TABLE IF NOT EXISTS Clientes (
+                cliente_id INT AUTO_INCREMENT PRIMARY KEY,
+                nombre VARCHAR(100) NOT NULL,
+                telefono VARCHAR(15),
+                direccion VARCHAR(150)
+            )''',
+            '''CREATE TABLE IF NOT EXISTS Productos (
+                producto_id INT AUTO_INCREMENT PRIMARY KEY,
+                nombre VARCHAR(100) NOT NULL,
+                descripcion TEXT,
+                precio DECIMAL(10,2) NOT NULL,
+                stock INT NOT NULL,
+                categoria_id INT NULL,
+                version INT NOT NULL DEFAULT 0,
+                actualizado_en TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP(3) ON UPDATE CURRENT_TIMESTAMP(3)
+            )''',
+            '''CREATE TABLE IF NOT EXISTS Categorias (
+                categoria_id INT AUTO_INCREMENT PRIMARY KEY,
+                nombre VARCHAR(50) NOT NULL,
+                descripcion TEXT
+            )''',
+            '''CREATE TABLE IF NOT EXISTS Ventas (
+                venta_id INT AUTO_INCREMENT PRIMARY KEY,
+                cliente_id INT,
+                fecha DATETIME DEFAULT CURRENT_TIMESTAMP,
+                total DECIMAL(10,2),
+                FOREIGN KEY (cliente_id) REFERENCES Clientes(cliente_id)
+            )''',
+            '''CREATE TABLE IF NOT EXISTS DetalleVentas (
+                detalle_id INT AUTO_INCREMENT PRIMARY KEY,
+                venta_id INT,
+                producto_id INT,
+                cantidad INT NOT NULL,
+                precio_unitario DECIMAL(10,2) NOT NULL,
+                FOREIGN KEY (venta_id) REFERENCES Ventas(venta_id),
+                FOREIGN KEY (producto_id) REFERENCES Productos(producto_id)
+            )''',
+            TABLA_RESUMEN,
+            TABLA_SINCRONIZACIONES
+        ]
+        with self.conexion() as conn:
+            cursor = conn.cursor()
+            for query in tablas:
+                cursor.execute(query)
+            conn.commit()
+            cursor.close()
+        self.create_columns()
+        self.create_indexes()
+        migrar(self)
+        return True
+
+    def create_columns(self):
+        """Añadir a las tablas ya creadas las columnas que se han ido incorporando"""
+        columnas = [
+            ('Productos', 'version', 'version INT NOT NULL DEFAULT 0'),
+            ('Productos', 'categoria_id', 'categoria_id INT NULL'),
+            ('Productos', 'actualizado_en', 'actualizado_en TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP(3) '
+                                            'ON UPDATE CURRENT_TIMESTAMP(3)'),
+        ]
+        with self.conexion() as conn:
+            cursor = conn.cursor()
+            for tabla, nombre, definicion in columnas:
+                cursor.execute(f"SHOW COLUMNS FROM {tabla} LIKE %s", (nombre,))
+                if not cursor.fetchall():
+                    cursor.execute(f"ALTER TABLE {tabla} ADD COLUMN {definicion}")
+            cursor.close()
+
+    def create_indexes(self):
+        """Crear los indices que usan los filtros si todavia no existen (los de las migraciones, aparte)"""
+        indices = [
+            ('Clientes', 'idx_clientes_nombre', 'INDEX idx_clientes_nombre (nombre)'),
+            ('Clientes', 'ft_clientes_nombre', 'FULLTEXT INDEX ft_clientes_nombre (nombre)'),
+            ('Productos', 'idx_productos_nombre', 'INDEX idx_productos_nombre (nombre)'),
+            ('Productos', 'ft_productos_texto', 'FULLTEXT INDEX ft_productos_texto (nombre, descripcion)'),
+            ('Categorias', 'ft_categorias_texto', 'FULLTEXT INDEX ft_categorias_texto (nombre, descripcion)'),
+            ('Productos', 'idx_productos_categoria', 'INDEX idx_productos_categoria (categoria_id)'),
+            ('Productos', 'idx_productos_actualizado', 'INDEX idx_productos_actualizado (actualizado_en)'),
+            ('Ventas', 'idx_ventas_fecha', 'INDEX idx_ventas_fecha (fecha)'),
+            ('DetalleVentas', 'idx_detalle_producto', 'INDEX idx_detalle_producto (producto_id)'),
+        ]
+        with self.conexion() as conn:
+            cursor = conn.cursor()
+            existentes = set()
+            for tabla in {tabla for tabla, _, _ in indices}:
+                cursor.execute(f"SHOW INDEX FROM {tabla}")
+                existentes.update((tabla, fila[2]) for fila in cursor.fetchall())
+            for tabla, nombre, definicion in indices:
+                if (tabla, nombre) not in existentes:
+                    cursor.execute(f"ALTER TABLE {tabla} ADD {definicion}")
+            cursor.close()
@@ -0,0 +1,111 @@
+# Diario local de escrituras pendientes de enviar a la base de datos central
+# Cada venta se anota aqui al momento (fichero SQLite en disco) y el sincronizador la envia despues
+import json
+import sqlite3
+import threading
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+
+PENDIENTE = 'pendiente'
+HECHA = 'hecha'
+FALLIDA = 'fallida'
+
+
+def _a_json(valor):
+    if isinstance(valor, Decimal):
+        return str(valor)
+    if isinstance(valor, datetime):
+        return valor.strftime("%Y-%m-%d %H:%M:%S")
+    if isinstance(valor, date):
+        return valor.isoformat()
+    raise TypeError(f"No se puede anotar {valor!r}")
+
+
+class Diario:
+    """Cola persistente y ordenada de operaciones con id local y clave de idempotencia
+
+    Las operaciones son diccionarios JSON con un 'tipo' ('venta', 'detalle' o 'cobro').
+    El id local (numero de anotacion) es el que ve el cajero hasta que la operacion llega
+    al servidor; despues se guarda el id remoto para traducir las referencias.
+    """
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(ruta, check_same_thread=False, isolation_level=None)
+        # synchronous=FULL: una anotacion confirmada sobrevive a un corte de luz
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=FULL")
+        self._conn.execute("""CREATE TABLE IF NOT EXISTS Operaciones (
+                                  id_local INTEGER PRIMARY KEY AUTOINCREMENT,
+                                  clave TEXT NOT NULL UNIQUE,
+                                  tipo TEXT NOT NULL,
+                                  datos TEXT NOT NULL,
+                                  estado TEXT NOT NULL DEFAULT 'pendiente',
+                                  id_remoto INTEGER,
+                                  intentos INTEGER NOT NULL DEFAULT 0,
+                                  error TEXT,
+                                  creada TEXT NOT NULL DEFAULT (datetime('now', 'localtime'))
+                              )""")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_operaciones_estado ON Operaciones (estado, id_local)")
+
+    def anotar(self, tipo, datos):
+        """Guardar una operacion; devuelve su id local en cuanto esta en disco"""
+        clave = str(uuid.uuid4())
+        with self._lock:
+            cursor = self._conn.execute("INSERT INTO Operaciones (clave, tipo, datos) VALUES (?, ?, ?)",
+                                        (clave, tipo, json.dumps(datos, default=_a_json)))
+            return cursor.lastrowid
+
+    def pendientes(self, limite=50):
+        """Las operaciones pendientes mas antiguas: [(id_local, clave, tipo, datos)]"""
+        with self._lock:
+            filas = self._conn.execute("SELECT id_local, clave, tipo, datos FROM Operaciones WHERE estado = ? "
+                                       "ORDER BY id_local LIMIT ?", (PENDIENTE, limite)).fetchall()
+        return [(id_local, clave, tipo, json.loads(datos)) for id_local, clave, tipo, datos in filas]
+
+    def marcar_hechas(self, resultados):
+        """resultados: {id_local: id_remoto} de las operaciones ya confirmadas en el servidor"""
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.executemany("UPDATE Operaciones SET estado = ?, id_remoto = ?, error = NULL WHERE id_local = ?",
+                                   [(HECHA, id_remoto, id_local) for id_local, id_remoto in resultados.items()])
+            self._conn.execute("COMMIT")
+
+    def marcar_fallida(self, id_local, error):
+        """Apartar una operacion que el servidor rechaza (no se reintenta sola)"""
+        with self._lock:
+            self._conn.execute("UPDATE Operaciones SET estado = ?, error = ?, intentos = intentos + 1 "
+                               "WHERE id_local = ?", (FALLIDA, str(error), id_local))
+
+    def reintentar_fallidas(self):
+        """Volver a poner en cola las operaciones fallidas (p. ej. tras corregir el dato en el servidor)"""
+        with self._lock:
+            return self._conn.execute("UPDATE Operaciones SET estado = ? WHERE estado = ?",
+                                      (PENDIENTE, FALLIDA)).rowcount
+
+    def id_remoto(self, id_local):
+        with self._lock:
+            fila = self._conn.execute("SELECT estado, id_remoto FROM Operaciones WHERE id_local = ?",
+                                      (id_local,)).fetchone()
+        if fila is None:
+            raise KeyError(id_local)
+        return fila[1] if fila[0] == HECHA else None
+
+    def fallidas(self, limite=20):
+        with self._lock:
+            return self._conn.execute("SELECT id_local, tipo, error FROM Operaciones WHERE estado = ? "
+                                      "ORDER BY id_local LIMIT ?", (FALLIDA, limite)).fetchall()
+
+    def resumen(self):
+        """Numero de operaciones por estado"""
+        with self._lock:
+            filas = self._conn.execute("SELECT estado, COUNT(*) FROM Operaciones GROUP BY estado").fetchall()
+        datos = {PENDIENTE: 0, HECHA: 0, FALLIDA: 0}
+        datos.update(filas)
+        return datos
+
+    def cerrar(self):
+        with self._lock:
+            self._conn.close()
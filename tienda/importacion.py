@@ -0,0 +1,287 @@
+# Importacion y exportacion masiva de las tablas en CSV, por lotes y sin cargar el fichero entero
+import csv
+import os
+import tempfile
+import time
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+
+
+class ErrorImportacion(Exception):
+    """El fichero no se puede importar (cabecera incorrecta o fallo al escribir un lote)"""
+
+
+def _texto(longitud=None, obligatorio=False):
+    def convertir(valor):
+        if valor == "":
+            if obligatorio:
+                raise ValueError("es obligatorio")
+            return None
+        if longitud is not None and len(valor) > longitud:
+            raise ValueError(f"supera {longitud} caracteres")
+        return valor
+    return convertir
+
+
+def _entero(obligatorio=False):
+    def convertir(valor):
+        if valor == "":
+            if obligatorio:
+                raise ValueError("es obligatorio")
+            return None
+        try:
+            return int(valor)
+        except ValueError:
+            raise ValueError(f"'{valor}' no es un número entero") from None
+    return convertir
+
+
+def _decimal(obligatorio=False, enteros=8):
+    """DECIMAL(10,2): admite coma decimal y redondea a dos decimales"""
+    def convertir(valor):
+        if valor == "":
+            if obligatorio:
+                raise ValueError("es obligatorio")
+            return None
+        if "," in valor and "." not in valor:
+            valor = valor.replace(",", ".")
+        try:
+            numero = Decimal(valor).quantize(Decimal("0.01"))
+        except InvalidOperation:
+            raise ValueError(f"'{valor}' no es un importe válido") from None
+        if abs(numero) >= 10 ** enteros:
+            raise ValueError(f"'{valor}' es demasiado grande")
+        return numero
+    return convertir
+
+
+FORMATOS_FECHA = ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%Y-%m-%d", "%d/%m/%Y %H:%M:%S", "%d/%m/%Y %H:%M", "%d/%m/%Y")
+
+
+def _fecha(valor):
+    if valor == "":
+        # La columna va en el INSERT del lote, asi que el valor por defecto no se aplicaria: se pone aqui
+        return datetime.now().replace(microsecond=0)
+    for formato in FORMATOS_FECHA:
+        try:
+            return datetime.strptime(valor, formato)
+        except ValueError:
+            pass
+    raise ValueError(f"'{valor}' no es una fecha válida")
+
+
+# Columnas importables de cada tabla con su conversion; la primera es la clave primaria
+COLUMNAS = {
+    'Clientes': [
+        ('cliente_id', _entero()),
+        ('nombre', _texto(100, obligatorio=True)),
+        ('telefono', _texto(15)),
+        ('direccion', _texto(150)),
+    ],
+    'Productos': [
+        ('producto_id', _entero()),
+        ('nombre', _texto(100, obligatorio=True)),
+        ('descripcion', _texto()),
+        ('precio', _decimal(obligatorio=True)),
+        ('stock', _entero(obligatorio=True)),
+        ('categoria_id', _entero()),
+    ],
+    'Categorias': [
+        ('categoria_id', _entero()),
+        ('nombre', _texto(50, obligatorio=True)),
+        ('descripcion', _texto()),
+    ],
+    'Ventas': [
+        ('venta_id', _entero()),
+        ('cliente_id', _entero()),
+        ('fecha', _fecha),
+        ('total', _decimal()),
+    ],
+    'DetalleVentas': [
+        ('detalle_id', _entero()),
+        ('venta_id', _entero()),
+        ('producto_id', _entero()),
+        ('cantidad', _entero(obligatorio=True)),
+        ('precio_unitario', _decimal(obligatorio=True)),
+    ],
+}
+
+
+class Progreso:
+    """Filas procesadas y velocidad, para informar mientras dura la operacion"""
+
+    def __init__(self, al_progresar=None):
+        self.al_progresar = al_progresar
+        self.inicio = time.perf_counter()
+        self.filas = 0
+        self.rechazadas = 0
+        self.errores = []  # (linea, mensaje) de las primeras filas rechazadas
+
+    @property
+    def segundos(self):
+        return time.perf_counter() - self.inicio
+
+    @property
+    def filas_por_segundo(self):
+        segundos = self.segundos
+        return self.filas / segundos if segundos > 0 else 0.0
+
+    def avanzar(self, filas):
+        self.filas += filas
+        if self.al_progresar is not None:
+            self.al_progresar(self)
+
+    def rechazar(self, linea, mensaje, max_errores=100):
+        self.rechazadas += 1
+        if len(self.errores) < max_errores:
+            self.errores.append((linea, mensaje))
+
+    def resumen(self):
+        return {
+            'filas': self.filas,
+            'rechazadas': self.rechazadas,
+            'errores': self.errores,
+            'segundos': round(self.segundos, 3),
+            'filas_por_segundo': round(self.filas_por_segundo, 1),
+        }
+
+
+def _lotes_validos(lector, columnas, progreso, tam_lote):
+    """Convertir las filas del CSV y agruparlas en lotes; las filas no validas se apartan"""
+    lote = []
+    for fila in lector:
+        linea = lector.line_num
+        try:
+            valores = []
+            for nombre, convertir in columnas:
+                try:
+                    valores.append(convertir((fila.get(nombre) or "").strip()))
+                except ValueError as e:
+                    raise ValueError(f"{nombre} {e}") from None
+        except ValueError as e:
+            progreso.rechazar(linea, str(e))
+            continue
+        lote.append((linea, tuple(valores)))
+        if len(lote) >= tam_lote:
+            yield lote
+            lote = []
+    if lote:
+        yield lote
+
+
+def importar_csv(db, tabla, ruta, tam_lote=1000, usar_load_data=False, al_progresar=None):
+    """Importar un CSV con cabecera a la tabla, confirmando cada lote en su propia transaccion
+
+    Las columnas se toman de la cabecera (la clave primaria es opcional). Las filas que no
+    superan la validacion se descartan y se informan en el resumen; un fallo de la base de
+    datos aborta la importacion dejando confirmados los lotes anteriores. Con usar_load_data
+    cada lote se envia con LOAD DATA LOCAL INFILE (requiere allow_local_infile en la conexion).
+    Importar DetalleVentas no toca el stock: se trata como una migracion de datos historicos.
+    Devuelve el resumen de Progreso.
+    """
+    if tabla not in COLUMNAS:
+        raise ErrorImportacion(f"Tabla desconocida: {tabla}")
+    progreso = Progreso(al_progresar)
+    with open(ruta, newline="", encoding="utf-8-sig") as fichero:
+        lector = csv.DictReader(fichero)
+        cabecera = [c.strip() for c in (lector.fieldnames or [])]
+        lector.fieldnames = cabecera
+        conocidas = [c for c, _ in COLUMNAS[tabla]]
+        desconocidas = [c for c in cabecera if c not in conocidas]
+        if desconocidas:
+            raise ErrorImportacion(f"Columnas desconocidas en {tabla}: {', '.join(desconocidas)}")
+        columnas = [(c, convertir) for c, convertir in COLUMNAS[tabla] if c in cabecera]
+        if not columnas:
+            raise ErrorImportacion("El fichero no tiene cabecera.")
+        nombres = [c for c, _ in columnas]
+        # LOAD DATA solo existe en MySQL; con otros motores se usa executemany
+        escribir = _escribir_load_data if usar_load_data and db.dialecto == 'mysql' else _escribir_executemany
+        for lote in _lotes_validos(lector, columnas, progreso, tam_lote):
+            try:
+                escribir(db, tabla, nombres, [valores for _, valores in lote])
+            except Exception as e:
+                raise ErrorImportacion(f"Fallo en el lote que empieza en la línea {lote[0][0]}: {e}. "
+                                       f"Ya se habían importado {progreso.filas} filas.") from e
+            progreso.avanzar(len(lote))
+    return progreso.resumen()
+
+
+def _escribir_executemany(db, tabla, nombres, filas):
+    marcas = ", ".join(["%s"] * len(nombres))
+    consulta = f"INSERT INTO {tabla} ({', '.join(nombres)}) VALUES ({marcas})"
+    with db.conexion() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.executemany(consulta, filas)
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+
+
+def _campo_load_data(valor):
+    # Formato por defecto de LOAD DATA: tabuladores, barra invertida como escape y \N para NULL
+    if valor is None:
+        return "\\N"
+    texto = valor.strftime("%Y-%m-%d %H:%M:%S") if isinstance(valor, datetime) else str(valor)
+    return (texto.replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n")
+            .replace("\r", "\\r").replace("\0", "\\0"))
+
+
+def _escribir_load_data(db, tabla, nombres, filas):
+    descriptor, temporal = tempfile.mkstemp(suffix=".tsv")
+    try:
+        with os.fdopen(descriptor, "w", encoding="utf-8", newline="") as fichero:
+            for fila in filas:
+                fichero.write("\t".join(_campo_load_data(v) for v in fila) + "\n")
+        with db.conexion() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(f"LOAD DATA LOCAL INFILE %s INTO TABLE {tabla} CHARACTER SET utf8mb4 "
+                               f"({', '.join(nombres)})", (temporal,))
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+            finally:
+                cursor.close()
+    finally:
+        os.remove(temporal)
+
+
+def _campo_csv(valor):
+    if valor is None:
+        return ""
+    if isinstance(valor, datetime):
+        return valor.strftime("%Y-%m-%d %H:%M:%S")
+    return valor
+
+
+def exportar_csv(db, tabla, ruta, tam_lote=5000, al_progresar=None):
+    """Exportar la tabla a CSV leyendo con un cursor sin buffer, lote a lote
+
+    Las filas se van escribiendo segun llegan del servidor, asi que la memoria no depende
+    del tamaño de la tabla. El CSV resultante se puede volver a importar con importar_csv.
+    """
+    if tabla not in COLUMNAS:
+        raise ErrorImportacion(f"Tabla desconocida: {tabla}")
+    nombres = [c for c, _ in COLUMNAS[tabla]]
+    progreso = Progreso(al_progresar)
+    with open(ruta, "w", newline="", encoding="utf-8") as fichero:
+        escritor = csv.writer(fichero)
+        escritor.writerow(nombres)
+        with db.conexion(lectura=True) as conn:
+            cursor = conn.cursor(buffered=False)
+            try:
+                cursor.execute(f"SELECT {', '.join(nombres)} FROM {tabla} ORDER BY {nombres[0]}")
+                while True:
+                    filas = cursor.fetchmany(tam_lote)
+                    if not filas:
+                        break
+                    escritor.writerows([_campo_csv(v) for v in fila] for fila in filas)
+                    progreso.avanzar(len(filas))
+            finally:
+                cursor.close()
+    return progreso.resumen()
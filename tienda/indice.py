@@ -0,0 +1,135 @@
+# Indices en memoria para los selectores de cliente y producto (sin consultas mientras se escribe)
+import threading
+from bisect import bisect_left
+
+from tienda.busqueda import normalizar
+
+
+class IndicePrefijos:
+    """Lista ordenada de (palabra normalizada, id) para buscar por prefijo con bisect
+
+    Cada palabra del nombre entra en el indice, asi "lec" encuentra "Pan con leche".
+    """
+
+    def __init__(self, nombres=()):
+        """nombres: pares (id, nombre)"""
+        self._nombres = {}
+        entradas = []
+        for id_, nombre in nombres:
+            self._nombres[id_] = nombre
+            entradas.extend((palabra, id_) for palabra in set(normalizar(nombre).split()))
+        entradas.sort()
+        self._claves = [palabra for palabra, _ in entradas]
+        self._ids = [id_ for _, id_ in entradas]
+
+    def buscar(self, texto, limite=10):
+        """[(id, nombre)] cuyas palabras empiezan por las de texto, por orden alfabetico"""
+        palabras = normalizar(texto).split()
+        if not palabras:
+            return []
+        # Se recorre el tramo de la palabra mas larga (el mas corto) y se filtra por las demas
+        guia = max(palabras, key=len)
+        resto = [p for p in palabras if p != guia]
+        encontrados = []
+        vistos = set()
+        i = bisect_left(self._claves, guia)
+        while i < len(self._claves) and self._claves[i].startswith(guia):
+            id_ = self._ids[i]
+            i += 1
+            if id_ in vistos:
+                continue
+            vistos.add(id_)
+            if resto:
+                propias = normalizar(self._nombres[id_]).split()
+                if not all(any(w.startswith(p) for w in propias) for p in resto):
+                    continue
+            encontrados.append((id_, self._nombres[id_]))
+        encontrados.sort(key=lambda par: normalizar(par[1]))
+        return encontrados[:limite]
+
+
+class Nombres:
+    """id -> nombre de una tabla entera en memoria, con busqueda por prefijo
+
+    Para tablas de tamaño moderado (clientes). Se carga una vez en segundo plano y las
+    escrituras de la propia terminal la actualizan con poner() y quitar().
+    """
+
+    def __init__(self, db, tabla, clave, columna='nombre'):
+        self.db = db
+        self.tabla = tabla
+        self.clave = clave
+        self.columna = columna
+        self._lock = threading.Lock()
+        self._nombres = {}
+        self._indice = None
+        self.cargado = False
+
+    def cargar(self):
+        filas = self.db.consultar(f"SELECT {self.clave}, {self.columna} FROM {self.tabla}")
+        with self._lock:
+            self._nombres = {id_: nombre for id_, nombre in filas}
+            self._indice = None
+            self.cargado = True
+        return len(filas)
+
+    def nombre(self, id_):
+        with self._lock:
+            return self._nombres.get(id_)
+
+    def existe(self, id_):
+        with self._lock:
+            return id_ in self._nombres
+
+    def poner(self, id_, nombre):
+        with self._lock:
+            self._nombres[id_] = nombre
+            self._indice = None
+
+    def quitar(self, id_):
+        with self._lock:
+            self._nombres.pop(id_, None)
+            self._indice = None
+
+    def nombres(self, ids):
+        """{id: nombre} de varios ids; los que no esten en memoria se leen con una sola consulta"""
+        ids = {int(id_) for id_ in ids}
+        with self._lock:
+            encontrados = {id_: self._nombres[id_] for id_ in ids if id_ in self._nombres}
+        faltan = sorted(ids - set(encontrados))
+        if faltan:
+            marcas = ", ".join(["%s"] * len(faltan))
+            filas = self.db.consultar(f"SELECT {self.clave}, {self.columna} FROM {self.tabla} "
+                                      f"WHERE {self.clave} IN ({marcas})", faltan)
+            with self._lock:
+                for id_, nombre in filas:
+                    self._nombres[id_] = nombre
+                    encontrados[id_] = nombre
+                if filas:
+                    self._indice = None
+        return encontrados
+
+    def recargar(self, ids):
+        """Volver a leer unos ids cambiados en otras terminales; los que ya no existen se quitan"""
+        ids = sorted({int(id_) for id_ in ids})
+        if not ids or not self.cargado:
+            return
+        marcas = ", ".join(["%s"] * len(ids))
+        filas = self.db.consultar(f"SELECT {self.clave}, {self.columna} FROM {self.tabla} "
+                                  f"WHERE {self.clave} IN ({marcas})", ids, primaria=True)
+        leidos = dict(filas)
+        with self._lock:
+            for id_ in ids:
+                if id_ in leidos:
+                    self._nombres[id_] = leidos[id_]
+                else:
+                    self._nombres.pop(id_, None)
+            self._indice = None
+
+    def buscar(self, texto, limite=10):
+        with self._lock:
+            # El indice se rehace al buscar tras un cambio, no en cada escritura
+            if self._indice is None:
+                self._indice = IndicePrefijos(self._nombres.items())
+            indice = self._indice
+        return indice.buscar(texto, limite)
@@ -0,0 +1,232 @@
+# Medida de todas las consultas: latencia por sentencia, filas, espera del pool y consultas lentas
+import json
+import logging
+import re
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+# Limites superiores (ms) de los tramos del histograma; el ultimo recoge todo lo demas
+TRAMOS_MS = (0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, float('inf'))
+
+registro_lentas = logging.getLogger("tienda.consultas_lentas")
+
+_ESPACIOS = re.compile(r"\s+")
+_LISTA_MARCAS = re.compile(r"\(\s*%s(?:\s*,\s*%s)+\s*\)")
+_CASOS = re.compile(r"(?:WHEN %s THEN %s\s*)+")
+
+
+def normalizar_sentencia(sql):
+    """Forma comun de una sentencia para agruparla: sin saltos de linea y con las listas IN colapsadas"""
+    sql = _ESPACIOS.sub(" ", sql).strip()
+    sql = _LISTA_MARCAS.sub("(%s, ...)", sql)
+    return _CASOS.sub("WHEN %s THEN %s ... ", sql)
+
+
+class Histograma:
+    """Recuento por tramos de TRAMOS_MS, con total y maximo, para estimar percentiles"""
+
+    __slots__ = ('cuentas', 'llamadas', 'total_ms', 'max_ms')
+
+    def __init__(self):
+        self.cuentas = [0] * len(TRAMOS_MS)
+        self.llamadas = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def anotar(self, ms):
+        for i, limite in enumerate(TRAMOS_MS):
+            if ms <= limite:
+                self.cuentas[i] += 1
+                break
+        self.llamadas += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def percentil(self, p):
+        """Limite superior del tramo en el que cae el percentil p (el maximo si es el ultimo)"""
+        if not self.llamadas:
+            return None
+        objetivo = p / 100 * self.llamadas
+        acumulado = 0
+        for limite, cuenta in zip(TRAMOS_MS, self.cuentas):
+            acumulado += cuenta
+            if acumulado >= objetivo:
+                return round(min(limite, self.max_ms), 3)
+        return round(self.max_ms, 3)
+
+    def resumen(self):
+        return {
+            'llamadas': self.llamadas,
+            'total_ms': round(self.total_ms, 3),
+            'media_ms': round(self.total_ms / self.llamadas, 3) if self.llamadas else None,
+            'p50_ms': self.percentil(50),
+            'p95_ms': self.percentil(95),
+            'p99_ms': self.percentil(99),
+            'max_ms': round(self.max_ms, 3),
+            'tramos': {('>' + str(TRAMOS_MS[-2]) if limite == float('inf') else str(limite)): cuenta
+                       for limite, cuenta in zip(TRAMOS_MS, self.cuentas) if cuenta},
+        }
+
+
+class _Sentencia:
+    __slots__ = ('histograma', 'filas', 'errores')
+
+    def __init__(self):
+        self.histograma = Histograma()
+        self.filas = 0
+        self.errores = 0
+
+
+class Instrumentacion:
+    """Contadores compartidos por todas las conexiones de un ConexionBase
+
+    Las consultas que superan umbral_ms se guardan (las ultimas max_lentas) y se escriben en
+    el logger "tienda.consultas_lentas" con sus parametros.
+    """
+
+    def __init__(self, umbral_ms=200, max_lentas=100, activa=True):
+        self.umbral_ms = umbral_ms
+        self.activa = activa
+        self._lock = threading.Lock()
+        self._sentencias = {}
+        self._espera_pool = Histograma()
+        self._lentas = deque(maxlen=max_lentas)
+        self.desde = datetime.now()
+
+    def anotar(self, sql, segundos, filas=0, params=None, error=False):
+        ms = segundos * 1000
+        clave = normalizar_sentencia(sql)
+        with self._lock:
+            sentencia = self._sentencias.get(clave)
+            if sentencia is None:
+                sentencia = self._sentencias[clave] = _Sentencia()
+            sentencia.histograma.anotar(ms)
+            sentencia.filas += max(filas, 0)
+            sentencia.errores += error
+        if ms >= self.umbral_ms:
+            lenta = {'fecha': datetime.now().isoformat(timespec='milliseconds'), 'ms': round(ms, 3),
+                     'sentencia': _ESPACIOS.sub(" ", sql).strip(), 'parametros': repr(params)[:500]}
+            with self._lock:
+                self._lentas.append(lenta)
+            registro_lentas.warning("%.1f ms: %s %s", ms, lenta['sentencia'], lenta['parametros'])
+
+    def anotar_filas(self, sql, filas):
+        """Filas leidas despues con fetch* se suman a la sentencia que las produjo"""
+        clave = normalizar_sentencia(sql)
+        with self._lock:
+            sentencia = self._sentencias.get(clave)
+            if sentencia is not None:
+                sentencia.filas += filas
+
+    def anotar_espera(self, segundos):
+        with self._lock:
+            self._espera_pool.anotar(segundos * 1000)
+
+    def sentencias(self):
+        """[(sentencia, resumen)] ordenadas por tiempo total, la mas costosa primero"""
+        with self._lock:
+            datos = [(clave, dict(s.histograma.resumen(), filas=s.filas, errores=s.errores))
+                     for clave, s in self._sentencias.items()]
+        return sorted(datos, key=lambda par: par[1]['total_ms'], reverse=True)
+
+    def lentas(self):
+        with self._lock:
+            return list(self._lentas)
+
+    def resumen(self):
+        """Todo en un diccionario serializable a JSON"""
+        with self._lock:
+            espera = self._espera_pool.resumen()
+        return {
+            'desde': self.desde.isoformat(timespec='seconds'),
+            'hasta': datetime.now().isoformat(timespec='seconds'),
+            'umbral_lenta_ms': self.umbral_ms,
+            'espera_pool': espera,
+            'sentencias': [dict(datos, sentencia=clave) for clave, datos in self.sentencias()],
+            'lentas': self.lentas(),
+        }
+
+    def volcar(self, ruta, extra=None):
+        """Guardar resumen() (y los datos de extra, p. ej. las estadisticas del pool) en JSON"""
+        datos = self.resumen()
+        if extra:
+            datos.update(extra)
+        with open(ruta, "w", encoding="utf-8") as fichero:
+            json.dump(datos, fichero, ensure_ascii=False, indent=2, default=str)
+
+    def reiniciar(self):
+        with self._lock:
+            self._sentencias.clear()
+            self._espera_pool = Histograma()
+            self._lentas.clear()
+            self.desde = datetime.now()
+
+
+class CursorMedido:
+    """Cursor que anota en la Instrumentacion cada execute/executemany y las filas leidas"""
+
+    def __init__(self, cursor, instrumentacion):
+        self._cursor = cursor
+        self._instrumentacion = instrumentacion
+        self._sql = None
+
+    def _medir(self, metodo, sql, params):
+        inicio = time.perf_counter()
+        try:
+            resultado = metodo(sql, params)
+        except Exception:
+            self._instrumentacion.anotar(sql, time.perf_counter() - inicio, params=params, error=True)
+            raise
+        self._sql = sql
+        # rowcount de un SELECT no es fiable antes de leer: se cuentan las filas al hacer fetch
+        escritura = sql.lstrip()[:6].upper() != "SELECT"
+        filas = self._cursor.rowcount if escritura else 0
+        self._instrumentacion.anotar(sql, time.perf_counter() - inicio, filas or 0, params)
+        return resultado
+
+    def execute(self, sql, params=()):
+        return self._medir(self._cursor.execute, sql, params)
+
+    def executemany(self, sql, filas):
+        return self._medir(self._cursor.executemany, sql, filas)
+
+    def _leidas(self, filas):
+        if self._sql is not None and filas:
+            self._instrumentacion.anotar_filas(self._sql, len(filas))
+        return filas
+
+    def fetchall(self):
+        return self._leidas(self._cursor.fetchall())
+
+    def fetchmany(self, tam):
+        return self._leidas(self._cursor.fetchmany(tam))
+
+    def fetchone(self):
+        fila = self._cursor.fetchone()
+        if fila is not None:
+            self._leidas([fila])
+        return fila
+
+    def __getattr__(self, nombre):
+        return getattr(self._cursor, nombre)
+
+
+class ConexionMedida:
+    """Conexion del pool vista a traves de CursorMedido; el resto de atributos pasan tal cual"""
+
+    def __init__(self, conn, instrumentacion):
+        self._conn = conn
+        self._instrumentacion = instrumentacion
+
+    @property
+    def cruda(self):
+        """La conexion del motor sin envolver"""
+        return self._conn
+
+    def cursor(self, **opciones):
+        return CursorMedido(self._conn.cursor(**opciones), self._instrumentacion)
+
+    def __getattr__(self, nombre):
+        return getattr(self._conn, nombre)
@@ -0,0 +1,266 @@
+# Cambios de esquema numerados: create_tables aplica en orden los que falten y los anota en SchemaVersion
+# Una migracion nunca se edita una vez publicada; los cambios nuevos van en una migracion nueva.
+
+TABLA_VERSIONES = '''CREATE TABLE IF NOT EXISTS SchemaVersion (
+    version INT NOT NULL PRIMARY KEY,
+    descripcion VARCHAR(200) NOT NULL,
+    aplicada DATETIME DEFAULT CURRENT_TIMESTAMP
+)'''
+
+
+def _existe_indice(cursor, dialecto, tabla, nombre):
+    if dialecto == 'sqlite':
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'index' AND tbl_name = %s AND name = %s",
+                       (tabla, nombre))
+    else:
+        cursor.execute(f"SHOW INDEX FROM {tabla} WHERE Key_name = %s", (nombre,))
+    return bool(cursor.fetchall())
+
+
+def _crear_indice(tabla, nombre, columnas, unico=False):
+    def paso(cursor, dialecto):
+        if _existe_indice(cursor, dialecto, tabla, nombre):
+            return
+        tipo = "UNIQUE INDEX" if unico else "INDEX"
+        if dialecto == 'sqlite':
+            cursor.execute(f"CREATE {tipo} {nombre} ON {tabla} ({columnas})")
+        else:
+            cursor.execute(f"ALTER TABLE {tabla} ADD {tipo} {nombre} ({columnas})")
+    return paso
+
+
+def _quitar_indice(tabla, nombre):
+    # En MySQL el indice que sostiene una clave ajena solo se puede quitar si ya hay otro que la sirva
+    def paso(cursor, dialecto):
+        if not _existe_indice(cursor, dialecto, tabla, nombre):
+            return
+        if dialecto == 'sqlite':
+            cursor.execute(f"DROP INDEX {nombre}")
+        else:
+            cursor.execute(f"ALTER TABLE {tabla} DROP INDEX {nombre}")
+    return paso
+
+
+def _clave_ajena_categoria(cursor, dialecto):
+    """Productos.categoria_id solo puede apuntar a una categoria existente"""
+    # Las referencias a categorias borradas se quedan sin categoria
+    cursor.execute("UPDATE Productos SET categoria_id = NULL WHERE categoria_id IS NOT NULL "
+                   "AND categoria_id NOT IN (SELECT categoria_id FROM Categorias)")
+    if dialecto == 'sqlite':
+        # SQLite no añade claves ajenas a una tabla existente: la misma regla con disparadores
+        for sentencia in _DISPARADORES_CATEGORIA:
+            cursor.execute(sentencia)
+        return
+    cursor.execute("SELECT 1 FROM information_schema.TABLE_CONSTRAINTS WHERE TABLE_SCHEMA = DATABASE() "
+                   "AND TABLE_NAME = 'Productos' AND CONSTRAINT_NAME = 'fk_productos_categoria'")
+    if not cursor.fetchall():
+        cursor.execute("ALTER TABLE Productos ADD CONSTRAINT fk_productos_categoria "
+                       "FOREIGN KEY (categoria_id) REFERENCES Categorias (categoria_id)")
+
+
+_DISPARADORES_CATEGORIA = [
+    '''CREATE TRIGGER IF NOT EXISTS trg_productos_categoria_insertada BEFORE INSERT ON Productos
+       WHEN NEW.categoria_id IS NOT NULL
+            AND NOT EXISTS (SELECT 1 FROM Categorias WHERE categoria_id = NEW.categoria_id)
+       BEGIN
+           SELECT RAISE(ABORT, 'FOREIGN KEY constraint failed: la categoria no existe');
+       END''',
+    '''CREATE TRIGGER IF NOT EXISTS trg_productos_categoria_cambiada BEFORE UPDATE OF categoria_id ON Productos
+       WHEN NEW.categoria_id IS NOT NULL
+            AND NOT EXISTS (SELECT 1 FROM Categorias WHERE categoria_id = NEW.categoria_id)
+       BEGIN
+           SELECT RAISE(ABORT, 'FOREIGN KEY constraint failed: la categoria no existe');
+       END''',
+    '''CREATE TRIGGER IF NOT EXISTS trg_categorias_en_uso BEFORE DELETE ON Categorias
+       WHEN EXISTS (SELECT 1 FROM Productos WHERE categoria_id = OLD.categoria_id)
+       BEGIN
+           SELECT RAISE(ABORT, 'FOREIGN KEY constraint failed: la categoria tiene productos');
+       END''',
+]
+
+# Antes del indice unico, las categorias repetidas (salvo la primera) pasan a llamarse "Nombre (#id)"
+_RENOMBRAR_REPETIDAS = {
+    'mysql': "CONCAT(LEFT(nombre, 40), ' (#', categoria_id, ')')",
+    'sqlite': "substr(nombre, 1, 40) || ' (#' || categoria_id || ')'",
+}
+
+
+def _categorias_unicas(cursor, dialecto):
+    # La tabla derivada evita el error de MySQL al leer en un UPDATE la misma tabla que se modifica
+    cursor.execute(f"UPDATE Categorias SET nombre = {_RENOMBRAR_REPETIDAS[dialecto]} "
+                   "WHERE categoria_id NOT IN (SELECT categoria_id FROM "
+                   "(SELECT MIN(categoria_id) AS categoria_id FROM Categorias GROUP BY nombre) AS primeras)")
+
+
+# Registro de cambios para las demas terminales: una fila por fila insertada, cambiada o borrada,
+# escrita por disparadores dentro de la misma transaccion (tambien desde LOAD DATA o el sincronizador)
+TABLAS_CON_CAMBIOS = {
+    'Clientes': 'cliente_id',
+    'Productos': 'producto_id',
+    'Categorias': 'categoria_id',
+    'Ventas': 'venta_id',
+    'DetalleVentas': 'detalle_id',
+}
+
+_TABLA_CAMBIOS = {
+    'mysql': '''CREATE TABLE IF NOT EXISTS Cambios (
+        seq BIGINT AUTO_INCREMENT PRIMARY KEY,
+        tabla VARCHAR(30) NOT NULL,
+        clave INT NOT NULL,
+        operacion CHAR(1) NOT NULL,
+        fecha DATETIME DEFAULT CURRENT_TIMESTAMP
+    )''',
+    # AUTOINCREMENT: un seq no se reutiliza aunque se borren las ultimas filas
+    'sqlite': '''CREATE TABLE IF NOT EXISTS Cambios (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        tabla VARCHAR(30) NOT NULL,
+        clave INT NOT NULL,
+        operacion CHAR(1) NOT NULL,
+        fecha DATETIME DEFAULT (datetime('now', 'localtime'))
+    )''',
+}
+
+_EVENTOS = (('I', 'INSERT', 'NEW'), ('U', 'UPDATE', 'NEW'), ('D', 'DELETE', 'OLD'))
+
+
+def _registro_cambios(cursor, dialecto):
+    """Tabla Cambios y un disparador AFTER INSERT/UPDATE/DELETE por tabla"""
+    cursor.execute(_TABLA_CAMBIOS[dialecto])
+    for tabla, clave in TABLAS_CON_CAMBIOS.items():
+        for operacion, evento, fila in _EVENTOS:
+            nombre = f"trg_{tabla.lower()}_cambio_{operacion.lower()}"
+            insertar = (f"INSERT INTO Cambios (tabla, clave, operacion) "
+                        f"VALUES ('{tabla}', {fila}.{clave}, '{operacion}')")
+            if dialecto == 'sqlite':
+                # En Productos el UPDATE de trg_productos_actualizado tambien se anota; quien lee
+                # los cambios junta las claves repetidas
+                cursor.execute(f"CREATE TRIGGER IF NOT EXISTS {nombre} AFTER {evento} ON {tabla} "
+                               f"BEGIN {insertar}; END")
+                continue
+            cursor.execute("SELECT 1 FROM information_schema.TRIGGERS "
+                           "WHERE TRIGGER_SCHEMA = DATABASE() AND TRIGGER_NAME = %s", (nombre,))
+            if not cursor.fetchall():
+                cursor.execute(f"CREATE TRIGGER {nombre} AFTER {evento} ON {tabla} FOR EACH ROW {insertar}")
+
+
+# Ventas de periodos cerrados, movidas por tienda.archivo.archivar. MySQL no admite claves ajenas en
+# tablas particionadas, asi que en lugar de particionar Ventas por fecha se mueven a tablas aparte
+# (sin claves ajenas, con las mismas columnas e indices para leerlas) y las vistas *Historico juntan ambas
+_TABLAS_ARCHIVO = [
+    '''CREATE TABLE IF NOT EXISTS VentasArchivo (
+        venta_id INT NOT NULL PRIMARY KEY,
+        cliente_id INT,
+        fecha DATETIME,
+        total DECIMAL(10,2)
+    )''',
+    '''CREATE TABLE IF NOT EXISTS DetalleVentasArchivo (
+        detalle_id INT NOT NULL PRIMARY KEY,
+        venta_id INT,
+        producto_id INT,
+        cantidad INT NOT NULL,
+        precio_unitario DECIMAL(10,2) NOT NULL
+    )''',
+]
+
+_VISTAS_HISTORICO = {
+    'VentasHistorico': """SELECT venta_id, cliente_id, fecha, total FROM Ventas
+                          UNION ALL SELECT venta_id, cliente_id, fecha, total FROM VentasArchivo""",
+    'DetalleVentasHistorico': """SELECT detalle_id, venta_id, producto_id, cantidad, precio_unitario FROM DetalleVentas
+                                 UNION ALL
+                                 SELECT detalle_id, venta_id, producto_id, cantidad, precio_unitario
+                                 FROM DetalleVentasArchivo""",
+}
+
+
+def _tablas_archivo(cursor, dialecto):
+    """VentasArchivo, DetalleVentasArchivo y las vistas que las juntan con las tablas calientes"""
+    for sentencia in _TABLAS_ARCHIVO:
+        cursor.execute(sentencia)
+    for nombre, consulta in _VISTAS_HISTORICO.items():
+        if dialecto == 'sqlite':
+            cursor.execute(f"CREATE VIEW IF NOT EXISTS {nombre} AS {consulta}")
+        else:
+            cursor.execute(f"CREATE OR REPLACE VIEW {nombre} AS {consulta}")
+
+
+# (version, descripcion, pasos); cada paso es paso(cursor, dialecto) y se puede repetir sin daño,
+# porque en MySQL cada ALTER TABLE confirma por su cuenta y una migracion cortada se vuelve a empezar
+MIGRACIONES = [
+    (1, "Nombre de categoria unico", [
+        _categorias_unicas,
+        _crear_indice('Categorias', 'uq_categorias_nombre', 'nombre', unico=True),
+        _quitar_indice('Categorias', 'idx_categorias_nombre'),
+    ]),
+    (2, "Productos.categoria_id referencia a Categorias", [
+        _crear_indice('Productos', 'idx_productos_categoria', 'categoria_id'),
+        _clave_ajena_categoria,
+    ]),
+    (3, "Indices cubrientes: lineas por venta y ventas por cliente y fecha", [
+        # venta_id primero sirve a la clave ajena y a WHERE venta_id = ...; el resto evita leer la fila
+        _crear_indice('DetalleVentas', 'idx_detalle_venta_lineas',
+                      'venta_id, producto_id, cantidad, precio_unitario'),
+        _quitar_indice('DetalleVentas', 'idx_detalle_venta'),
+        _crear_indice('Ventas', 'idx_ventas_cliente_fecha', 'cliente_id, fecha'),
+        _quitar_indice('Ventas', 'idx_ventas_cliente'),
+    ]),
+    (4, "Indices para ordenar por total, precio y stock", [
+        # Cada indice lleva la clave primaria al final: sirve tal cual a ORDER BY columna, clave
+        _crear_indice('Ventas', 'idx_ventas_total', 'total'),
+        _crear_indice('Productos', 'idx_productos_precio', 'precio'),
+        _crear_indice('Productos', 'idx_productos_stock', 'stock'),
+    ]),
+    (5, "Registro de cambios para las demas terminales", [
+        _registro_cambios,
+    ]),
+    (6, "Tablas de archivo para las ventas de periodos cerrados", [
+        _tablas_archivo,
+        _crear_indice('VentasArchivo', 'idx_ventas_archivo_fecha', 'fecha'),
+        _crear_indice('VentasArchivo', 'idx_ventas_archivo_cliente_fecha', 'cliente_id, fecha'),
+        _crear_indice('DetalleVentasArchivo', 'idx_detalle_archivo_lineas',
+                      'venta_id, producto_id, cantidad, precio_unitario'),
+        _crear_indice('DetalleVentasArchivo', 'idx_detalle_archivo_producto', 'producto_id'),
+    ]),
+]
+
+
+def migrar(db, hasta=None):
+    """Aplicar en orden las migraciones pendientes (hasta la version 'hasta'); devuelve las aplicadas
+
+    Cada migracion se anota en SchemaVersion en cuanto termina. Dos terminales que arrancan a la
+    vez no aplican la misma: en MySQL se toma un bloqueo con nombre y en SQLite la version se lee
+    con FOR UPDATE (BEGIN IMMEDIATE).
+    """
+    aplicadas = []
+    with db.conexion() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(TABLA_VERSIONES)
+            conn.commit()
+            if db.dialecto == 'mysql':
+                cursor.execute("SELECT GET_LOCK('tienda_migraciones', 60)")
+                cursor.fetchall()
+            try:
+                while True:
+                    cursor.execute("SELECT COALESCE(MAX(version), 0) FROM SchemaVersion FOR UPDATE")
+                    actual = cursor.fetchall()[0][0]
+                    pendientes = [m for m in MIGRACIONES if m[0] > actual and (hasta is None or m[0] <= hasta)]
+                    if not pendientes:
+                        conn.commit()
+                        break
+                    version, descripcion, pasos = pendientes[0]
+                    for paso in pasos:
+                        paso(cursor, db.dialecto)
+                    cursor.execute("INSERT INTO SchemaVersion (version, descripcion) VALUES (%s, %s)",
+                                   (version, descripcion))
+                    conn.commit()
+                    aplicadas.append(version)
+            finally:
+                if db.dialecto == 'mysql':
+                    cursor.execute("SELECT RELEASE_LOCK('tienda_migraciones')")
+                    cursor.fetchall()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+    return aplicadas
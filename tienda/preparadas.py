@@ -0,0 +1,119 @@
+# Sentencias preparadas en el servidor MySQL, guardadas por conexion del pool y reutilizadas entre llamadas
+from collections import OrderedDict
+
+
+def _cerrar(cursor):
+    try:
+        cursor.close()
+    except Exception:
+        pass
+
+
+class SentenciasPreparadas:
+    """LRU sql -> cursor(prepared=True) de una conexion
+
+    Cada cursor conserva su sentencia compilada en el servidor; la que sale de la LRU se
+    cierra y el servidor la libera (max_prepared_stmt_count es limitado).
+    """
+
+    def __init__(self, conn, max_sentencias=64):
+        self.conn = conn
+        self.max_sentencias = max_sentencias
+        self._cursores = OrderedDict()
+        self.preparadas = 0
+        self.reutilizadas = 0
+
+    def cursor(self, sql):
+        cursor = self._cursores.get(sql)
+        if cursor is not None:
+            self._cursores.move_to_end(sql)
+            self.reutilizadas += 1
+            return cursor
+        cursor = self.conn.cursor(prepared=True)
+        self._cursores[sql] = cursor
+        self.preparadas += 1
+        while len(self._cursores) > self.max_sentencias:
+            _, viejo = self._cursores.popitem(last=False)
+            _cerrar(viejo)
+        return cursor
+
+    def descartar(self, sql):
+        cursor = self._cursores.pop(sql, None)
+        if cursor is not None:
+            _cerrar(cursor)
+
+    def cerrar(self):
+        for cursor in self._cursores.values():
+            _cerrar(cursor)
+        self._cursores.clear()
+
+    def __len__(self):
+        return len(self._cursores)
+
+
+class CursorPreparado:
+    """Cursor de una transaccion en el que cada execute usa la sentencia preparada de su SQL
+
+    executemany va por un cursor normal, porque el conector junta las filas en un solo INSERT.
+    Las filas de una preparada se leen enteras al ejecutarla: la conexion no admite otra
+    sentencia mientras queden filas sin leer.
+    """
+
+    def __init__(self, sentencias, cursor_normal, envolver=None):
+        self._sentencias = sentencias
+        self._normal = cursor_normal
+        self._envolver = envolver  # p. ej. CursorMedido para la instrumentacion
+        self._actual = cursor_normal
+        self._filas = None  # None: las filas se leen del cursor normal
+
+    def execute(self, sql, params=()):
+        cursor = self._sentencias.cursor(sql)
+        if self._envolver is not None:
+            cursor = self._envolver(cursor)
+        try:
+            cursor.execute(sql, tuple(params or ()))
+            filas = cursor.fetchall() if cursor.description else []
+        except BaseException:
+            # Tras un error no se sabe en que estado queda la sentencia: se prepara de nuevo
+            self._sentencias.descartar(sql)
+            raise
+        self._actual = cursor
+        self._filas = filas
+
+    def executemany(self, sql, filas):
+        self._normal.executemany(sql, filas)
+        self._actual = self._normal
+        self._filas = None
+
+    def fetchone(self):
+        if self._filas is None:
+            return self._normal.fetchone()
+        return self._filas.pop(0) if self._filas else None
+
+    def fetchmany(self, tam=1):
+        if self._filas is None:
+            return self._normal.fetchmany(tam)
+        filas, self._filas = self._filas[:tam], self._filas[tam:]
+        return filas
+
+    def fetchall(self):
+        if self._filas is None:
+            return self._normal.fetchall()
+        filas, self._filas = self._filas, []
+        return filas
+
+    @property
+    def rowcount(self):
+        return self._actual.rowcount
+
+    @property
+    def lastrowid(self):
+        return self._actual.lastrowid
+
+    @property
+    def description(self):
+        return self._actual.description
+
+    def close(self):
+        # Las preparadas se quedan en la conexion para la siguiente transaccion
+        self._normal.close()
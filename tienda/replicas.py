@@ -0,0 +1,71 @@
+# Replicas de solo lectura: cada una con su propio pool, su estado de salud y su retraso medido
+import threading
+import time
+
+
+class Replica:
+    """Una replica de lectura (una ConexionBase con su pool) y lo ultimo que se sabe de ella
+
+    La salud se comprueba al elegir replica, como mucho cada intervalo_salud segundos y desde
+    un solo hilo a la vez; mientras tanto los demas hilos usan el estado anterior.
+    """
+
+    def __init__(self, db, nombre, retraso_maximo=5, intervalo_salud=10):
+        self.db = db
+        self.nombre = nombre
+        self.retraso_maximo = retraso_maximo
+        self.intervalo_salud = intervalo_salud
+        self._comprobando = threading.Lock()
+        self.sana = False
+        self.retraso = None  # segundos por detras de la primaria en la ultima comprobacion
+        self.comprobada_en = None
+        self.error = None
+        self.lecturas = 0
+        self.fallos = 0
+
+    def comprobar(self):
+        try:
+            retraso = self.db.retraso_replica()
+        except Exception as e:
+            self.sana, self.retraso, self.error = False, None, str(e)
+        else:
+            self.retraso = retraso
+            self.sana = retraso is not None and retraso <= self.retraso_maximo
+            self.error = "Replicacion detenida" if retraso is None else None
+        self.comprobada_en = time.monotonic()
+
+    def _al_dia(self):
+        if self.comprobada_en is not None and time.monotonic() - self.comprobada_en < self.intervalo_salud:
+            return
+        if self._comprobando.acquire(blocking=False):
+            try:
+                self.comprobar()
+            finally:
+                self._comprobando.release()
+
+    def apta(self, desde_escritura):
+        """Se puede leer de ella: sana y con menos retraso que el tiempo desde la ultima escritura propia
+
+        desde_escritura: segundos desde que esta terminal escribio por ultima vez (None: nunca).
+        El retraso se mide en segundos enteros, de ahi el segundo de margen.
+        """
+        self._al_dia()
+        if not self.sana:
+            return False
+        return desde_escritura is None or desde_escritura > self.retraso + 1
+
+    def fallo(self):
+        """Una lectura ha fallado: se deja de usar hasta volver a comprobarla"""
+        self.fallos += 1
+        self.sana = False
+        self.comprobada_en = None
+
+    def estado(self):
+        return {
+            'nombre': self.nombre,
+            'sana': self.sana,
+            'retraso': self.retraso,
+            'error': self.error,
+            'lecturas': self.lecturas,
+            'fallos': self.fallos,
+        }
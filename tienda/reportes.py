@@ -0,0 +1,181 @@
+# Informes de ventas calculados en el servidor sobre el resumen diario VentasDiarias
+from datetime import date, timedelta
+from decimal import Decimal
+
+from tienda.archivo import archivado_hasta, origen_ventas
+
+# Una fila por dia y producto; se mantiene al cobrar y al editar ventas o detalles
+TABLA_RESUMEN = '''CREATE TABLE IF NOT EXISTS VentasDiarias (
+                fecha DATE NOT NULL,
+                producto_id INT NOT NULL,
+                cantidad INT NOT NULL,
+                importe DECIMAL(12,2) NOT NULL,
+                PRIMARY KEY (fecha, producto_id),
+                INDEX idx_resumen_producto (producto_id)
+            )'''
+
+_INSERTAR_RESUMEN = """INSERT INTO VentasDiarias (fecha, producto_id, cantidad, importe)
+                       SELECT DATE(v.fecha), d.producto_id, SUM(d.cantidad), SUM(d.cantidad * d.precio_unitario)
+                       FROM Ventas v JOIN DetalleVentas d ON d.venta_id = v.venta_id"""
+
+# Las ventas archivadas siguen en el resumen: al rehacer un dia (o el resumen entero) se suman tambien
+_INSERTAR_RESUMEN_ARCHIVO = """INSERT INTO VentasDiarias (fecha, producto_id, cantidad, importe)
+                               SELECT DATE(v.fecha), d.producto_id, SUM(d.cantidad),
+                                      SUM(d.cantidad * d.precio_unitario)
+                               FROM VentasArchivo v JOIN DetalleVentasArchivo d ON d.venta_id = v.venta_id"""
+
+# Inicio del periodo de cada dia del resumen, segun el motor de base de datos
+PERIODOS = {
+    'mysql': {
+        'dia': "fecha",
+        'semana': "DATE_SUB(fecha, INTERVAL WEEKDAY(fecha) DAY)",       # lunes de la semana
+        'mes': "DATE_SUB(fecha, INTERVAL DAYOFMONTH(fecha) - 1 DAY)",    # dia 1 del mes
+    },
+    'sqlite': {
+        'dia': "fecha",
+        'semana': "date(fecha, '-6 days', 'weekday 1')",
+        'mes': "date(fecha, 'start of month')",
+    },
+}
+
+_SUMAR_SI_EXISTE = {
+    'mysql': """ON DUPLICATE KEY UPDATE cantidad = cantidad + VALUES(cantidad),
+                                     importe = importe + VALUES(importe)""",
+    'sqlite': """ON CONFLICT (fecha, producto_id) DO UPDATE SET cantidad = cantidad + excluded.cantidad,
+                                                             importe = importe + excluded.importe""",
+}
+
+
+def acumular_venta(cursor, venta_id, dialecto='mysql'):
+    """Sumar las lineas de una venta recien registrada al resumen diario"""
+    cursor.execute(_INSERTAR_RESUMEN + " WHERE v.venta_id = %s GROUP BY DATE(v.fecha), d.producto_id "
+                   + _SUMAR_SI_EXISTE[dialecto], (venta_id,))
+
+
+def _fechas_de_ventas(cursor, venta_ids):
+    ids = sorted({int(v) for v in venta_ids if v not in (None, "")})
+    if not ids:
+        return set()
+    marcas = ", ".join(["%s"] * len(ids))
+    cursor.execute(f"SELECT DISTINCT DATE(fecha) FROM Ventas WHERE venta_id IN ({marcas}) AND fecha IS NOT NULL", ids)
+    return {fila[0] for fila in cursor.fetchall()}
+
+
+def recalcular_dias(cursor, fechas, dialecto='mysql'):
+    """Rehacer el resumen de los dias indicados a partir de DetalleVentas y de lo archivado"""
+    for fecha in sorted(fechas):
+        if isinstance(fecha, str):
+            fecha = date.fromisoformat(fecha)  # SQLite devuelve DATE(...) como texto
+        dia = (fecha, fecha + timedelta(days=1))
+        cursor.execute("DELETE FROM VentasDiarias WHERE fecha = %s", (fecha,))
+        cursor.execute(_INSERTAR_RESUMEN
+                       + " WHERE v.fecha >= %s AND v.fecha < %s GROUP BY DATE(v.fecha), d.producto_id", dia)
+        # Una venta puede haberse movido a un dia ya archivado: se suma a lo que quedaba archivado
+        cursor.execute(_INSERTAR_RESUMEN_ARCHIVO
+                       + " WHERE v.fecha >= %s AND v.fecha < %s GROUP BY DATE(v.fecha), d.producto_id "
+                       + _SUMAR_SI_EXISTE[dialecto], dia)
+
+
+def con_resumen(db, venta_ids, escribir):
+    """Ejecutar escribir(cursor) y rehacer en la misma transaccion los dias de esas ventas
+
+    Para las ediciones sueltas de Ventas y DetalleVentas: se recalculan los dias de las
+    ventas antes y despues del cambio, asi que mover una venta de fecha o una linea de
+    venta tambien queda reflejado. Devuelve lo que devuelva escribir.
+    """
+    with db.conexion() as conn:
+        cursor = db.cursor_preparado(conn)
+        try:
+            fechas = _fechas_de_ventas(cursor, venta_ids)
+            resultado = escribir(cursor)
+            fechas |= _fechas_de_ventas(cursor, venta_ids)
+            recalcular_dias(cursor, fechas, db.dialecto)
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+    return resultado
+
+
+def reconstruir_resumen(db):
+    """Vaciar y volver a calcular todo el resumen; devuelve el numero de filas"""
+    with db.conexion() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute("DELETE FROM VentasDiarias")
+            cursor.execute(_INSERTAR_RESUMEN
+                           + " WHERE v.fecha IS NOT NULL GROUP BY DATE(v.fecha), d.producto_id")
+            filas = cursor.rowcount
+            cursor.execute(_INSERTAR_RESUMEN_ARCHIVO
+                           + " WHERE v.fecha IS NOT NULL GROUP BY DATE(v.fecha), d.producto_id "
+                           + _SUMAR_SI_EXISTE[db.dialecto])
+            filas += cursor.rowcount
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+    return filas
+
+
+def _importes(db, filas):
+    """El importe (ultima columna) como Decimal: en SQLite SUM de una columna DECIMAL devuelve float"""
+    if db.dialecto != 'sqlite':
+        return filas
+    centimo = Decimal("0.01")
+    return [tuple(fila[:-1]) + (None if fila[-1] is None else Decimal(str(fila[-1])).quantize(centimo),)
+            for fila in filas]
+
+
+def ventas_por_periodo(db, desde, hasta, periodo='dia'):
+    expresion = PERIODOS[db.dialecto][periodo]
+    filas = db.consultar(f"""SELECT {expresion} AS periodo, SUM(cantidad), SUM(importe)
+                             FROM VentasDiarias WHERE fecha BETWEEN %s AND %s
+                             GROUP BY periodo ORDER BY periodo""", (desde, hasta))
+    return (periodo, 'unidades', 'importe'), _importes(db, filas)
+
+
+def top_productos(db, desde, hasta, limite=10):
+    filas = db.consultar("""SELECT r.producto_id, p.nombre, SUM(r.cantidad), SUM(r.importe) AS importe
+                            FROM VentasDiarias r LEFT JOIN Productos p ON p.producto_id = r.producto_id
+                            WHERE r.fecha BETWEEN %s AND %s
+                            GROUP BY r.producto_id, p.nombre ORDER BY importe DESC LIMIT %s""",
+                         (desde, hasta, limite))
+    return ('producto_id', 'nombre', 'unidades', 'importe'), _importes(db, filas)
+
+
+def ingresos_por_cliente(db, desde, hasta, limite=50):
+    # Se agrupa sobre las cabeceras de Ventas (una fila por venta), no sobre DetalleVentas;
+    # si el periodo empieza antes de lo archivado se leen tambien las ventas archivadas
+    origen = origen_ventas(archivado_hasta(db), desde)
+    filas = db.consultar(f"""SELECT v.cliente_id, c.nombre, COUNT(*), SUM(v.total) AS importe
+                            FROM {origen} v LEFT JOIN Clientes c ON c.cliente_id = v.cliente_id
+                            WHERE v.fecha >= %s AND v.fecha < %s
+                            GROUP BY v.cliente_id, c.nombre ORDER BY importe DESC LIMIT %s""",
+                         (desde, hasta + timedelta(days=1), limite))
+    return ('cliente_id', 'nombre', 'ventas', 'importe'), _importes(db, filas)
+
+
+def ventas_por_categoria(db, desde, hasta):
+    filas = db.consultar("""SELECT COALESCE(c.nombre, 'Sin categoría') AS categoria, SUM(r.cantidad),
+                                   SUM(r.importe) AS importe
+                            FROM VentasDiarias r
+                            LEFT JOIN Productos p ON p.producto_id = r.producto_id
+                            LEFT JOIN Categorias c ON c.categoria_id = p.categoria_id
+                            WHERE r.fecha BETWEEN %s AND %s
+                            GROUP BY categoria ORDER BY importe DESC""", (desde, hasta))
+    return ('categoria', 'unidades', 'importe'), _importes(db, filas)
+
+
+# Informes que ofrece la pestaña Reportes: nombre -> funcion(db, desde, hasta)
+INFORMES = {
+    "Ventas por día": lambda db, desde, hasta: ventas_por_periodo(db, desde, hasta, 'dia'),
+    "Ventas por semana": lambda db, desde, hasta: ventas_por_periodo(db, desde, hasta, 'semana'),
+    "Ventas por mes": lambda db, desde, hasta: ventas_por_periodo(db, desde, hasta, 'mes'),
+    "Productos más vendidos": top_productos,
+    "Ingresos por cliente": ingresos_por_cliente,
+    "Ventas por categoría": ventas_por_categoria,
+}
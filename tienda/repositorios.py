@@ -0,0 +1,183 @@
+# Acceso a cada tabla con metodos tipados; lo usan las pestañas de Tk y los procesos por lotes
+from datetime import datetime
+from decimal import Decimal
+from typing import Optional
+
+from tienda.caja import registrar_venta
+from tienda.reportes import con_resumen
+from tienda.stock import guardar_cambios_producto
+
+
+def _escritura(consulta, params):
+    """escribir(cursor) para con_resumen: ejecuta la consulta y dice si cambio alguna fila"""
+    def escribir(cursor):
+        cursor.execute(consulta, params)
+        return cursor.rowcount > 0
+    return escribir
+
+
+class Repositorio:
+    """Lectura por clave y borrado comunes a todas las tablas"""
+
+    tabla = ""
+    clave = ""
+    columnas = ()
+
+    def __init__(self, db):
+        self.db = db
+
+    def obtener(self, pk: int) -> Optional[tuple]:
+        filas = self.db.consultar(f"SELECT {', '.join(self.columnas)} FROM {self.tabla} WHERE {self.clave} = %s",
+                                  (pk,), preparada=True)
+        return filas[0] if filas else None
+
+    def listar(self, despues: int = 0, limite: int = 100) -> list:
+        """Filas en orden de clave a partir de 'despues' (paginacion por clave)"""
+        return self.db.consultar(f"SELECT {', '.join(self.columnas)} FROM {self.tabla} WHERE {self.clave} > %s "
+                                 f"ORDER BY {self.clave} LIMIT %s", (despues, limite), preparada=True)
+
+    def contar(self) -> int:
+        return self.db.consultar(f"SELECT COUNT(*) FROM {self.tabla}", preparada=True)[0][0]
+
+    def eliminar(self, pk: int) -> bool:
+        return self.db.ejecutar(f"DELETE FROM {self.tabla} WHERE {self.clave} = %s", (pk,), preparada=True) > 0
+
+
+class Clientes(Repositorio):
+    tabla = "Clientes"
+    clave = "cliente_id"
+    columnas = ('cliente_id', 'nombre', 'telefono', 'direccion')
+
+    def __init__(self, db, nombres=None):
+        super().__init__(db)
+        self.nombres = nombres
+
+    def crear(self, nombre: str, telefono: Optional[str] = None, direccion: Optional[str] = None) -> int:
+        cliente_id = self.db.insertar("INSERT INTO Clientes (nombre, telefono, direccion) VALUES (%s, %s, %s)",
+                                      (nombre, telefono, direccion), preparada=True)
+        if self.nombres is not None:
+            self.nombres.poner(cliente_id, nombre)
+        return cliente_id
+
+    def actualizar(self, cliente_id: int, nombre: str, telefono: Optional[str], direccion: Optional[str]) -> bool:
+        cambiado = self.db.ejecutar("UPDATE Clientes SET nombre=%s, telefono=%s, direccion=%s WHERE cliente_id=%s",
+                                    (nombre, telefono, direccion, cliente_id), preparada=True) > 0
+        if cambiado and self.nombres is not None:
+            self.nombres.poner(int(cliente_id), nombre)
+        return cambiado
+
+    def eliminar(self, cliente_id: int) -> bool:
+        eliminado = super().eliminar(cliente_id)
+        if eliminado and self.nombres is not None:
+            self.nombres.quitar(int(cliente_id))
+        return eliminado
+
+
+class Productos(Repositorio):
+    tabla = "Productos"
+    clave = "producto_id"
+    columnas = ('producto_id', 'nombre', 'descripcion', 'precio', 'stock', 'categoria_id', 'version')
+
+    def __init__(self, db, catalogo=None):
+        super().__init__(db)
+        self.catalogo = catalogo
+
+    def _al_escribir(self, *producto_ids):
+        if self.catalogo is not None:
+            self.catalogo.recargar_productos(producto_ids)
+
+    def crear(self, nombre: str, descripcion: Optional[str], precio: Decimal, stock: int,
+              categoria_id: Optional[int] = None) -> int:
+        producto_id = self.db.insertar("INSERT INTO Productos (nombre, descripcion, precio, stock, categoria_id) "
+                                       "VALUES (%s, %s, %s, %s, %s)",
+                                       (nombre, descripcion, precio, stock, categoria_id), preparada=True)
+        self._al_escribir(producto_id)
+        return producto_id
+
+    def actualizar(self, producto_id: int, version: int, nombre: str, descripcion: Optional[str], precio: Decimal,
+                   categoria_id: Optional[int], cambio_stock: int) -> bool:
+        """Edicion optimista; False si otra terminal cambio el producto desde que se leyo 'version'"""
+        aplicado = guardar_cambios_producto(self.db, producto_id, version, nombre, descripcion, precio,
+                                            categoria_id, cambio_stock)
+        self._al_escribir(producto_id)
+        return aplicado
+
+    def eliminar(self, producto_id: int) -> bool:
+        eliminado = super().eliminar(producto_id)
+        self._al_escribir(producto_id)
+        return eliminado
+
+
+class Categorias(Repositorio):
+    tabla = "Categorias"
+    clave = "categoria_id"
+    columnas = ('categoria_id', 'nombre', 'descripcion')
+
+    def crear(self, nombre: str, descripcion: Optional[str] = None) -> int:
+        return self.db.insertar("INSERT INTO Categorias (nombre, descripcion) VALUES (%s, %s)", (nombre, descripcion),
+                                preparada=True)
+
+    def actualizar(self, categoria_id: int, nombre: str, descripcion: Optional[str]) -> bool:
+        return self.db.ejecutar("UPDATE Categorias SET nombre=%s, descripcion=%s WHERE categoria_id=%s",
+                                (nombre, descripcion, categoria_id), preparada=True) > 0
+
+
+class Ventas(Repositorio):
+    tabla = "Ventas"
+    clave = "venta_id"
+    columnas = ('venta_id', 'cliente_id', 'fecha', 'total')
+
+    def __init__(self, db, catalogo=None):
+        super().__init__(db)
+        self.catalogo = catalogo
+
+    def crear(self, cliente_id: Optional[int], fecha: Optional[datetime], total: Optional[Decimal]) -> int:
+        return self.db.insertar("INSERT INTO Ventas (cliente_id, fecha, total) VALUES (%s, %s, %s)",
+                                (cliente_id, fecha, total), preparada=True)
+
+    def actualizar(self, venta_id: int, cliente_id: Optional[int], fecha: Optional[datetime],
+                   total: Optional[Decimal]) -> bool:
+        # Cambiar la fecha mueve la venta de dia en el resumen de reportes
+        return con_resumen(self.db, [venta_id], _escritura(
+            "UPDATE Ventas SET cliente_id=%s, fecha=%s, total=%s WHERE venta_id=%s",
+            (cliente_id, fecha, total, venta_id)))
+
+    def eliminar(self, venta_id: int) -> bool:
+        return con_resumen(self.db, [venta_id], _escritura("DELETE FROM Ventas WHERE venta_id=%s", (venta_id,)))
+
+    def cobrar(self, cliente_id: Optional[int], carrito: list, fecha: Optional[datetime] = None) -> tuple:
+        """Venta completa en una transaccion; devuelve (venta_id, total). Ver caja.registrar_venta"""
+        resultado = registrar_venta(self.db, cliente_id, carrito, fecha)
+        if self.catalogo is not None:
+            self.catalogo.recargar_productos(linea[0] for linea in carrito)
+        return resultado
+
+
+class DetalleVentas(Repositorio):
+    tabla = "DetalleVentas"
+    clave = "detalle_id"
+    columnas = ('detalle_id', 'venta_id', 'producto_id', 'cantidad', 'precio_unitario')
+
+    def crear(self, venta_id: int, producto_id: int, cantidad: int, precio_unitario: Decimal) -> int:
+        def insertar(cursor):
+            cursor.execute("INSERT INTO DetalleVentas (venta_id, producto_id, cantidad, precio_unitario) "
+                           "VALUES (%s, %s, %s, %s)", (venta_id, producto_id, cantidad, precio_unitario))
+            return cursor.lastrowid
+        return con_resumen(self.db, [venta_id], insertar)
+
+    def actualizar(self, detalle_id: int, venta_id: int, producto_id: int, cantidad: int,
+                   precio_unitario: Decimal, venta_anterior: Optional[int] = None) -> bool:
+        """Si la linea cambia de venta se recalculan los dias de la venta anterior y de la nueva"""
+        if venta_anterior is None:
+            fila = self.obtener(detalle_id)
+            venta_anterior = fila[1] if fila else None
+        return con_resumen(self.db, [venta_anterior, venta_id], _escritura(
+            "UPDATE DetalleVentas SET venta_id=%s, producto_id=%s, cantidad=%s, precio_unitario=%s "
+            "WHERE detalle_id=%s", (venta_id, producto_id, cantidad, precio_unitario, detalle_id)))
+
+    def eliminar(self, detalle_id: int, venta_id: Optional[int] = None) -> bool:
+        if venta_id is None:
+            fila = self.obtener(detalle_id)
+            venta_id = fila[1] if fila else None
+        return con_resumen(self.db, [venta_id], _escritura(
+            "DELETE FROM DetalleVentas WHERE detalle_id=%s", (detalle_id,)))
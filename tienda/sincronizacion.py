@@ -0,0 +1,226 @@
+# Envio en segundo plano de las operaciones del diario local a la base de datos central
+import sqlite3
+import threading
+from datetime import date, datetime
+
+from tienda.caja import ErrorVenta, _preparar, cobrar_en
+from tienda.conexion import ErrorPool
+from tienda.importacion import _decimal, _fecha
+from tienda.reportes import _fechas_de_ventas, recalcular_dias
+from tienda.stock import ERRORES_REINTENTABLES, con_reintentos
+
+# Errores del cliente de MySQL que indican que no hay conexion (no que el dato sea malo)
+# CR_CONN_HOST_ERROR, CR_SERVER_GONE_ERROR, CR_SERVER_LOST, CR_SERVER_LOST_EXTENDED
+ERRORES_CONEXION = (2003, 2006, 2013, 2055)
+
+
+class ErrorSincronizacion(Exception):
+    """La operacion anotada no se puede aplicar en el servidor"""
+
+
+def es_error_conexion(e):
+    """True si el fallo es pasajero (red, servidor o bloqueo) y la operacion debe esperar en el diario
+
+    Un bloqueo que sigue tras los reintentos (interbloqueo en MySQL, fichero ocupado en SQLite)
+    no dice nada malo de la operacion: apartarla como fallida la perderia.
+    """
+    if isinstance(e, sqlite3.OperationalError):
+        mensaje = str(e).lower()
+        return 'locked' in mensaje or 'busy' in mensaje
+    return (isinstance(e, (ErrorPool, OSError))
+            or getattr(e, 'errno', None) in ERRORES_CONEXION + ERRORES_REINTENTABLES)
+
+
+def _cantidad(valor):
+    try:
+        cantidad = int(valor)
+    except ValueError:
+        raise ValueError(f"'{valor}' no es un número entero") from None
+    if cantidad <= 0:
+        raise ValueError("debe ser mayor que cero")
+    return cantidad
+
+
+def _validar(que, valor, convertir):
+    """valor convertido como en la importacion CSV; ErrorVenta con el motivo si no vale
+
+    Lo anotado se envia mas tarde: un dato mal escrito tiene que avisarse ahora y no acabar
+    entre las operaciones fallidas.
+    """
+    if isinstance(valor, date):
+        return valor
+    try:
+        return convertir("" if valor is None else str(valor).strip())
+    except ValueError as e:
+        raise ErrorVenta(f"{que}: {e}") from None
+
+
+def referencia_local(id_local):
+    """Texto con el que el cajero ve una venta que aun no tiene venta_id del servidor"""
+    return f"L{id_local}"
+
+
+class Sincronizador:
+    """Anota ventas en el diario al instante y las replica en lotes desde un hilo propio
+
+    Cada lote se aplica en una transaccion con su clave de idempotencia. Si el servidor no
+    responde las operaciones se quedan en el diario y se reintenta con espera creciente; si
+    una operacion concreta es rechazada se aparta como fallida y el resto sigue su curso.
+    al_cambiar(estado) se llama desde el hilo del sincronizador tras cada pasada; estado
+    incluye 'enviadas', las operaciones procesadas en esa pasada.
+    """
+
+    def __init__(self, db, diario, intervalo=5, tam_lote=50, espera_maxima=60, al_cambiar=None):
+        self.db = db
+        self.diario = diario
+        self.intervalo = intervalo
+        self.tam_lote = tam_lote
+        self.espera_maxima = espera_maxima
+        self.al_cambiar = al_cambiar
+        self.conectado = None
+        self.ultimo_error = None
+        self._despertar = threading.Event()
+        self._parar = threading.Event()
+        self._hilo = None
+
+    # Anotaciones (hilo de Tk): solo escriben en el diario local
+
+    def anotar_venta(self, cliente_id, fecha, total):
+        """Sin fecha la venta lleva la de la anotacion; ErrorVenta si la fecha o el total no valen"""
+        return self._anotar('venta', {'cliente_id': cliente_id, 'fecha': _validar("Fecha", fecha, _fecha),
+                                      'total': _validar("Total", total, _decimal(obligatorio=True))})
+
+    def anotar_detalle(self, venta_id, producto_id, cantidad, precio_unitario):
+        """venta_id puede ser un id del servidor o la referencia local ('L12') de una venta anotada"""
+        return self._anotar('detalle', {'venta_id': venta_id, 'producto_id': producto_id,
+                                        'cantidad': _validar("Cantidad", cantidad, _cantidad),
+                                        'precio_unitario': _validar("Precio unitario", precio_unitario,
+                                                                    _decimal(obligatorio=True))})
+
+    def anotar_cobro(self, cliente_id, carrito, fecha=None):
+        """Anotar un cobro completo; la hora de la venta es la de la anotacion, no la del envio"""
+        lineas, _ = _preparar(carrito)  # el carrito vacio o con cantidades malas se rechaza ya
+        return self._anotar('cobro', {'cliente_id': cliente_id, 'carrito': lineas,
+                                      'fecha': fecha or datetime.now()})
+
+    def _anotar(self, tipo, datos):
+        id_local = self.diario.anotar(tipo, datos)
+        self._despertar.set()
+        return id_local
+
+    # Envio al servidor (hilo del sincronizador)
+
+    def iniciar(self):
+        self._hilo = threading.Thread(target=self._bucle, name="sincronizador", daemon=True)
+        self._hilo.start()
+
+    def detener(self, espera=5):
+        self._parar.set()
+        self._despertar.set()
+        if self._hilo is not None:
+            self._hilo.join(espera)
+
+    def _bucle(self):
+        espera = self.intervalo
+        while not self._parar.is_set():
+            aplicadas = 0
+            try:
+                aplicadas = self.sincronizar()
+            except Exception as e:
+                # El hilo no debe morir: lo pendiente sigue a salvo en el diario
+                self.conectado = not es_error_conexion(e)
+                self.ultimo_error = str(e)
+                espera = min(max(espera, self.intervalo) * 2, self.espera_maxima)
+            else:
+                self.conectado = True
+                self.ultimo_error = None
+                # Si el lote vino lleno queda mas cola: se sigue sin esperar
+                espera = 0 if aplicadas >= self.tam_lote else self.intervalo
+            if self.al_cambiar is not None:
+                self.al_cambiar(dict(self.estado(), enviadas=aplicadas))
+            self._despertar.wait(espera)
+            self._despertar.clear()
+
+    def estado(self):
+        resumen = self.diario.resumen()
+        return {'pendientes': resumen['pendiente'], 'fallidas': resumen['fallida'],
+                'conectado': self.conectado, 'error': self.ultimo_error}
+
+    def sincronizar(self):
+        """Enviar un lote de operaciones pendientes; devuelve cuantas se han procesado"""
+        lote = self.diario.pendientes(self.tam_lote)
+        if not lote:
+            return 0
+        try:
+            self.diario.marcar_hechas(con_reintentos(lambda: self._aplicar(lote)))
+        except Exception as e:
+            if es_error_conexion(e):
+                raise
+            # Alguna operacion del lote es rechazada: se envian una a una para apartar solo esa
+            for operacion in lote:
+                try:
+                    self.diario.marcar_hechas(con_reintentos(lambda: self._aplicar([operacion])))
+                except Exception as e:
+                    if es_error_conexion(e):
+                        raise
+                    self.diario.marcar_fallida(operacion[0], e)
+        return len(lote)
+
+    def _aplicar(self, lote):
+        resultados = {}
+        with self.db.conexion() as conn:
+            # Las mismas pocas sentencias para cada operacion del lote: preparadas una vez por conexion
+            cursor = self.db.cursor_preparado(conn)
+            try:
+                for id_local, clave, tipo, datos in lote:
+                    cursor.execute("SELECT id_remoto FROM Sincronizaciones WHERE clave = %s", (clave,))
+                    fila = cursor.fetchone()
+                    if fila is not None:
+                        resultados[id_local] = fila[0]
+                        continue
+                    id_remoto = getattr(self, '_aplicar_' + tipo)(cursor, datos, resultados)
+                    cursor.execute("INSERT INTO Sincronizaciones (clave, id_remoto) VALUES (%s, %s)",
+                                   (clave, id_remoto))
+                    resultados[id_local] = id_remoto
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+            finally:
+                cursor.close()
+        return resultados
+
+    def _aplicar_venta(self, cursor, datos, resultados):
+        cursor.execute("INSERT INTO Ventas (cliente_id, fecha, total) VALUES (%s, %s, %s)",
+                       (datos['cliente_id'], datos['fecha'], datos['total']))
+        return cursor.lastrowid
+
+    def _aplicar_detalle(self, cursor, datos, resultados):
+        venta_id = self._venta_remota(datos['venta_id'], resultados)
+        cursor.execute("INSERT INTO DetalleVentas (venta_id, producto_id, cantidad, precio_unitario) "
+                       "VALUES (%s, %s, %s, %s)",
+                       (venta_id, datos['producto_id'], datos['cantidad'], datos['precio_unitario']))
+        detalle_id = cursor.lastrowid
+        recalcular_dias(cursor, _fechas_de_ventas(cursor, [venta_id]), self.db.dialecto)
+        return detalle_id
+
+    def _aplicar_cobro(self, cursor, datos, resultados):
+        # La mercancia ya se entrego: se registra aunque el stock del servidor quede negativo
+        venta_id, _ = cobrar_en(cursor, self.db.dialecto, datos['cliente_id'], datos['carrito'],
+                                datos['fecha'], exigir_stock=False)
+        return venta_id
+
+    def _venta_remota(self, venta_id, resultados):
+        """Traducir la referencia local 'L12' al venta_id que le dio el servidor"""
+        if not (isinstance(venta_id, str) and venta_id.strip().upper().startswith('L')):
+            return venta_id
+        id_local = int(venta_id.strip()[1:])
+        if id_local in resultados:
+            return resultados[id_local]
+        try:
+            id_remoto = self.diario.id_remoto(id_local)
+        except KeyError:
+            raise ErrorSincronizacion(f"No existe la venta local {venta_id}") from None
+        if id_remoto is None:
+            raise ErrorSincronizacion(f"La venta {venta_id} no se ha podido enviar al servidor")
+        return id_remoto
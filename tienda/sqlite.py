@@ -0,0 +1,244 @@
+# Motor SQLite: la tienda en un fichero local, sin servidor (sucursales pequeñas, pruebas, benchmarks)
+import re
+import sqlite3
+import threading
+from collections import OrderedDict
+from datetime import date, datetime
+from decimal import Decimal
+
+from tienda.conexion import TABLA_SINCRONIZACIONES, ConexionBase
+from tienda.migraciones import migrar
+
+# Tipos de Python <-> columnas declaradas como en el esquema de MySQL
+sqlite3.register_adapter(Decimal, str)
+sqlite3.register_adapter(datetime, lambda valor: valor.strftime("%Y-%m-%d %H:%M:%S"))
+sqlite3.register_adapter(date, lambda valor: valor.isoformat())
+sqlite3.register_converter("DECIMAL", lambda valor: Decimal(valor.decode()))
+sqlite3.register_converter("DATETIME", lambda valor: datetime.fromisoformat(valor.decode()))
+sqlite3.register_converter("DATE", lambda valor: date.fromisoformat(valor.decode()[:10]))
+
+# Las mismas tablas que DatabaseConnection.create_tables, con la sintaxis de SQLite
+TABLAS = [
+    '''CREATE TABLE IF NOT EXISTS Clientes (
+        cliente_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        nombre VARCHAR(100) NOT NULL,
+        telefono VARCHAR(15),
+        direccion VARCHAR(150)
+    )''',
+    '''CREATE TABLE IF NOT EXISTS Productos (
+        producto_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        nombre VARCHAR(100) NOT NULL,
+        descripcion TEXT,
+        precio DECIMAL(10,2) NOT NULL,
+        stock INT NOT NULL,
+        categoria_id INT NULL,
+        version INT NOT NULL DEFAULT 0,
+        actualizado_en DATETIME DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime'))
+    )''',
+    '''CREATE TABLE IF NOT EXISTS Categorias (
+        categoria_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        nombre VARCHAR(50) NOT NULL,
+        descripcion TEXT
+    )''',
+    '''CREATE TABLE IF NOT EXISTS Ventas (
+        venta_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        cliente_id INT,
+        fecha DATETIME DEFAULT (datetime('now', 'localtime')),
+        total DECIMAL(10,2),
+        FOREIGN KEY (cliente_id) REFERENCES Clientes(cliente_id)
+    )''',
+    '''CREATE TABLE IF NOT EXISTS DetalleVentas (
+        detalle_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        venta_id INT,
+        producto_id INT,
+        cantidad INT NOT NULL,
+        precio_unitario DECIMAL(10,2) NOT NULL,
+        FOREIGN KEY (venta_id) REFERENCES Ventas(venta_id),
+        FOREIGN KEY (producto_id) REFERENCES Productos(producto_id)
+    )''',
+    '''CREATE TABLE IF NOT EXISTS VentasDiarias (
+        fecha DATE NOT NULL,
+        producto_id INT NOT NULL,
+        cantidad INT NOT NULL,
+        importe DECIMAL(12,2) NOT NULL,
+        PRIMARY KEY (fecha, producto_id)
+    )''',
+    TABLA_SINCRONIZACIONES,
+]
+
+COLUMNAS = [
+    ('Productos', 'version', 'version INT NOT NULL DEFAULT 0'),
+    ('Productos', 'categoria_id', 'categoria_id INT NULL'),
+    ('Productos', 'actualizado_en', 'actualizado_en DATETIME'),
+]
+
+# Los indices B-tree de MySQL; los FULLTEXT no existen aqui (busqueda usa LIKE por palabra).
+# Los unicos y los cubrientes los crean las migraciones (tienda.migraciones).
+INDICES = [
+    'CREATE INDEX IF NOT EXISTS idx_clientes_nombre ON Clientes (nombre)',
+    'CREATE INDEX IF NOT EXISTS idx_productos_nombre ON Productos (nombre)',
+    'CREATE INDEX IF NOT EXISTS idx_productos_categoria ON Productos (categoria_id)',
+    'CREATE INDEX IF NOT EXISTS idx_productos_actualizado ON Productos (actualizado_en)',
+    'CREATE INDEX IF NOT EXISTS idx_ventas_fecha ON Ventas (fecha)',
+    'CREATE INDEX IF NOT EXISTS idx_detalle_producto ON DetalleVentas (producto_id)',
+    'CREATE INDEX IF NOT EXISTS idx_resumen_producto ON VentasDiarias (producto_id)',
+]
+
+# SQLite no tiene ON UPDATE CURRENT_TIMESTAMP: actualizado_en se pone con disparadores
+# (y asi tambien en las tablas a las que se añadio la columna sin valor por defecto)
+DISPARADORES = [
+    '''CREATE TRIGGER IF NOT EXISTS trg_productos_insertado AFTER INSERT ON Productos
+       WHEN NEW.actualizado_en IS NULL
+       BEGIN
+           UPDATE Productos SET actualizado_en = strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime')
+           WHERE producto_id = NEW.producto_id;
+       END''',
+    '''CREATE TRIGGER IF NOT EXISTS trg_productos_actualizado AFTER UPDATE ON Productos
+       WHEN NEW.actualizado_en IS OLD.actualizado_en
+       BEGIN
+           UPDATE Productos SET actualizado_en = strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime')
+           WHERE producto_id = NEW.producto_id;
+       END''',
+]
+
+_FOR_UPDATE = re.compile(r"\s+FOR\s+UPDATE\s*$", re.IGNORECASE)
+
+
+class _Traductor:
+    """Pasa el SQL escrito para MySQL (marcas %s, SELECT ... FOR UPDATE) al de SQLite, con cache"""
+
+    def __init__(self, max_entradas=256):
+        self.max_entradas = max_entradas
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def traducir(self, query):
+        """Devuelve (sql, bloquear); bloquear indica que habia un FOR UPDATE"""
+        with self._lock:
+            traducida = self._cache.get(query)
+            if traducida is None:
+                sql, cambios = _FOR_UPDATE.subn("", query)
+                traducida = (sql.replace("%s", "?"), cambios > 0)
+                self._cache[query] = traducida
+                if len(self._cache) > self.max_entradas:
+                    self._cache.popitem(last=False)
+            else:
+                self._cache.move_to_end(query)
+            return traducida
+
+
+class _Cursor:
+    def __init__(self, conexion):
+        self._conexion = conexion
+        self._cursor = conexion.conn.cursor()
+
+    def execute(self, query, params=()):
+        sql, bloquear = self._conexion.traductor.traducir(query)
+        if bloquear and not self._conexion.conn.in_transaction:
+            # SQLite no bloquea filas: se toma el bloqueo de escritura de la base entera
+            self._cursor.execute("BEGIN IMMEDIATE")
+        self._cursor.execute(sql, tuple(params or ()))
+
+    def executemany(self, query, filas):
+        sql, _ = self._conexion.traductor.traducir(query)
+        self._cursor.executemany(sql, filas)
+
+    def fetchone(self):
+        return self._cursor.fetchone()
+
+    def fetchall(self):
+        return self._cursor.fetchall()
+
+    def fetchmany(self, tam):
+        return self._cursor.fetchmany(tam)
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    def close(self):
+        self._cursor.close()
+
+
+class _Conexion:
+    """Conexion sqlite3 con la misma forma que las de mysql.connector que usa el resto del paquete"""
+
+    def __init__(self, conn, traductor):
+        self.conn = conn
+        self.traductor = traductor
+
+    def cursor(self, **opciones):
+        # buffered=False y similares no aplican: sqlite3 ya lee las filas bajo demanda
+        return _Cursor(self)
+
+    @property
+    def in_transaction(self):
+        return self.conn.in_transaction
+
+    def commit(self):
+        self.conn.commit()
+
+    def rollback(self):
+        self.conn.rollback()
+
+    def close(self):
+        self.conn.close()
+
+
+class SQLiteConnection(ConexionBase):
+    """Motor SQLite en modo WAL: varias lecturas a la vez y una escritura, sin servidor"""
+
+    dialecto = 'sqlite'
+
+    def __init__(self, ruta, max_conexiones=5, tiempo_espera=10, tiempo_inactividad=300,
+                 intervalo_verificacion=30, sentencias_preparadas=256, instrumentacion=None,
+                 replicas=None, retraso_maximo=5, intervalo_salud=10):
+        super().__init__(max_conexiones, tiempo_espera, tiempo_inactividad, intervalo_verificacion, instrumentacion)
+        self.ruta = ruta
+        self.sentencias_preparadas = sentencias_preparadas
+        self.traductor = _Traductor(sentencias_preparadas)
+        self._crear_replicas(replicas, retraso_maximo, intervalo_salud)
+
+    def _replica(self, datos):
+        # SQLite no replica: una copia del fichero hace de replica para probar el reparto de lecturas
+        parametros = dict(ruta=self.ruta, max_conexiones=self.max_conexiones, tiempo_espera=self.tiempo_espera,
+                          tiempo_inactividad=self.tiempo_inactividad,
+                          intervalo_verificacion=self.intervalo_verificacion,
+                          sentencias_preparadas=self.sentencias_preparadas, instrumentacion=self.instrumentacion)
+        parametros.update(datos)
+        return SQLiteConnection(**parametros), parametros['ruta']
+
+    def _abrir(self):
+        # sqlite3 guarda compiladas las ultimas 'cached_statements' sentencias de cada conexion
+        conn = sqlite3.connect(self.ruta, timeout=self.tiempo_espera, check_same_thread=False,
+                               detect_types=sqlite3.PARSE_DECLTYPES,
+                               cached_statements=self.sentencias_preparadas)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        return _Conexion(conn, self.traductor)
+
+    def create_tables(self):
+        """Crear tablas, columnas nuevas, indices y disparadores si no existen"""
+        with self.conexion() as conn:
+            cursor = conn.conn.cursor()
+            for query in TABLAS:
+                cursor.execute(query)
+            for tabla, nombre, definicion in COLUMNAS:
+                existentes = {fila[1] for fila in cursor.execute(f"PRAGMA table_info({tabla})")}
+                if nombre not in existentes:
+                    cursor.execute(f"ALTER TABLE {tabla} ADD COLUMN {definicion}")
+            for query in INDICES + DISPARADORES:
+                cursor.execute(query)
+            conn.commit()
+            cursor.close()
+        migrar(self)
+        return True
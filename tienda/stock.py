@@ -0,0 +1,93 @@
+# Control de stock seguro con varias terminales vendiendo a la vez
+import random
+import threading
+import time
+
+# Errores de InnoDB tras los que basta con repetir la transaccion
+# (mysql.connector.errorcode, sin importar el conector para que este modulo cargue rapido)
+ER_LOCK_WAIT_TIMEOUT = 1205
+ER_LOCK_DEADLOCK = 1213
+ERRORES_REINTENTABLES = (ER_LOCK_DEADLOCK, ER_LOCK_WAIT_TIMEOUT)
+
+_lock = threading.Lock()
+metricas = {
+    'transacciones': 0,          # transacciones de stock confirmadas
+    'reintentos': 0,             # repeticiones por interbloqueo o espera de bloqueo agotada
+    'fallos_bloqueo': 0,         # transacciones abandonadas tras agotar los reintentos
+    'ediciones': 0,              # ediciones del formulario de productos aplicadas
+    'conflictos_version': 0,     # ediciones rechazadas porque otra terminal cambio el producto
+}
+
+
+def _contar(clave, cantidad=1):
+    with _lock:
+        metricas[clave] += cantidad
+
+
+def estadisticas():
+    """Copia de las metricas con las tasas de conflicto calculadas"""
+    with _lock:
+        datos = dict(metricas)
+    intentos = datos['transacciones'] + datos['reintentos'] + datos['fallos_bloqueo']
+    datos['tasa_reintentos'] = datos['reintentos'] / intentos if intentos else 0.0
+    ediciones = datos['ediciones'] + datos['conflictos_version']
+    datos['tasa_conflictos_version'] = datos['conflictos_version'] / ediciones if ediciones else 0.0
+    return datos
+
+
+def con_reintentos(funcion, intentos=4, espera=0.05):
+    """Ejecutar una transaccion repitiendola si InnoDB la aborta por interbloqueo"""
+    for intento in range(1, intentos + 1):
+        try:
+            resultado = funcion()
+        except Exception as e:
+            if getattr(e, 'errno', None) not in ERRORES_REINTENTABLES:
+                raise
+            if intento == intentos:
+                _contar('fallos_bloqueo')
+                raise
+            _contar('reintentos')
+            time.sleep(espera * intento * (1 + random.random()))
+        else:
+            _contar('transacciones')
+            return resultado
+
+
+def bloquear_productos(cursor, producto_ids):
+    """SELECT ... FOR UPDATE de los productos, siempre en orden de id para no interbloquearse
+
+    Devuelve {producto_id: (nombre, stock)} con las filas ya bloqueadas hasta el commit.
+    """
+    ids = sorted(set(producto_ids))
+    marcas = ", ".join(["%s"] * len(ids))
+    cursor.execute(f"SELECT producto_id, nombre, stock FROM Productos WHERE producto_id IN ({marcas}) "
+                   "ORDER BY producto_id FOR UPDATE", ids)
+    return {producto_id: (nombre, stock) for producto_id, nombre, stock in cursor.fetchall()}
+
+
+def descontar_stock(cursor, cantidades):
+    """Restar {producto_id: cantidad} con un solo UPDATE relativo (stock = stock - n)"""
+    ids = sorted(cantidades)
+    casos = " ".join(["WHEN %s THEN %s"] * len(ids))
+    marcas = ", ".join(["%s"] * len(ids))
+    params = [valor for producto_id in ids for valor in (producto_id, cantidades[producto_id])] + ids
+    cursor.execute(f"UPDATE Productos SET stock = stock - CASE producto_id {casos} END "
+                   f"WHERE producto_id IN ({marcas})", params)
+
+
+def guardar_cambios_producto(db, producto_id, version, nombre, descripcion, precio, categoria_id, cambio_stock):
+    """Edicion optimista desde el formulario de productos
+
+    Solo se aplica si la version sigue siendo la que se leyo; el stock se ajusta con la
+    diferencia introducida para no pisar las ventas hechas entretanto. Devuelve False si
+    otra terminal modifico el producto.
+    """
+    filas = db.ejecutar(
+        "UPDATE Productos SET nombre=%s, descripcion=%s, precio=%s, categoria_id=%s, stock = stock + %s, "
+        "version = version + 1 WHERE producto_id=%s AND version=%s",
+        (nombre, descripcion, precio, categoria_id, cambio_stock, producto_id, version), preparada=True)
+    if filas == 0:
+        _contar('conflictos_version')
+        return False
+    _contar('ediciones')
+    return True